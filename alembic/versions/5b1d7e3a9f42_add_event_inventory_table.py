@@ -0,0 +1,41 @@
+"""Add event_inventory table
+
+Revision ID: 5b1d7e3a9f42
+Revises: c2559617e066
+Create Date: 2026-10-18 15:20:41.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1d7e3a9f42'
+down_revision: Union[str, None] = 'c2559617e066'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('event_inventory',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('total_seats', sa.Integer(), nullable=False),
+    sa.Column('booked_seats', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['event.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+    # Counters for events created before the table existed
+    op.execute("""
+        INSERT INTO event_inventory (event_id, total_seats, booked_seats)
+        SELECT e.id,
+               (SELECT count(*) FROM seat s WHERE s.venue_id = e.venue_id),
+               (SELECT count(*) FROM ticket t WHERE t.event_id = e.id)
+        FROM event e
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('event_inventory')
@@ -0,0 +1,25 @@
+"""Add (event_time, id) index on event
+
+Revision ID: 8e4a2c6d1b90
+Revises: 5b1d7e3a9f42
+Create Date: 2026-10-18 17:05:12.604417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4a2c6d1b90'
+down_revision: Union[str, None] = '5b1d7e3a9f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_event_event_time_id', 'event', ['event_time', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_event_time_id', table_name='event')
@@ -1,6 +1,6 @@
 # app/api/v1/api.py
 from fastapi import APIRouter
-from app.api.v1.endpoints import events, public, users, auth, bookings, metrics
+from app.api.v1.endpoints import events, public, users, auth, bookings, metrics, queue, seats
 
 api_router = APIRouter()
 
@@ -12,6 +12,14 @@ api_router.include_router(users.router,    prefix="/users",    tags=["Users"])
 # Mounted without prefix: /api/v1/events/, /api/v1/venues/
 api_router.include_router(public.router,   tags=["Public"])
 
+# Customer — waiting room for events with an admission queue
+# Mounted without prefix: /api/v1/events/{id}/queue
+api_router.include_router(queue.router,    tags=["Waiting Room"])
+
+# Customer — best-available seat search, optionally holding the block
+# Mounted without prefix: /api/v1/events/{id}/best-available
+api_router.include_router(seats.router,    tags=["Seat Selection"])
+
 # Customer — booking (auth required, customer role)
 api_router.include_router(bookings.router, prefix="/bookings", tags=["Bookings"])
 
@@ -1,14 +1,42 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
 from app import schemas, models
 from app.db import deps
-from app.services import booking_service
+from app.services import (
+    booking_service,
+    booking_request_service,
+    hold_service,
+    idempotency_service,
+    queue_service,
+)
 
 router = APIRouter()
 
 
+async def _reject_if_sold_out(request: Request) -> None:
+    """
+    Runs before the db session and the user lookup, so late requests for a
+    sold-out event cost one Redis EXISTS. Requests with an Idempotency-Key
+    skip it here — a retry of the booking that sold the event out must get
+    its replay — and are checked inside the booking service instead.
+    """
+    if request.headers.get("Idempotency-Key"):
+        return
+    try:
+        event_id = (await request.json())["event_id"]
+    except Exception:
+        return  # left to the body validation's 422
+    # Only a plain JSON integer: int() would turn 1.9 into event 1
+    if type(event_id) is not int:
+        return  # BookingCreate decides what it accepts
+    await run_in_threadpool(booking_service.reject_if_sold_out, event_id)
+
+
 @router.get("/my", response_model=List[schemas.Booking])
 def get_my_bookings(
     *,
@@ -19,14 +47,90 @@ def get_my_bookings(
     return booking_service.get_my_bookings(db=db, user_id=current_user.id)
 
 
-@router.post("/", response_model=schemas.Booking)
+@router.post(
+    "/",
+    response_model=schemas.Booking,
+    responses={202: {"model": schemas.BookingRequestStatus}},
+    dependencies=[Depends(_reject_if_sold_out)],  # resolved before the db session
+)
 def create_booking(
     *,
     db: Session = Depends(deps.get_db),
     booking_in: schemas.BookingCreate,
     current_user: models.User = Depends(deps.get_current_user),
+    queue_token: Optional[str] = Header(None, alias="X-Queue-Token"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    mode: Literal["sync", "async"] = "sync",
+):
+    """
+    Create a new booking for the current user. (Any authenticated user)
+    Events with a waiting room also require an admitted X-Queue-Token.
+
+    mode=async: the intent is queued for a worker and 202 is returned at once
+    with a request id; poll GET /bookings/requests/{request_id} for the outcome.
+
+    Idempotency-Key: retries with the same key and body get the first
+    response (booking or conflict) replayed, marked Idempotent-Replayed: true.
+
+    A sold-out event gets 409 before any DB work.
+    """
+    queue_service.require_admission(booking_in.event_id, queue_token, current_user.id)
+
+    def attempt():
+        if mode == "async":
+            request = booking_request_service.submit(
+                db, booking_in=booking_in, user_id=current_user.id
+            )
+            return status.HTTP_202_ACCEPTED, jsonable_encoder(request)
+        booking = booking_service.create_new_booking(
+            db=db, booking_in=booking_in, user_id=current_user.id
+        )
+        return status.HTTP_200_OK, jsonable_encoder(schemas.Booking.model_validate(booking))
+
+    if idempotency_key:
+        status_code, content, replayed = idempotency_service.run(
+            current_user.id,
+            idempotency_key,
+            idempotency_service.fingerprint({"mode": mode, **booking_in.model_dump()}),
+            attempt,
+        )
+    else:
+        (status_code, content), replayed = attempt(), False
+
+    headers = {}
+    if status_code == status.HTTP_202_ACCEPTED:
+        headers["Location"] = f"requests/{content['request_id']}"
+    if replayed:
+        headers["Idempotent-Replayed"] = "true"
+    return JSONResponse(status_code=status_code, content=content, headers=headers)
+
+
+@router.get("/requests/{request_id}", response_model=schemas.BookingRequestStatus)
+def read_booking_request(
+    *,
+    request_id: str,
+    current_user: models.User = Depends(deps.get_current_user),
+):
+    """Status of an async booking request: pending, confirmed or rejected."""
+    return booking_request_service.get_status(request_id, current_user.id)
+
+
+@router.post("/holds", response_model=schemas.SeatHold)
+def hold_seats(
+    *,
+    hold_in: schemas.SeatHoldCreate,
+    current_user: models.User = Depends(deps.get_current_user),
+):
+    """Hold seats for the current user for SEAT_HOLD_TTL_SECONDS. 409 if anyone else holds one."""
+    return booking_service.hold_seats(hold_in=hold_in, user_id=current_user.id)
+
+
+@router.delete("/holds/{event_id}")
+def release_holds(
+    *,
+    event_id: int,
+    current_user: models.User = Depends(deps.get_current_user),
 ):
-    """Create a new booking for the current user. (Any authenticated user)"""
-    return booking_service.create_new_booking(
-        db=db, booking_in=booking_in, user_id=current_user.id
-    )
+    """Release every seat the current user holds for this event."""
+    released = hold_service.release_seats(event_id, current_user.id)
+    return {"event_id": event_id, "released": released}
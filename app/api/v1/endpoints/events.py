@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from app import schemas
 from app.db import deps
 from app.models.user import User
-from app.services import event_service
+from app.services import event_service, queue_service
 
 router = APIRouter()
 
@@ -31,3 +31,29 @@ def create_new_event(
     return event_service.create_event(
         db=db, event_in=event_in, organizer_id=current_user.id
     )
+
+
+@router.put("/events/{event_id}/queue", response_model=schemas.QueueConfig)
+def enable_waiting_room(
+    *,
+    db: Session = Depends(deps.get_db),
+    event_id: int,
+    config_in: schemas.QueueConfig,
+    current_user: User = Depends(deps.get_current_organizer),
+):
+    """Enable (or re-tune) the waiting room for one of your events. (Organizer only)"""
+    event = event_service.get_organized_event(db, event_id, current_user.id)  # 404 / 403
+    return queue_service.enable_queue(event_id, config_in, event.event_time)
+
+
+@router.delete("/events/{event_id}/queue")
+def disable_waiting_room(
+    *,
+    db: Session = Depends(deps.get_db),
+    event_id: int,
+    current_user: User = Depends(deps.get_current_organizer),
+):
+    """Disable the waiting room for one of your events and drop its queue. (Organizer only)"""
+    event_service.get_organized_event(db, event_id, current_user.id)  # 404 / 403
+    queue_service.disable_queue(event_id)
+    return {"event_id": event_id, "queue": "disabled"}
@@ -1,35 +1,305 @@
-from fastapi import APIRouter, Depends
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional, Union
 
 from app import schemas
+from app.core.config import settings
 from app.db import deps
-from app.services import event_service   # <-- use service for all event ops
-from app.crud import crud_event          # <-- keep only for get_venues
+from app.db.session import SessionLocal
+from app.services import availability_stream, event_service, inventory_service   # <-- use service for all event ops
 
 router = APIRouter()
 
 
+# ── Conditional GET ──────────────────────────────────────────────────────────
+# Strong ETags built from Redis version counters.  The If-None-Match check runs
+# in a dependency declared BEFORE the db session, so an unchanged poll costs
+# one Redis GET and returns an empty 304.  Without Redis there are no ETags.
+# Compact availability is the exception: it is tagged by a digest of its bits.
+
+# EventAvailability's last field, read off the end of the cached JSON bytes
+_DOC_VERSION = re.compile(rb'"version":\s*(\d+)\}$')
+
+
+def _etag(*parts) -> str:
+    return '"' + "-".join(str(p) for p in parts) + '"'
+
+
+def _validators(etag: Optional[str], max_age: int) -> dict:
+    headers = {"Cache-Control": f"public, max-age={max_age}"}
+    if etag is not None:
+        headers["ETag"] = etag
+    return headers
+
+
+def _raise_if_not_modified(if_none_match: Optional[str], etag: str, max_age: int) -> None:
+    if not if_none_match:
+        return
+    tags = [t.strip() for t in if_none_match.split(",")]
+    if "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags):
+        raise HTTPException(status_code=304, headers=_validators(etag, max_age))
+
+
+def _events_etag(if_none_match: Optional[str] = Header(None)) -> Optional[str]:
+    version = event_service.get_events_version()
+    if version is None:
+        return None
+    # "Upcoming" starts at today's UTC midnight, so the list also changes daily
+    etag = _etag("events", datetime.now(timezone.utc).date().isoformat(), version)
+    _raise_if_not_modified(if_none_match, etag, settings.EVENTS_HTTP_MAX_AGE_SECONDS)
+    return etag
+
+
+def _event_version(event_id: int, if_none_match: Optional[str] = Header(None)) -> Optional[int]:
+    version = event_service.get_event_version(event_id)
+    if version is not None:
+        _raise_if_not_modified(
+            if_none_match, _etag("event", event_id, version), settings.EVENTS_HTTP_MAX_AGE_SECONDS
+        )
+    return version
+
+
+def _availability_variant(fmt: str, rows: Optional[str]) -> str:
+    return fmt if rows is None else f"rows.{rows.upper()}"
+
+
+def _availability_version(
+    request: Request, event_id: int, if_none_match: Optional[str] = Header(None)
+) -> Optional[int]:
+    # format is validated by the route itself; since= deltas are never conditional,
+    # and compact formats are tagged by their bits (checked in the route)
+    fmt = request.query_params.get("format", "full")
+    if "since" in request.query_params or fmt in ("bitmap", "rle"):
+        return None
+    version = event_service.get_availability_version(event_id)
+    if version is not None:
+        variant = _availability_variant(fmt, request.query_params.get("rows"))
+        _raise_if_not_modified(
+            if_none_match, _etag("availability", event_id, variant, version),
+            settings.AVAILABILITY_HTTP_MAX_AGE_SECONDS,
+        )
+    return version
+
+
+def _compact_etag(event_id: int, fmt: str, compact: dict) -> str:
+    # A digest of what is served, not the availability counter: a counter can
+    # run ahead of a bitmap that missed a mark, and would 304 a stale seat map
+    digest = hashlib.blake2b(json.dumps(compact, separators=(",", ":")).encode(), digest_size=8)
+    return _etag("availability", event_id, fmt, digest.hexdigest())
+
+
+def _venues_etag(if_none_match: Optional[str] = Header(None)) -> Optional[str]:
+    version = event_service.get_venues_version()
+    if version is None:
+        return None
+    etag = _etag("venues", version)
+    _raise_if_not_modified(if_none_match, etag, settings.EVENTS_HTTP_MAX_AGE_SECONDS)
+    return etag
+
+
+# ── Keyset pages ─────────────────────────────────────────────────────────────
+# Listings are cached as {"next_cursor": ..., "items": [...]} (event_service);
+# the cursor is read off the front of the bytes into X-Next-Cursor and the
+# items array is sent as-is.  No header on the last page.
+
+_PAGE = re.compile(rb'^\{"next_cursor":\s*(?:null|"([A-Za-z0-9_.-]+)"),\s*"items":\s*')
+
+
+def _page_response(content: bytes, etag: Optional[str]) -> Response:
+    match = _PAGE.match(content)
+    headers = _validators(etag, settings.EVENTS_HTTP_MAX_AGE_SECONDS)
+    if match is None:
+        # Not laid out the way event_service writes pages (key order, spacing):
+        # parse it rather than slice at the wrong place
+        page = json.loads(content)
+        if page["next_cursor"]:
+            headers["X-Next-Cursor"] = page["next_cursor"]
+        return Response(content=json.dumps(page["items"]), media_type="application/json", headers=headers)
+    if match.group(1):
+        headers["X-Next-Cursor"] = match.group(1).decode()
+    return Response(content=content[match.end():-1], media_type="application/json", headers=headers)
+
+
 @router.get("/events/", response_model=List[schemas.Event])
-def read_events(db: Session = Depends(deps.get_db)):
-    """Retrieve a list of upcoming events."""
-    return event_service.get_all_events(db)
+def read_events(
+    etag: Optional[str] = Depends(_events_etag),
+    db: Session = Depends(deps.get_db),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None, max_length=128),
+):
+    """
+    Retrieve upcoming events, ordered by event time, one page at a time.
+    Pass the X-Next-Cursor response header back as ?cursor= for the next page;
+    the last page has none. Supports If-None-Match.
+    Passed through as the cached JSON bytes (built from schemas.Event, not re-parsed).
+    """
+    content = event_service.get_events_page(db, cursor=cursor, limit=limit, raw=True)
+    return _page_response(content, etag)
+
+
+# Declared before /events/{event_id} so "availability" isn't taken for an id
+@router.get("/events/availability", response_model=List[schemas.EventAvailabilitySummary])
+def read_events_availability(
+    *,
+    db: Session = Depends(deps.get_db),
+    ids: str = Query(..., pattern=r"^\d+(,\d+)*$", description="Comma-separated event ids"),
+    response: Response,
+):
+    """
+    Seat counts for many events in one call — e.g. "N seats left" on a listing
+    page — instead of one /events/{id}/availability request per event.
+    Unknown ids are left out of the result.
+    """
+    response.headers.update(_validators(None, settings.AVAILABILITY_HTTP_MAX_AGE_SECONDS))
+    return event_service.get_availability_summaries(db, [int(i) for i in ids.split(",")])
 
 
 @router.get("/events/{event_id}", response_model=schemas.Event)
-def read_event(*, db: Session = Depends(deps.get_db), event_id: int):
-    """Get details for a specific event."""
-    return event_service.get_event(db, event_id=event_id)
+def read_event(
+    *,
+    version: Optional[int] = Depends(_event_version),
+    db: Session = Depends(deps.get_db),
+    event_id: int,
+    response: Response,
+):
+    """Get details for a specific event. Supports If-None-Match."""
+    event = event_service.get_event(db, event_id=event_id)
     # event_service.get_event already raises 404 — no manual check needed
+    if version is None:
+        version = event_service.get_event_version(event_id, create=True)
+    etag = None if version is None else _etag("event", event_id, version)
+    response.headers.update(_validators(etag, settings.EVENTS_HTTP_MAX_AGE_SECONDS))
+    return event
+
+
+@router.get(
+    "/events/{event_id}/availability",
+    response_model=Union[
+        schemas.EventAvailability, schemas.EventAvailabilityDelta, schemas.EventAvailabilityCompact,
+    ],
+)
+def read_event_availability(
+    *,
+    version: Optional[int] = Depends(_availability_version),
+    db: Session = Depends(deps.get_db),
+    event_id: int,
+    fmt: Literal["full", "bitmap", "rle"] = Query("full", alias="format"),
+    since: Optional[int] = Query(None, ge=0),
+    rows: Optional[str] = Query(None, max_length=16),
+    if_none_match: Optional[str] = Header(None),
+    response: Response,
+):
+    """
+    Get seat availability for a specific event. Served from Redis cache when possible.
+    format=bitmap|rle returns a compact EventAvailabilityCompact instead of
+    per-seat lists: booked seats as a base64 bitmap or as position runs.
+
+    The full format is passed through as the cached JSON bytes — it was
+    validated against EventAvailability when written, so it isn't re-parsed here.
+
+    since=<version> (the `version` of a snapshot the client holds) returns an
+    EventAvailabilityDelta with only the seats booked since then — or, once
+    the event's changelog has rolled past that version, the full snapshot.
+
+    rows=A-F (or rows=C) limits the full format to those rows, for seat
+    pickers that show one block of a large venue at a time. Served from the
+    row-major seat bitmap: the cost follows the rows asked for, not the venue.
+
+    Snapshots carry an ETag of the availability version; If-None-Match with
+    the current one gets a 304 before any DB or cache document is touched.
+    The full format is tagged with the version inside the document served.
+    Compact ones are tagged with a digest of the bits served, so their 304
+    comes after the bitmap read (still no DB on a warm bitmap).
+    """
+    max_age = settings.AVAILABILITY_HTTP_MAX_AGE_SECONDS
+    if since is not None:
+        delta = event_service.get_availability_delta(event_id, since)
+        if delta is not None:
+            response.headers.update(_validators(None, max_age))
+            return delta
+    if rows is not None:
+        if fmt != "full":
+            raise HTTPException(status_code=422, detail="rows= is only supported with format=full.")
+        sliced = event_service.get_event_availability_rows(db, event_id, rows)
+        etag = None
+        if sliced["version"] is not None:
+            etag = _etag("availability", event_id, _availability_variant(fmt, rows), sliced["version"])
+        response.headers.update(_validators(etag, max_age))
+        return sliced
+    if fmt != "full":
+        compact = event_service.get_event_availability_compact(db, event_id, fmt)
+        etag = _compact_etag(event_id, fmt, compact)
+        _raise_if_not_modified(if_none_match, etag, max_age)
+        response.headers.update(_validators(etag, max_age))
+        return compact
+    content = event_service.get_event_availability(db, event_id=event_id, raw=True)
+    match = _DOC_VERSION.search(content[-32:])
+    etag = _etag("availability", event_id, "full", int(match.group(1))) if match else None
+    return Response(content=content, media_type="application/json", headers=_validators(etag, max_age))
+
+
+@router.get("/events/{event_id}/summary", response_model=schemas.EventAvailabilitySummary)
+def read_event_summary(*, db: Session = Depends(deps.get_db), event_id: int):
+    """
+    Seat counts only — total, available, booked — from the event's inventory
+    counters: one Redis read, no seat lists built. The DB is read only when cold.
+    """
+    return inventory_service.get_summary(db, event_id)
+
+
+def _availability_snapshot(event_id: int) -> bytes:
+    db = SessionLocal()
+    try:
+        return event_service.get_event_availability(db, event_id, raw=True)
+    finally:
+        db.close()
 
 
-@router.get("/events/{event_id}/availability", response_model=schemas.EventAvailability)
-def read_event_availability(*, db: Session = Depends(deps.get_db), event_id: int):
-    """Get seat availability for a specific event. Served from Redis cache when possible."""
-    return event_service.get_event_availability(db, event_id=event_id)
+@router.get("/events/{event_id}/availability/stream")
+async def stream_event_availability(*, db: Session = Depends(deps.get_db), event_id: int):
+    """
+    Server-Sent Events: one `snapshot` (the availability document), then a
+    `booked` event with the seat ids of every later booking. Replaces polling
+    GET /events/{id}/availability. A client that falls behind gets a new snapshot.
+    """
+    subscriber = await availability_stream.subscribe(event_id)
+    try:
+        snapshot = await run_in_threadpool(
+            event_service.get_event_availability, db, event_id, raw=True
+        )
+    except BaseException:
+        availability_stream.unsubscribe(event_id, subscriber)
+        raise
+    return StreamingResponse(
+        availability_stream.events(
+            event_id, subscriber, snapshot,
+            lambda: run_in_threadpool(_availability_snapshot, event_id),
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/venues/", response_model=List[schemas.Venue])
-def read_venues(db: Session = Depends(deps.get_db), skip: int = 0, limit: int = 100):
-    """Retrieve all venues."""
-    return crud_event.get_venues(db, skip=skip, limit=limit)
+def read_venues(
+    etag: Optional[str] = Depends(_venues_etag),
+    db: Session = Depends(deps.get_db),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None, max_length=128),
+    skip: Optional[int] = Query(None, include_in_schema=False),
+):
+    """Retrieve venues one page at a time, paged like GET /events/. Supports If-None-Match."""
+    if skip is not None:
+        # Offset paging is gone; say so instead of quietly serving page one
+        raise HTTPException(
+            status_code=422,
+            detail="skip is no longer supported; page with ?cursor= from the X-Next-Cursor header.",
+        )
+    content = event_service.get_venues_page(db, cursor=cursor, limit=limit, raw=True)
+    return _page_response(content, etag)
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+
+from app import schemas, models
+from app.db import deps
+from app.services import queue_service
+
+router = APIRouter()
+
+
+@router.post("/events/{event_id}/queue", response_model=schemas.QueueTicket)
+def join_waiting_room(
+    *,
+    event_id: int,
+    current_user: models.User = Depends(deps.get_current_user),
+):
+    """Join an event's waiting room. Returns a queue token and the current position."""
+    return queue_service.join_queue(event_id, current_user.id)
+
+
+@router.get("/events/{event_id}/queue/{token}", response_model=schemas.QueueTicket)
+def read_waiting_room_status(*, event_id: int, token: str):
+    """Poll a queue token. Redis only — no auth, no DB session."""
+    return queue_service.get_status(event_id, token)
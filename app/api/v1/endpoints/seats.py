@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app import schemas, models
+from app.db import deps
+from app.services import seat_finder
+
+router = APIRouter()
+
+
+@router.post("/events/{event_id}/best-available", response_model=schemas.BestAvailable)
+def find_best_available(
+    *,
+    db: Session = Depends(deps.get_db),
+    event_id: int,
+    request_in: schemas.BestAvailableRequest,
+    current_user: models.User = Depends(deps.get_current_user),
+):
+    """
+    The best block of party_size adjacent seats in one row — front rows and
+    centre seats first, or nearest to the preferred row. hold=true also holds
+    the block for the current user, ready for POST /bookings/. 409 if none is left.
+    """
+    return seat_finder.best_available(
+        db, event_id,
+        user_id=current_user.id,
+        party_size=request_in.party_size,
+        row=request_in.row,
+        hold=request_in.hold,
+    )
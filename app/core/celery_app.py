@@ -17,5 +17,17 @@ celery_app.conf.update(
     broker_connection_retry_on_startup=True,  # suppress Celery 6.0 deprecation warning
 )
 
+# Periodic jobs — run by the embedded beat scheduler (`worker -B`)
+celery_app.conf.beat_schedule = {
+    "release-expired-seat-holds": {
+        "task": "app.worker.release_expired_holds",
+        "schedule": 30.0,
+    },
+    "reconcile-event-inventory": {
+        "task": "app.worker.reconcile_event_inventory",
+        "schedule": 300.0,
+    },
+}
+
 # No custom task_routes — tasks go to the default "celery" queue
 # which matches: celery -A app.worker worker --loglevel=info
@@ -20,6 +20,75 @@ class Settings(BaseSettings):
     # Extra CORS origins (comma-separated), injected via Heroku config var
     CORS_ORIGINS: str = ""
 
+    # Booking write path: "orm" (one Ticket object per seat + re-query) or
+    # "bulk" (booking + tickets inserted in a single CTE round trip)
+    BOOKING_WRITE_MODE: str = "orm"
+
+    # Group commit: coalesce same-event bookings arriving within the window
+    # into one transaction (per process), up to BOOKING_BATCH_MAX_SIZE each
+    BOOKING_BATCH_ENABLED: bool = False
+    BOOKING_BATCH_WINDOW_MS: float = 5.0
+    BOOKING_BATCH_MAX_SIZE: int = 50
+    # How long a follower waits for its batch before giving up with 503
+    BOOKING_BATCH_WAIT_SECONDS: float = 10.0
+
+    # Redis seat holds: claimed atomically before the DB commit, expire after TTL
+    SEAT_HOLDS_ENABLED: bool = True
+    SEAT_HOLD_TTL_SECONDS: int = 120
+
+    # Per-event booked-seat bitmap in Redis: sheds requests for sold seats pre-DB
+    SEAT_BITMAP_ENABLED: bool = True
+
+    # Waiting room: its Redis state expires this long after the event starts
+    WAITING_ROOM_GRACE_SECONDS: int = 3600
+
+    # Async booking mode (POST /bookings/?mode=async): how long request status is kept
+    BOOKING_REQUEST_TTL_SECONDS: int = 86400
+
+    # Idempotency-Key on POST /bookings/: how long first responses are replayed,
+    # and how long an in-flight duplicate waits for the first request to finish
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+
+    # Cache stampede protection (cache_service.get_or_build): one reader rebuilds
+    # a missing key under a short lock while others wait briefly or read stale;
+    # hot keys refresh early with probability scaled by EARLY_REFRESH_BETA
+    CACHE_REBUILD_LOCK_SECONDS: int = 10
+    CACHE_REBUILD_WAIT_MS: int = 200
+    CACHE_EARLY_REFRESH_BETA: float = 1.0
+
+    # Venue seat layouts kept in process memory (seat_layout), least recently used
+    # evicted first; the TTL bounds how long another process's rebuilt layout lags
+    SEAT_LAYOUT_CACHE_MAX_ENTRIES: int = 512
+    SEAT_LAYOUT_CACHE_TTL_SECONDS: float = 3600.0
+
+    # Optional in-process LRU in front of Redis, kept coherent via pub/sub
+    LOCAL_CACHE_ENABLED: bool = False
+    LOCAL_CACHE_MAX_ENTRIES: int = 256
+    LOCAL_CACHE_TTL_SECONDS: float = 5.0
+
+    # Codec for cached values: "json" (stdlib), "orjson" or "msgpack".
+    # Values are tagged, so every process reads all three during a rollout.
+    CACHE_CODEC: str = "json"
+
+    # Compress cached values of at least CACHE_COMPRESS_MIN_BYTES:
+    # "zlib", "lz4" (needs the lz4 package) or "none"
+    CACHE_COMPRESSION: str = "zlib"
+    CACHE_COMPRESS_MIN_BYTES: int = 16384
+
+    # Per-event changelog behind GET /events/{id}/availability?since=<version>:
+    # bookings kept, and how long an event with no new bookings keeps its log
+    AVAILABILITY_CHANGELOG_SIZE: int = 1000
+    AVAILABILITY_CHANGELOG_TTL_SECONDS: int = 604800
+
+    # Cache-Control max-age on public reads; CDNs revalidate with If-None-Match after it
+    EVENTS_HTTP_MAX_AGE_SECONDS: int = 30
+    AVAILABILITY_HTTP_MAX_AGE_SECONDS: int = 1
+
+    # Keyset pagination of GET /events/ and /venues/ (?limit=, ?cursor=)
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 500
+
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -1,6 +1,7 @@
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session, joinedload
 from datetime import datetime, timezone, time
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 from app.models.event import Venue, Event, Seat
 from app.models.booking import Ticket
@@ -45,8 +46,15 @@ def get_venue(db: Session, venue_id: int) -> Optional[Venue]:
     return db.query(Venue).filter(Venue.id == venue_id).first()
 
 
-def get_venues(db: Session, skip: int = 0, limit: int = 100) -> List[Venue]:
-    return db.query(Venue).offset(skip).limit(limit).all()
+def get_venues(db: Session, *, after_id: Optional[int] = None, limit: int = 100) -> List[Venue]:
+    """
+    Keyset page of venues ordered by id: the `limit` venues after after_id.
+    Seeks on the primary key, so deep pages cost the same as the first.
+    """
+    query = db.query(Venue)
+    if after_id is not None:
+        query = query.filter(Venue.id > after_id)
+    return query.order_by(Venue.id).limit(limit).all()
 
 
 # ─────────────────────────────────────────
@@ -86,20 +94,23 @@ def get_event(db: Session, event_id: int) -> Optional[Event]:
     )
 
 
-def get_events(db: Session, skip: int = 0, limit: int = 100) -> List[Event]:
+def get_events(
+    db: Session, *, after: Optional[Tuple[datetime, int]] = None, limit: int = 100
+) -> List[Event]:
     """
-    Returns upcoming events (today onwards), ordered by event_time.
+    Returns upcoming events (today onwards), ordered by (event_time, id),
+    as a keyset page: the `limit` events after the (event_time, id) pair
+    `after`. Uses ix_event_event_time_id, so deep pages cost the same as the first.
     Pure DB query — no caching. Caching is handled by event_service layer.
     """
     today_utc = datetime.now(timezone.utc).date()
     start_of_today_utc = datetime.combine(today_utc, time.min, tzinfo=timezone.utc)
 
-    return (
+    query = (
         db.query(Event)
         .options(joinedload(Event.venue))
         .filter(Event.event_time >= start_of_today_utc)
-        .order_by(Event.event_time)
-        .offset(skip)
-        .limit(limit)
-        .all()
     )
+    if after is not None:
+        query = query.filter(tuple_(Event.event_time, Event.id) > tuple_(*after))
+    return query.order_by(Event.event_time, Event.id).limit(limit).all()
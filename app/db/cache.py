@@ -21,3 +21,29 @@ redis_client = redis.Redis.from_url(
     socket_timeout=2,           # fail fast on reads/writes too
     **ssl_kwargs
 )
+
+# Same server, bytes in / bytes out — for binary values (seat bitmaps) that
+# must not go through UTF-8 decoding.
+redis_raw_client = redis.Redis.from_url(
+    settings.REDIS_URL,
+    decode_responses=False,
+    max_connections=20,
+    socket_connect_timeout=2,
+    socket_timeout=2,
+    **ssl_kwargs
+)
+
+
+def make_async_client(**overrides) -> "redis.asyncio.Redis":
+    """
+    asyncio client for long-lived subscriptions (availability SSE).
+    Built per event loop — asyncio connections can't be shared across loops —
+    and without a socket read timeout, since an idle subscription is normal.
+    """
+    import redis.asyncio
+    return redis.asyncio.Redis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        socket_connect_timeout=2,
+        **{**ssl_kwargs, **overrides},
+    )
@@ -29,6 +29,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],   # keyset pagination of /events/ and /venues/
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -3,5 +3,5 @@
 # ensuring they are all loaded into memory for SQLAlchemy's mappers.
 
 from .user import User, UserRole
-from .event import Event, Venue, Seat, EventType
+from .event import Event, Venue, Seat, EventType, EventInventory
 from .booking import Booking, Ticket, BookingStatus
@@ -1,6 +1,7 @@
 import enum
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from app.db.base_class import Base
 
 class EventType(enum.Enum):
@@ -23,6 +24,9 @@ class Event(Base):
 
     tickets = relationship("Ticket", back_populates="event")
 
+    # Keyset pagination of the upcoming-events list seeks on (event_time, id)
+    __table_args__ = (Index("ix_event_event_time_id", "event_time", "id"),)
+
 
 class Venue(Base):
     id = Column(Integer, primary_key=True, index=True)
@@ -42,3 +46,13 @@ class Seat(Base):
     venue_id = Column(Integer, ForeignKey("venue.id"))
     venue = relationship("Venue", back_populates="seats")
     tickets = relationship("Ticket", back_populates="seat")
+
+
+class EventInventory(Base):
+    """Seat counters per event, kept in step with ticket inserts (see inventory_service)."""
+    __tablename__ = "event_inventory"
+
+    event_id = Column(Integer, ForeignKey("event.id", ondelete="CASCADE"), primary_key=True)
+    total_seats = Column(Integer, nullable=False)
+    booked_seats = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,5 +1,6 @@
 from .resource import ResourceBase, ResourceCreate, Resource
-from .event import Venue, VenueCreate, Event, EventCreate, Seat, EventAvailability
+from .event import Venue, VenueCreate, Event, EventCreate, Seat, EventAvailability, EventAvailabilitySummary, EventAvailabilityDelta, EventAvailabilityCompact
 from .user import User, UserCreate, UserBase
 from .token import Token, TokenData
-from .booking import Booking, BookingCreate, Ticket
+from .booking import Booking, BookingCreate, Ticket, SeatHold, SeatHoldCreate, BestAvailable, BestAvailableRequest, BookingRequestStatus
+from .queue import QueueConfig, QueueTicket
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from datetime import datetime
 from decimal import Decimal
 from .event import Seat, Event  # Re-use the Seat and Event schemas
@@ -21,6 +21,45 @@ class BookingCreate(BaseModel):
     event_id: int
     seat_ids: List[int]
 
+# Seat holds — short-lived Redis claims taken before booking
+
+
+class SeatHoldCreate(BaseModel):
+    event_id: int
+    seat_ids: List[int]
+
+
+class SeatHold(SeatHoldCreate):
+    expires_in_seconds: int
+
+# Best-available block for a party — optionally held at once
+
+
+class BestAvailableRequest(BaseModel):
+    party_size: int = Field(..., ge=1)
+    row: Optional[str] = None  # preferred row label; nearest rows are tried next
+    hold: bool = False          # also hold the block for SEAT_HOLD_TTL_SECONDS
+
+
+class BestAvailable(BaseModel):
+    event_id: int
+    row: str
+    seats: List[Seat]
+    held: bool
+    expires_in_seconds: Optional[int] = None
+
+# Async booking mode — status of a queued booking intent
+
+
+class BookingRequestStatus(BaseModel):
+    request_id: str
+    status: Literal["pending", "confirmed", "rejected"]
+    event_id: int
+    seat_ids: List[int]
+    booking_id: Optional[int] = None
+    status_code: Optional[int] = None   # what the sync path would have returned
+    detail: Optional[str] = None
+
 # Properties to return to client
 
 
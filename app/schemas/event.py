@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from app.models.event import EventType  # Import the enum from your model
 
@@ -62,3 +62,44 @@ class EventAvailability(BaseModel):
     booked_seats: int
     available: List[Seat]
     booked: List[Seat]
+    version: Optional[int] = None  # bumped by every booking for the event
+
+
+# Seat counts only, for listing pages — GET /events/availability?ids=1,2,3
+
+
+class EventAvailabilitySummary(BaseModel):
+    event_id: int
+    total_seats: int
+    available_seats: int
+    booked_seats: int
+    version: Optional[int] = None
+
+
+# Availability delta (?since=<version>): seat ids booked after `since`, in
+# commit order. Apply to a snapshot carrying version `since` to reach `version`.
+
+
+class EventAvailabilityDelta(BaseModel):
+    since: int
+    version: int
+    booked_seat_ids: List[int]
+
+
+# Compact availability (?format=bitmap|rle) — no per-seat objects.
+# Seats are addressed by grid position: row_index * cols + (number - 1).
+# seat_id_runs maps positions 0, 1, 2, … to seat ids as [first_seat_id, count]
+# runs of consecutive ids ([0, count] = positions without a seat).
+
+
+class EventAvailabilityCompact(BaseModel):
+    event_id: int
+    format: Literal["bitmap", "rle"]
+    rows: int
+    cols: int
+    total_seats: int
+    available_seats: int
+    booked_seats: int
+    seat_id_runs: List[List[int]]
+    booked_bitmap: Optional[str] = None        # base64, MSB-first, 1 = booked
+    booked_runs: Optional[List[List[int]]] = None  # [start_position, length] of booked positions
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import Literal
+
+
+# Organizer-side waiting-room settings for one event
+class QueueConfig(BaseModel):
+    admit_per_second: float = Field(gt=0)
+    admission_window_seconds: int = Field(default=120, gt=0)
+
+
+# Customer-side view of a queue token
+class QueueTicket(BaseModel):
+    event_id: int
+    token: str
+    state: Literal["waiting", "admitted", "expired"]
+    position: int               # 0 once admitted
+    estimated_wait_seconds: float
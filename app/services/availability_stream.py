@@ -0,0 +1,200 @@
+# app/services/availability_stream.py
+"""
+Server-Sent Events for seat availability — GET /events/{id}/availability/stream.
+
+Instead of polling the full availability document, a client opens one stream
+and receives a snapshot followed by deltas only:
+
+  event: snapshot   data: EventAvailability JSON (as cached)
+  event: booked     data: {"event_id", "seat_ids", "version"}
+
+Deltas come from the booking path: after each commit booking_service calls
+publish_booked, which PUBLISHes on availability:{event_id}:changes.
+
+Each web process holds ONE Redis connection for all of its streams: a hub
+task PSUBSCRIBEs availability:*:changes and fans messages out to per-client
+asyncio queues, so thousands of idle subscribers cost a queue each, not a
+connection or a thread.  A client that falls behind (queue full) or rides out
+a hub reconnect gets a fresh snapshot instead of a gap.
+
+Seat sets only grow, so deltas are idempotent and may arrive out of version
+order; a delta whose version the last snapshot already covers is skipped.
+"""
+import asyncio
+import json
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+from loguru import logger
+
+from app.db.cache import make_async_client, redis_client
+
+_PATTERN = "availability:*:changes"
+_QUEUE_SIZE = 256
+_KEEPALIVE_SECONDS = 15
+_HUB_READY_TIMEOUT_SECONDS = 5
+_RECONNECT_SECONDS = 1
+
+
+def _channel(event_id: int) -> str:
+    return f"availability:{event_id}:changes"
+
+
+def publish_booked(event_id: int, seat_ids: list, version: Optional[int]) -> None:
+    """Booking path: announce seats committed for an event. Call after the commit."""
+    try:
+        redis_client.publish(_channel(event_id), json.dumps({
+            "event_id": event_id,
+            "seat_ids": list(seat_ids),
+            "version": version,
+        }))
+    except Exception as e:
+        logger.warning(f"STREAM ERROR publishing for event {event_id}: {e}")
+
+
+class Subscriber:
+    __slots__ = ("queue", "resync")
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        self.resync = False
+
+    def offer(self, data: str) -> None:
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.resync = True
+
+
+class _Hub:
+    """One PSUBSCRIBE per event loop, fanned out to every stream on it."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.subscribers: Dict[int, Set[Subscriber]] = {}
+        self.ready = asyncio.Event()
+        self.task = loop.create_task(self._run())
+
+    def _resync_all(self) -> None:
+        for subscribers in self.subscribers.values():
+            for subscriber in subscribers:
+                subscriber.resync = True
+                subscriber.offer("")  # wake it up
+
+    async def _run(self) -> None:
+        while True:
+            client = make_async_client()
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(_PATTERN)
+                async for message in pubsub.listen():
+                    if message["type"] == "psubscribe":
+                        self.ready.set()
+                        logger.info(f"STREAM hub listening on {_PATTERN}")
+                    elif message["type"] == "pmessage":
+                        event_id = int(message["channel"].split(":")[1])
+                        for subscriber in self.subscribers.get(event_id, ()):
+                            subscriber.offer(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"STREAM hub lost its connection: {e}")
+            finally:
+                self.ready.clear()
+                self._resync_all()
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(_RECONNECT_SECONDS)
+
+
+_hub: Optional[_Hub] = None
+
+
+def _current_hub() -> _Hub:
+    global _hub
+    loop = asyncio.get_running_loop()
+    if _hub is None or _hub.loop is not loop:
+        _hub = _Hub(loop)
+    return _hub
+
+
+async def subscribe(event_id: int) -> Subscriber:
+    """
+    Registers a stream for event_id and waits until the hub is subscribed,
+    so a snapshot taken afterwards can't miss a delta.
+    """
+    hub = _current_hub()
+    subscriber = Subscriber()
+    hub.subscribers.setdefault(event_id, set()).add(subscriber)
+    try:
+        await asyncio.wait_for(hub.ready.wait(), _HUB_READY_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        # Stream anyway; the first snapshot is replaced once the hub is up
+        subscriber.resync = True
+    return subscriber
+
+
+def unsubscribe(event_id: int, subscriber: Subscriber) -> None:
+    hub = _current_hub()
+    subscribers = hub.subscribers.get(event_id)
+    if subscribers is not None:
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del hub.subscribers[event_id]
+
+
+def _sse(event: str, data, event_id: Optional[int] = None) -> bytes:
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode()
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {data}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+async def events(
+    event_id: int,
+    subscriber: Subscriber,
+    snapshot: bytes,
+    load_snapshot: Callable[[], Awaitable[bytes]],
+) -> AsyncIterator[bytes]:
+    """
+    The SSE body: snapshot, then booked deltas, keepalive comments while idle.
+    On a resync it waits for the hub to be subscribed again, then awaits
+    load_snapshot() for a fresh snapshot — taken after, never before, the
+    subscription that carries the deltas following it.
+    """
+    hub = _current_hub()
+    try:
+        version = json.loads(snapshot).get("version") or 0
+        yield _sse("snapshot", snapshot, version)
+        while True:
+            if subscriber.resync:
+                while not hub.ready.is_set():
+                    try:
+                        await asyncio.wait_for(hub.ready.wait(), _KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        yield b": keepalive\n\n"
+                subscriber.resync = False
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                snapshot = await load_snapshot()
+                version = json.loads(snapshot).get("version") or 0
+                yield _sse("snapshot", snapshot, version)
+                continue
+
+            try:
+                data = await asyncio.wait_for(subscriber.queue.get(), _KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if not data:
+                continue  # wake-up for a resync
+            delta = json.loads(data)
+            if delta["version"] is not None and delta["version"] <= version:
+                continue
+            yield _sse("booked", data, delta["version"])
+    finally:
+        unsubscribe(event_id, subscriber)
@@ -0,0 +1,128 @@
+# app/services/booking_batcher.py
+"""
+Group commit for bookings — coalesces concurrent requests for the same event.
+
+Under a flash sale every request pays its own COMMIT (and WAL fsync) for the
+same hot event.  The coalescer lets the first request for an event become the
+batch *leader*: it waits up to BOOKING_BATCH_WINDOW_MS (or until
+BOOKING_BATCH_MAX_SIZE requests have joined), then commits the whole batch in
+one transaction through commit_fn.  Followers block until the leader hands
+them their own outcome — a booking or the HTTPException it would have raised.
+
+Batches are per process: requests for the same event on different uvicorn
+workers or dynos still commit separately and are arbitrated by _event_seat_uc.
+
+A follower waits at most wait_seconds for its outcome and then raises
+TimeoutError; its booking may still commit after that.  Whatever happens to
+the leader, every follower's outcome is set before the leader returns.
+
+Only the leader's session is used.  A follower hands its session to release
+before it starts waiting, so a burst of followers doesn't sit on the pool
+connections their earlier reads checked out.  Exceptions are raised as a
+fresh copy in each caller: one instance raised in several threads would
+have its __traceback__ rewritten under the others.
+"""
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+
+class _Pending:
+    __slots__ = ("booking_in", "user_id", "outcome", "done")
+
+    def __init__(self, booking_in, user_id: int):
+        self.booking_in = booking_in
+        self.user_id = user_id
+        self.outcome: Any = None
+        self.done = threading.Event()
+
+
+class _Batch:
+    __slots__ = ("items", "full", "closed")
+
+    def __init__(self):
+        self.items: List[_Pending] = []
+        self.full = threading.Event()
+        self.closed = False
+
+
+# commit_fn(db, [(booking_in, user_id), ...]) -> [booking or Exception, ...] in the same order
+CommitFn = Callable[[Session, List[Tuple[Any, int]]], List[Any]]
+
+
+def _fresh(exc: BaseException) -> BaseException:
+    """A copy of exc for this thread to raise (no __traceback__ shared with other callers)."""
+    # Not copy.copy: that re-runs __init__ with .args, which HTTPException doesn't keep
+    clone = type(exc).__new__(type(exc))
+    clone.args = exc.args
+    clone.__dict__.update(exc.__dict__)
+    return clone
+
+
+class BookingCoalescer:
+    def __init__(
+        self, commit_fn: CommitFn, *, window_ms: float, max_size: int, wait_seconds: float,
+        release: Optional[Callable[[Session], None]] = None,
+    ):
+        self._commit_fn = commit_fn
+        self._release = release
+        self.window_ms = window_ms
+        self.max_size = max_size
+        self.wait_seconds = wait_seconds
+        self._lock = threading.Lock()
+        self._open: Dict[int, _Batch] = {}
+
+    def _close(self, event_id: int, batch: _Batch) -> None:
+        # Caller holds self._lock
+        if not batch.closed:
+            batch.closed = True
+            if self._open.get(event_id) is batch:
+                del self._open[event_id]
+
+    def submit(self, db: Session, *, booking_in, user_id: int):
+        """
+        Joins (or opens) the event's current batch and blocks until it is committed.
+        Returns this request's booking or raises this request's exception;
+        TimeoutError if a follower's batch hasn't finished within wait_seconds.
+        The leader's db session runs the batch; a follower's only goes to release.
+        """
+        event_id = booking_in.event_id
+        pending = _Pending(booking_in, user_id)
+
+        with self._lock:
+            batch = self._open.get(event_id)
+            leader = batch is None
+            if leader:
+                batch = self._open[event_id] = _Batch()
+            batch.items.append(pending)
+            if len(batch.items) >= self.max_size:
+                self._close(event_id, batch)
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window_ms / 1000)
+            with self._lock:
+                self._close(event_id, batch)
+            self._run(db, batch)
+        else:
+            if self._release is not None:
+                self._release(db)
+            if not pending.done.wait(self.wait_seconds):
+                raise TimeoutError(f"Booking batch for event {event_id} took over {self.wait_seconds}s")
+
+        if isinstance(pending.outcome, BaseException):
+            raise _fresh(pending.outcome) from pending.outcome
+        return pending.outcome
+
+    def _run(self, db: Session, batch: _Batch) -> None:
+        outcomes: List[Any] = []
+        try:
+            outcomes = self._commit_fn(db, [(p.booking_in, p.user_id) for p in batch.items])
+        except Exception as exc:  # whole-batch failure: every caller sees it
+            outcomes = [exc] * len(batch.items)
+        finally:
+            # Also reached on BaseException in the leader: no follower is left waiting
+            for i, pending in enumerate(batch.items):
+                pending.outcome = outcomes[i] if i < len(outcomes) else RuntimeError("Booking batch aborted")
+                pending.done.set()
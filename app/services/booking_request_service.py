@@ -0,0 +1,195 @@
+# app/services/booking_request_service.py
+"""
+Asynchronous booking mode — POST /bookings/?mode=async.
+
+The web dyno validates the intent, records it in Redis and returns 202 with a
+request id.  Celery workers commit intents later, one event at a time and in
+arrival order, so a contended on-sale never ties up web dynos or their DB
+connections.
+
+Redis layout:
+  booking_request:{request_id}       HASH  status, event_id, user_id, seat_ids,
+                                           booking_id, detail, status_code,
+                                           attempted (set before the DB commit)
+  booking_requests:{event_id}        LIST  pending request ids, FIFO
+  booking_requests:{event_id}:lock   STR   held by the worker draining this event
+
+Any worker can be handed an event; the one that wins the lock drains the list
+until it is empty, so per-event order holds however many workers run.
+
+The commit and the HSET recording its outcome can't be atomic, so an intent
+is flagged "attempted" before its commit.  If the worker dies in between,
+the retry finds the flag and looks for the user's booking of those seats
+instead of booking again — which would 409 on seats it already holds.
+"""
+import uuid
+from typing import List, Optional
+from fastapi import HTTPException, status
+from loguru import logger
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.core.config import settings
+from app.db.cache import redis_client
+from app.db.session import SessionLocal
+from app.models.booking import Booking, Ticket
+from app.services import booking_service, seat_bitmap
+from app.worker import process_booking_requests
+
+_LOCK_TTL_SECONDS = 30
+
+
+def _request_key(request_id: str) -> str:
+    return f"booking_request:{request_id}"
+
+
+def _queue_key(event_id: int) -> str:
+    return f"booking_requests:{event_id}"
+
+
+def _lock_key(event_id: int) -> str:
+    return f"booking_requests:{event_id}:lock"
+
+
+def _to_schema(request_id: str, data: dict) -> schemas.BookingRequestStatus:
+    return schemas.BookingRequestStatus(
+        request_id=request_id,
+        status=data["status"],
+        event_id=int(data["event_id"]),
+        seat_ids=[int(s) for s in data["seat_ids"].split(",") if s],
+        booking_id=int(data["booking_id"]) if data.get("booking_id") else None,
+        status_code=int(data["status_code"]) if data.get("status_code") else None,
+        detail=data.get("detail") or None,
+    )
+
+
+def submit(db: Session, *, booking_in: schemas.BookingCreate, user_id: int) -> schemas.BookingRequestStatus:
+    """
+    Validates and enqueues a booking intent. Returns the pending request.
+    Unknown events get 404 and seats the bitmap already marks as sold 409,
+    synchronously; 503 if the intent can't be recorded in Redis.
+    """
+    if not booking_in.seat_ids:
+        raise HTTPException(status_code=422, detail="seat_ids must not be empty.")
+    if len(set(booking_in.seat_ids)) != len(booking_in.seat_ids):
+        raise HTTPException(status_code=422, detail="seat_ids must not contain duplicates.")
+    taken = seat_bitmap.find_booked(booking_in.event_id, booking_in.seat_ids)
+    if taken is None:
+        # No bitmap yet: building it is also the event's existence check
+        if not seat_bitmap.rebuild(db, booking_in.event_id):
+            raise HTTPException(status_code=404, detail="Event not found")
+        taken = seat_bitmap.find_booked(booking_in.event_id, booking_in.seat_ids)
+    if taken:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="One or more of the selected seats are already booked.",
+        )
+
+    request_id = uuid.uuid4().hex
+    data = {
+        "status": "pending",
+        "event_id": booking_in.event_id,
+        "user_id": user_id,
+        "seat_ids": ",".join(str(s) for s in booking_in.seat_ids),
+    }
+    try:
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.hset(_request_key(request_id), mapping=data)
+        pipe.expire(_request_key(request_id), settings.BOOKING_REQUEST_TTL_SECONDS)
+        pipe.rpush(_queue_key(booking_in.event_id), request_id)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"BOOKING REQUEST ERROR on submit for event {booking_in.event_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Async booking is temporarily unavailable.",
+        )
+
+    process_booking_requests.delay(booking_in.event_id)
+    logger.info(f"Booking request {request_id} queued for event {booking_in.event_id}")
+    return _to_schema(request_id, {k: str(v) for k, v in data.items()})
+
+
+def get_status(request_id: str, user_id: int) -> schemas.BookingRequestStatus:
+    """Single HGETALL. 404 for unknown, expired or someone else's request."""
+    data = redis_client.hgetall(_request_key(request_id))
+    if not data or data.get("user_id") != str(user_id):
+        raise HTTPException(status_code=404, detail="Booking request not found")
+    return _to_schema(request_id, data)
+
+
+def _finish(request_id: str, **fields) -> None:
+    redis_client.hset(_request_key(request_id), mapping={
+        k: v for k, v in fields.items() if v is not None
+    })
+
+
+def _existing_booking_id(db: Session, user_id: int, event_id: int, seat_ids: List[int]) -> Optional[int]:
+    """The user's booking holding exactly these seats for the event, if one was committed."""
+    return (
+        db.query(Ticket.booking_id)
+        .join(Booking, Booking.id == Ticket.booking_id)
+        .filter(Booking.user_id == user_id, Ticket.event_id == event_id, Ticket.seat_id.in_(seat_ids))
+        .group_by(Ticket.booking_id)
+        .having(func.count() == len(seat_ids))
+        .scalar()
+    )
+
+
+def _process_one(db: Session, request_id: str) -> None:
+    data = redis_client.hgetall(_request_key(request_id))
+    if not data or data["status"] != "pending":
+        return
+    req = _to_schema(request_id, data)
+    user_id = int(data["user_id"])
+    if data.get("attempted"):
+        booking_id = _existing_booking_id(db, user_id, req.event_id, req.seat_ids)
+        if booking_id is not None:
+            logger.info(f"Booking request {request_id} was committed before a retry: booking {booking_id}")
+            _finish(request_id, status="confirmed", booking_id=booking_id, status_code=200)
+            return
+    _finish(request_id, attempted=1)
+    try:
+        booking = booking_service.create_new_booking(
+            db,
+            booking_in=schemas.BookingCreate(event_id=req.event_id, seat_ids=req.seat_ids),
+            user_id=user_id,
+        )
+        _finish(request_id, status="confirmed", booking_id=booking.id, status_code=200)
+    except HTTPException as exc:
+        _finish(request_id, status="rejected", status_code=exc.status_code, detail=exc.detail)
+
+
+def drain(event_id: int) -> int:
+    """
+    Worker side: commits every pending intent for one event, oldest first.
+    Returns the number processed (0 if another worker holds the event's lock).
+    """
+    processed = 0
+    while redis_client.set(_lock_key(event_id), "1", nx=True, ex=_LOCK_TTL_SECONDS):
+        db = SessionLocal()
+        try:
+            while True:
+                request_id: Optional[str] = redis_client.lpop(_queue_key(event_id))
+                if request_id is None:
+                    break
+                redis_client.expire(_lock_key(event_id), _LOCK_TTL_SECONDS)
+                try:
+                    _process_one(db, request_id)
+                except Exception:
+                    # Infrastructure failure, not a booking outcome — put the intent
+                    # back at the head so order is kept and the task retry sees it
+                    redis_client.lpush(_queue_key(event_id), request_id)
+                    raise
+                processed += 1
+        finally:
+            db.close()
+            redis_client.delete(_lock_key(event_id))
+        # An intent pushed after our last LPOP but before the lock was released
+        # found the lock taken and its task returned — pick it up ourselves.
+        if not redis_client.llen(_queue_key(event_id)):
+            break
+    if processed:
+        logger.info(f"Drained {processed} booking requests for event {event_id}")
+    return processed
@@ -1,21 +1,356 @@
+from typing import Optional, Union
+from sqlalchemy import text
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from loguru import logger
 
-from app.services import cache_service
+from app.services import (
+    availability_stream, event_service, hold_service, inventory_service, seat_bitmap,
+)
+from app.services.booking_batcher import BookingCoalescer
 from app.worker import send_booking_confirmation
 from app import models, schemas
+from app.core.config import settings
 from app.crud import crud_event, crud_user
 from app.models.event import Event
 
+TICKET_PRICE = 150.00
+
+
+# Single round trip: booking row, all ticket rows, the event_inventory update,
+# and the seat columns the response needs.  LEFT JOINs keep the booking row
+# when seat_ids is empty (and when the event has no inventory row).
+# With record_inventory false the UPDATE matches no row and takes no lock —
+# group commit counts the whole batch once, right before its COMMIT.
+_BULK_INSERT_BOOKING_SQL = text("""
+    WITH new_booking AS (
+        INSERT INTO booking (user_id, status)
+        VALUES (:user_id, 'confirmed')
+        RETURNING id, booking_time
+    ),
+    new_tickets AS (
+        INSERT INTO ticket (price, booking_id, event_id, seat_id)
+        SELECT :price, new_booking.id, :event_id, requested.seat_id
+        FROM new_booking,
+             unnest(CAST(:seat_ids AS integer[])) WITH ORDINALITY AS requested(seat_id, ord)
+        ORDER BY requested.ord
+        RETURNING id, price, booking_id, seat_id
+    ),
+    inventory AS (
+        UPDATE event_inventory
+        SET booked_seats = booked_seats + (SELECT count(*) FROM new_tickets),
+            updated_at = now()
+        WHERE event_id = :event_id AND CAST(:record_inventory AS boolean)
+        RETURNING total_seats, booked_seats
+    )
+    SELECT new_booking.id          AS booking_id,
+           new_booking.booking_time AS booking_time,
+           new_tickets.id          AS ticket_id,
+           new_tickets.price       AS price,
+           seat.id                 AS seat_id,
+           seat."row"              AS seat_row,
+           seat.number             AS seat_number,
+           inventory.total_seats   AS inventory_total,
+           inventory.booked_seats  AS inventory_booked
+    FROM new_booking
+    LEFT JOIN inventory ON true
+    LEFT JOIN new_tickets ON new_tickets.booking_id = new_booking.id
+    LEFT JOIN seat ON seat.id = new_tickets.seat_id
+    ORDER BY new_tickets.id
+""")
+
+
+def _insert_booking_orm(
+    db: Session, *, event_id: int, seat_ids: list[int], user_id: int, price: float
+) -> tuple[models.Booking, Optional[tuple]]:
+    """
+    ORM write path: flush for booking.id, one Ticket object per seat, commit,
+    then re-query with joinedload to populate the response.
+    Returns (booking, inventory counters from inventory_service.record_booked).
+    """
+    # 1. Create the parent Booking record
+    db_booking = models.Booking(user_id=user_id)
+    db.add(db_booking)
+    db.flush()  # Gets booking.id without committing
+
+    # 2. Create a Ticket for each requested seat
+    for seat_id in seat_ids:
+        db_ticket = models.Ticket(
+            price=price,
+            booking_id=db_booking.id,
+            event_id=event_id,
+            seat_id=seat_id,
+        )
+        db.add(db_ticket)
+
+    # 3. Flush — UniqueConstraint(_event_seat_uc) enforced HERE by PostgreSQL —
+    #    then count the seats in event_inventory and commit both together
+    db.flush()
+    inventory = inventory_service.record_booked(db, event_id, len(seat_ids))
+    db.commit()
+
+    # 4. Re-query with joinedload to fully populate tickets→seat + tickets→event→venue
+    booking = (
+        db.query(models.Booking)
+        .options(
+            joinedload(models.Booking.tickets).joinedload(models.Ticket.seat),
+            joinedload(models.Booking.tickets).joinedload(models.Ticket.event).joinedload(models.Event.venue),
+        )
+        .filter(models.Booking.id == db_booking.id)
+        .first()
+    )
+    return booking, inventory
+
+
+def _execute_bulk_insert(
+    db: Session, *, event_id: int, seat_ids: list[int], user_id: int, price: float,
+    record_inventory: bool = True,
+) -> list:
+    """
+    Runs _BULK_INSERT_BOOKING_SQL in the current transaction (no commit). Returns its rows.
+    record_inventory=False leaves event_inventory (and its row lock) to the caller.
+    """
+    return db.execute(
+        _BULK_INSERT_BOOKING_SQL,
+        {
+            "user_id": user_id,
+            "price": price,
+            "event_id": event_id,
+            "seat_ids": list(seat_ids),
+            "record_inventory": record_inventory,
+        },
+    ).all()
+
+
+def _inventory_from_rows(rows: list) -> Optional[tuple]:
+    """(total, booked) from the inventory columns of _BULK_INSERT_BOOKING_SQL rows."""
+    if not rows or rows[0].inventory_total is None:
+        return None
+    return rows[0].inventory_total, rows[0].inventory_booked
+
+
+def _booking_from_rows(rows: list, event_out: schemas.Event) -> schemas.Booking:
+    """Builds the response from _BULK_INSERT_BOOKING_SQL rows — no re-query."""
+    return schemas.Booking(
+        id=rows[0].booking_id,
+        booking_time=rows[0].booking_time,
+        tickets=[
+            schemas.Ticket(
+                id=r.ticket_id,
+                price=r.price,
+                seat=schemas.Seat(id=r.seat_id, row=r.seat_row, number=r.seat_number),
+                event=event_out,
+            )
+            for r in rows
+            if r.ticket_id is not None
+        ],
+    )
+
+
+def _insert_booking_bulk(
+    db: Session, *, event: Event, seat_ids: list[int], user_id: int, price: float
+) -> tuple[schemas.Booking, Optional[tuple]]:
+    """
+    Bulk write path: booking + all tickets + the event_inventory update in ONE
+    statement (data-modifying CTE), then commit.  The response is built from
+    the RETURNING rows and the event already loaded by the caller — no flush,
+    no re-query.  Returns (booking, inventory counters).
+    """
+    rows = _execute_bulk_insert(
+        db, event_id=event.id, seat_ids=seat_ids, user_id=user_id, price=price
+    )
+
+    # UniqueConstraint(_event_seat_uc) enforced by PostgreSQL during the INSERT above
+    db.commit()
+
+    return _booking_from_rows(rows, schemas.Event.model_validate(event)), _inventory_from_rows(rows)
+
+
+def _already_booked() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="One or more of the selected seats are already booked.",
+    )
+
+
+def reject_if_sold_out(event_id: int) -> None:
+    """409 at once if the event's sold-out flag is set — one Redis EXISTS, no DB."""
+    if inventory_service.is_sold_out(event_id):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="This event is sold out.")
+
+
+def _after_commit(event_id: int, seat_ids: list[int], inventory: Optional[tuple]) -> None:
+    """
+    Redis side effects of committed tickets. Run once per commit, never before it.
+    inventory is the (total, booked) event_inventory row as of that commit.
+    """
+    if inventory is not None:
+        inventory_service.publish(event_id, *inventory)
+    # Bitmap first: a rows= read tagged with the availability version must
+    # never carry a bitmap older than that version
+    seat_bitmap.mark_booked(event_id, seat_ids)
+    version = event_service.apply_booked_seats(event_id, seat_ids)
+    availability_stream.publish_booked(event_id, seat_ids, version)
+
+
+def commit_booking_batch(db: Session, items: list[tuple]) -> list:
+    """
+    Group commit: books every (booking_in, user_id) in items — all for the same
+    event — in ONE transaction, first come first served.
+
+    Each booking runs in its own SAVEPOINT so a losing request rolls back alone;
+    seats already won earlier in the batch are rejected in memory without a
+    round trip.  Returns, in order, a schemas.Booking or the HTTPException that
+    request would have raised on the per-request path.
+
+    event_inventory is updated once, right before COMMIT, so its row lock is
+    the last lock the batch takes.  Taken per item, it would be held across
+    the later items' ticket INSERTs: a second batch for the event whose ticket
+    rows one of them waits on, itself waiting for the counter row, deadlocks.
+    """
+    event_id = items[0][0].event_id
+    event = crud_event.get_event(db, event_id=event_id)
+    if not event:
+        return [HTTPException(status_code=404, detail="Event not found")] * len(items)
+
+    user_ids = {user_id for _, user_id in items}
+    users = {
+        u.id: u for u in db.query(models.User).filter(models.User.id.in_(user_ids))
+    }
+    event_out = schemas.Event.model_validate(event)
+
+    claimed: set = set()
+    committed = []
+    outcomes: list = []
+    for booking_in, user_id in items:
+        if user_id not in users:
+            outcomes.append(HTTPException(status_code=404, detail="User not found"))
+            continue
+        seats = set(booking_in.seat_ids)
+        if seats & claimed or len(seats) != len(booking_in.seat_ids):
+            outcomes.append(_already_booked())
+            continue
+        try:
+            with db.begin_nested():
+                rows = _execute_bulk_insert(
+                    db, event_id=event_id, seat_ids=booking_in.seat_ids,
+                    user_id=user_id, price=TICKET_PRICE, record_inventory=False,
+                )
+        except IntegrityError:
+            outcomes.append(_already_booked())
+            continue
+        claimed |= seats
+        booking = _booking_from_rows(rows, event_out)
+        outcomes.append(booking)
+        committed.append((booking, booking_in, users[user_id]))
+
+    inventory = inventory_service.record_booked(db, event_id, len(claimed)) if claimed else None
+    # One COMMIT (one WAL flush) for every booking in the batch
+    db.commit()
+
+    if committed:
+        _after_commit(event_id, sorted(claimed), inventory)
+        for booking, booking_in, user in committed:
+            send_booking_confirmation.delay(booking.id, user.email)
+            logger.info(
+                f"Booking {booking.id} created for user {user.id}, "
+                f"event {event_id}, seats {booking_in.seat_ids} (batch of {len(items)})"
+            )
+    return outcomes
+
+
+_coalescer = BookingCoalescer(
+    commit_booking_batch,
+    window_ms=settings.BOOKING_BATCH_WINDOW_MS,
+    max_size=settings.BOOKING_BATCH_MAX_SIZE,
+    wait_seconds=settings.BOOKING_BATCH_WAIT_SECONDS,
+    # A follower's reads so far are done with; end them so its pool
+    # connection goes back while it waits on the leader
+    release=lambda db: db.rollback(),
+)
+
 
 def create_new_booking(
     db: Session, *, booking_in: schemas.BookingCreate, user_id: int
-) -> models.Booking:
+) -> Union[models.Booking, schemas.Booking]:
+    """
+    Claims the seats in Redis, then commits the booking in PostgreSQL.
+
+    Bookings for a sold-out event (inventory_service's flag) get 409 first.
+    With SEAT_BITMAP_ENABLED, seats the event's booked-seat bitmap already
+    marks as sold are rejected with 409 before anything else runs.
+    With SEAT_HOLDS_ENABLED, every seat must be free or already held by this
+    user; a seat held by someone else is rejected with 409 before any DB
+    transaction is opened.  Holds are released if the booking fails and left
+    to expire if it succeeds, so late requests for sold seats keep being shed
+    in Redis for the hold TTL.  If Redis is down the hold step is skipped and
+    _event_seat_uc alone decides.
+    With BOOKING_BATCH_ENABLED, the commit goes through the per-event group
+    commit coalescer (see booking_batcher) instead of its own transaction.
+    """
+    reject_if_sold_out(booking_in.event_id)
+    if settings.SEAT_BITMAP_ENABLED:
+        _reject_known_conflicts(db, booking_in)
+
+    held = False
+    if settings.SEAT_HOLDS_ENABLED:
+        conflicts = hold_service.claim_seats(
+            booking_in.event_id, booking_in.seat_ids, user_id
+        )
+        if conflicts:
+            logger.info(
+                f"Hold conflict: user {user_id} lost seats {conflicts} "
+                f"for event {booking_in.event_id} in Redis"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="One or more of the selected seats are held by another customer.",
+            )
+        held = conflicts is not None
+
+    try:
+        if settings.BOOKING_BATCH_ENABLED:
+            try:
+                return _coalescer.submit(db, booking_in=booking_in, user_id=user_id)
+            except TimeoutError:
+                logger.error(f"Booking batch for event {booking_in.event_id} timed out for user {user_id}")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="The booking is taking longer than expected; check your bookings before retrying.",
+                )
+        return _commit_booking(db, booking_in=booking_in, user_id=user_id)
+    except Exception:
+        if held:
+            hold_service.release_seats(booking_in.event_id, user_id, booking_in.seat_ids)
+        raise
+
+
+def _reject_known_conflicts(db: Session, booking_in: schemas.BookingCreate) -> None:
+    """
+    Bitmap pre-check: 409 in microseconds for seats already known to be sold.
+    Builds the event's bitmap from the ticket table the first time it is missing.
+    """
+    taken = seat_bitmap.find_booked(booking_in.event_id, booking_in.seat_ids)
+    if taken is None and seat_bitmap.rebuild(db, booking_in.event_id):
+        taken = seat_bitmap.find_booked(booking_in.event_id, booking_in.seat_ids)
+    if taken:
+        logger.info(
+            f"Bitmap conflict: seats {taken} for event {booking_in.event_id} already booked"
+        )
+        raise _already_booked()
+
+
+def _commit_booking(
+    db: Session, *, booking_in: schemas.BookingCreate, user_id: int
+) -> Union[models.Booking, schemas.Booking]:
     """
     Creates a new booking in an atomic transaction.
     Rolls back if any seat is already booked for the given event.
+
+    settings.BOOKING_WRITE_MODE selects the write path:
+      "orm"  — ORM objects + flush + re-query (default)
+      "bulk" — single INSERT ... RETURNING round trip, response built in memory
     """
     event = crud_event.get_event(db, event_id=booking_in.event_id)
     if not event:
@@ -25,40 +360,20 @@ def create_new_booking(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    ticket_price = 150.00
-
     try:
-        # 1. Create the parent Booking record
-        db_booking = models.Booking(user_id=user_id)
-        db.add(db_booking)
-        db.flush()  # Gets booking.id without committing
-
-        # 2. Create a Ticket for each requested seat
-        for seat_id in booking_in.seat_ids:
-            db_ticket = models.Ticket(
-                price=ticket_price,
-                booking_id=db_booking.id,
-                event_id=booking_in.event_id,
-                seat_id=seat_id,
+        if settings.BOOKING_WRITE_MODE == "bulk":
+            db_booking, inventory = _insert_booking_bulk(
+                db, event=event, seat_ids=booking_in.seat_ids,
+                user_id=user_id, price=TICKET_PRICE,
             )
-            db.add(db_ticket)
-
-        # 3. Commit — UniqueConstraint(_event_seat_uc) enforced HERE by PostgreSQL
-        db.commit()
-
-        # 4. Re-query with joinedload to fully populate tickets→seat + tickets→event→venue
-        db_booking = (
-            db.query(models.Booking)
-            .options(
-                joinedload(models.Booking.tickets).joinedload(models.Ticket.seat),
-                joinedload(models.Booking.tickets).joinedload(models.Ticket.event).joinedload(models.Event.venue),
+        else:
+            db_booking, inventory = _insert_booking_orm(
+                db, event_id=booking_in.event_id, seat_ids=booking_in.seat_ids,
+                user_id=user_id, price=TICKET_PRICE,
             )
-            .filter(models.Booking.id == db_booking.id)
-            .first()
-        )
 
-        # 5. Invalidate the availability cache for this event
-        cache_service.delete_from_cache(f"availability:{booking_in.event_id}")
+        # 5. Invalidate the availability cache + mark the seats in the conflict bitmap
+        _after_commit(booking_in.event_id, booking_in.seat_ids, inventory)
 
         # 6. Fire async email confirmation via Celery/RabbitMQ
         send_booking_confirmation.delay(db_booking.id, user.email)
@@ -75,10 +390,30 @@ def create_new_booking(
             f"Booking conflict: user {user_id} tried to book "
             f"seats {booking_in.seat_ids} for event {booking_in.event_id} — already taken"
         )
+        raise _already_booked()
+
+
+def hold_seats(*, hold_in: schemas.SeatHoldCreate, user_id: int) -> schemas.SeatHold:
+    """
+    Explicitly holds seats for the user (e.g. while they fill in payment details).
+    A later create_new_booking for the same seats by the same user goes through.
+    """
+    conflicts = hold_service.claim_seats(hold_in.event_id, hold_in.seat_ids, user_id)
+    if conflicts is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Seat holds are temporarily unavailable.",
+        )
+    if conflicts:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail="One or more of the selected seats are already booked.",
+            detail=f"Seats {conflicts} are held by another customer.",
         )
+    return schemas.SeatHold(
+        event_id=hold_in.event_id,
+        seat_ids=hold_in.seat_ids,
+        expires_in_seconds=settings.SEAT_HOLD_TTL_SECONDS,
+    )
 
 
 def get_my_bookings(db: Session, *, user_id: int) -> list[models.Booking]:
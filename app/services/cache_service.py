@@ -1,65 +1,440 @@
 # app/services/cache_service.py
 import json
+import math
+import zlib
+import random
 import time
-from typing import Any, Optional
+import uuid
+from typing import Any, Callable, Optional, Tuple
+import redis
 from loguru import logger
-from app.db.cache import redis_client
+from app.core.config import settings
+from app.db.cache import redis_client, redis_raw_client
+from app.services import local_cache
+
+try:
+    import orjson
+except ImportError:  # optional — stdlib json is the fallback
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional — stdlib json is the fallback
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # optional — zlib is the fallback
+    lz4_frame = None
 
 # ── Metric key names stored in Redis ─────────────────────────────────────────
 _HITS_KEY      = "metrics:cache_hits"
 _MISSES_KEY    = "metrics:cache_misses"
 _HIT_LAT_KEY   = "metrics:cache_hit_total_ms"   # sum of hit latencies
 _MISS_LAT_KEY  = "metrics:cache_miss_total_ms"  # sum of miss (DB) latencies
+_WAITS_KEY     = "metrics:cache_stampede_waits"  # misses that waited on another rebuild
+_STALE_KEY     = "metrics:cache_stale_served"    # ...and then got the stale copy
+_EARLY_KEY     = "metrics:cache_early_refreshes" # rebuilds started before the TTL ran out
+_WRITES_KEY    = "metrics:cache_writes"
+_RAW_BYTES_KEY = "metrics:cache_bytes_raw"       # encoded size before compression
+_STORED_KEY    = "metrics:cache_bytes_stored"    # bytes actually written to Redis
 
+# Optimistic read-modify-write attempts before update_cached gives up and drops the key
+_CAS_RETRIES = 5
 
-def get_from_cache(key: str) -> Optional[Any]:
-    """Retrieves and deserializes data from the cache. Returns None on any Redis error."""
-    try:
-        t0 = time.monotonic()
-        cached_data = redis_client.get(key)
-        elapsed_ms = (time.monotonic() - t0) * 1000
 
-        if cached_data:
-            logger.debug(f"CACHE HIT for key: {key}")
-            redis_client.incr(_HITS_KEY)
-            redis_client.incrbyfloat(_HIT_LAT_KEY, elapsed_ms)
-            return json.loads(cached_data)
+_WAIT_POLL_SECONDS = 0.02
+
+# KEYS: lock   ARGV: token — release only a lock we still own
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_release_lock = redis_client.register_script(_RELEASE_LOCK_LUA)
+
+# KEYS: key, stale   ARGV: ttl — an invalidated value becomes {key}:stale for
+# the readers that lose the rebuild race, and lives only as long as a rebuild may
+_RETIRE_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+    redis.call('EXPIRE', KEYS[2], ARGV[1])
+    return 1
+end
+return 0
+"""
+_retire = redis_client.register_script(_RETIRE_LUA)
+
+# KEYS: version, log   ARGV: entry, max entries, ttl — bump and log in one step,
+# so a reader that sees version N also sees the entry for N
+_BUMP_AND_LOG_LUA = """
+local v = redis.call('INCR', KEYS[1])
+redis.call('ZADD', KEYS[2], v, v .. ':' .. ARGV[1])
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -tonumber(ARGV[2]) - 1)
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return v
+"""
+_bump_and_log = redis_client.register_script(_BUMP_AND_LOG_LUA)
+
+# KEYS: version, log   ARGV: since — the current version and every entry after `since`
+_READ_LOG_LUA = """
+local v = redis.call('GET', KEYS[1])
+if not v then return false end
+return {tonumber(v), redis.call('ZRANGEBYSCORE', KEYS[2], '(' .. ARGV[1], v)}
+"""
+_read_log = redis_client.register_script(_READ_LOG_LUA)
+
+
+# ── Value codecs ─────────────────────────────────────────────────────────────
+# Cached values are bytes (redis_raw_client).  The first byte tags the codec
+# that wrote them, so processes on different CACHE_CODEC settings can read
+# each other's values during a rollout:
+#   \x01 orjson    \x02 msgpack    anything else — untagged stdlib JSON
+# Plain JSON stays untagged so values written before codecs existed still
+# decode, and JSON-family values can be passed through to HTTP responses.
+_ORJSON_TAG  = b"\x01"
+_MSGPACK_TAG = b"\x02"
+
+# Compression wraps the codec output (tag included) when it reaches
+# CACHE_COMPRESS_MIN_BYTES:   \x03 zlib    \x04 lz4 frame
+_ZLIB_TAG = b"\x03"
+_LZ4_TAG  = b"\x04"
+_ZLIB_LEVEL = 1   # ~7x on availability JSON at a third of level 6's cost
+
+
+def _encode(value: Any) -> bytes:
+    codec = settings.CACHE_CODEC
+    if codec == "orjson" and orjson is not None:
+        return _ORJSON_TAG + orjson.dumps(value, default=str)
+    if codec == "msgpack" and msgpack is not None:
+        return _MSGPACK_TAG + msgpack.packb(value, default=str, use_bin_type=True)
+    return json.dumps(value, default=str).encode()
 
-        logger.debug(f"CACHE MISS for key: {key}")
-        redis_client.incr(_MISSES_KEY)
-        return None
-    except Exception as e:
-        logger.warning(f"CACHE ERROR on get for key '{key}': {e}")
-        return None
 
+def _compress(data: bytes) -> bytes:
+    if settings.CACHE_COMPRESSION == "none" or len(data) < settings.CACHE_COMPRESS_MIN_BYTES:
+        return data
+    if settings.CACHE_COMPRESSION == "lz4" and lz4_frame is not None:
+        return _LZ4_TAG + lz4_frame.compress(data)
+    return _ZLIB_TAG + zlib.compress(data, _ZLIB_LEVEL)
 
-def record_db_latency(elapsed_ms: float):
-    """Call this after a DB query that was triggered by a cache miss."""
+
+def _pack(value: Any) -> bytes:
+    """Codec, then compression above the size threshold. Records sizes for get_metrics."""
+    data = _encode(value)
+    stored = _compress(data)
     try:
-        redis_client.incrbyfloat(_MISS_LAT_KEY, elapsed_ms)
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.incr(_WRITES_KEY)
+        pipe.incrby(_RAW_BYTES_KEY, len(data))
+        pipe.incrby(_STORED_KEY, len(stored))
+        pipe.execute()
     except Exception:
         pass
+    return stored
+
+
+def _unwrap(stored: bytes) -> bytes:
+    """Undoes _pack's compression; codec-tagged (or plain JSON) bytes pass through."""
+    tag = stored[:1]
+    if tag == _ZLIB_TAG:
+        return zlib.decompress(stored[1:])
+    if tag == _LZ4_TAG:
+        if lz4_frame is None:
+            raise RuntimeError("lz4-compressed cache value but lz4 is not installed")
+        return lz4_frame.decompress(stored[1:])
+    return stored
+
+
+def _decode(data: bytes) -> Any:
+    tag = data[:1]
+    if tag == _ORJSON_TAG:
+        # orjson output is plain JSON, so stdlib can read it if orjson is missing here
+        return orjson.loads(data[1:]) if orjson is not None else json.loads(data[1:])
+    if tag == _MSGPACK_TAG:
+        if msgpack is None:
+            raise RuntimeError("msgpack-encoded cache value but msgpack is not installed")
+        return msgpack.unpackb(data[1:], raw=False)
+    return json.loads(data)
+
+
+def _json_bytes(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=str)
+    return json.dumps(value, default=str).encode()
+
+
+def _as_json(data: bytes) -> bytes:
+    """The stored value as JSON bytes — free for JSON codecs, a re-encode for msgpack."""
+    tag = data[:1]
+    if tag == _ORJSON_TAG:
+        return data[1:]
+    if tag == _MSGPACK_TAG:
+        return _json_bytes(_decode(data))
+    return data
+
+
+def _record_hit(elapsed_ms: float):
+    redis_client.incr(_HITS_KEY)
+    redis_client.incrbyfloat(_HIT_LAT_KEY, elapsed_ms)
+
+
+def _decoded(data: bytes, raw: bool) -> Any:
+    return _as_json(data) if raw else _decode(data)
+
+
+def _rebuild(key: str, build: Callable[[], Any], ex: int, token: str, on_miss: bool, raw: bool) -> Any:
+    """Runs build() while holding key's rebuild lock; records its duration for early refresh."""
+    try:
+        t0 = time.monotonic()
+        value = build()
+        elapsed_ms = (time.monotonic() - t0) * 1000
+        try:
+            pipe = redis_raw_client.pipeline(transaction=False)
+            pipe.set(f"{key}:delta", round(elapsed_ms, 2), ex=ex)
+            pipe.delete(f"{key}:stale")  # build() wrote the fresh value
+            if on_miss:
+                pipe.incrbyfloat(_MISS_LAT_KEY, elapsed_ms)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"CACHE ERROR recording rebuild of key '{key}': {e}")
+        return _json_bytes(value) if raw else value
+    finally:
+        try:
+            _release_lock(keys=[f"{key}:lock"], args=[token])
+        except Exception:
+            pass
+
+
+def get_or_build(key: str, build: Callable[[], Any], *, ex: int = 300, raw: bool = False) -> Any:
+    """
+    Cache-aside read with stampede protection. build() loads from the source
+    of truth, writes key itself (so callers keep control of how) and returns the value.
+
+    - Single flight: on a miss only the reader that wins {key}:lock rebuilds.
+      The others poll for up to CACHE_REBUILD_WAIT_MS, then take {key}:stale
+      (the value an invalidation just replaced, kept only until the rebuild
+      lands), and only build themselves if there is none.
+    - Early refresh (XFetch): a hit rebuilds ahead of expiry with probability
+      rising as the TTL nears the last rebuild time ({key}:delta), so hot keys
+      are refreshed by one reader instead of expiring under all of them.
+    Falls straight through to build() if Redis is down.
+    With LOCAL_CACHE_ENABLED, a fresh in-process copy is returned before any of this.
+    raw=True returns JSON bytes instead of decoded values (JSON-codec hits are never parsed).
+    """
+    found, data = local_cache.get(key)
+    if found:
+        return _decoded(data, raw)
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    # Set once this reader holds the lock: True for a miss, False for an early refresh.
+    # build() runs outside the try below, so its own errors (a 404, a DB error)
+    # propagate from one call instead of being retried as a Redis failure.
+    rebuild_on_miss = None
+    try:
+        generation = local_cache.generation()
+        t0 = time.monotonic()
+        pipe = redis_raw_client.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.pttl(key)
+        pipe.get(f"{key}:delta")
+        cached_data, ttl_ms, delta_ms = pipe.execute()
+        elapsed_ms = (time.monotonic() - t0) * 1000
+
+        if cached_data:
+            logger.debug(f"CACHE HIT for key: {key}")
+            _record_hit(elapsed_ms)
+            if ttl_ms > 0 and delta_ms:
+                # XFetch: refresh when  delta * beta * -ln(U)  reaches the remaining TTL
+                gap = float(delta_ms) * settings.CACHE_EARLY_REFRESH_BETA * -math.log(1.0 - random.random())
+                if gap >= ttl_ms and redis_client.set(
+                    lock_key, token, nx=True, ex=settings.CACHE_REBUILD_LOCK_SECONDS
+                ):
+                    rebuild_on_miss = False
+                    logger.debug(f"CACHE EARLY REFRESH for key: {key} ({ttl_ms} ms left)")
+                    redis_client.incr(_EARLY_KEY)
+            if rebuild_on_miss is None:
+                data = _unwrap(cached_data)
+                local_cache.put(key, data, generation)
+                return _decoded(data, raw)
+        else:
+            logger.debug(f"CACHE MISS for key: {key}")
+            redis_client.incr(_MISSES_KEY)
+            if redis_client.set(lock_key, token, nx=True, ex=settings.CACHE_REBUILD_LOCK_SECONDS):
+                rebuild_on_miss = True
+            else:
+                redis_client.incr(_WAITS_KEY)
+                deadline = time.monotonic() + settings.CACHE_REBUILD_WAIT_MS / 1000
+                while time.monotonic() < deadline:
+                    time.sleep(_WAIT_POLL_SECONDS)
+                    cached_data = redis_raw_client.get(key)
+                    if cached_data:
+                        return _decoded(_unwrap(cached_data), raw)
+                stale = redis_raw_client.get(f"{key}:stale")
+                if stale:
+                    logger.debug(f"CACHE STALE served for key: {key}")
+                    redis_client.incr(_STALE_KEY)
+                    return _decoded(_unwrap(stale), raw)
+    except Exception as e:
+        logger.warning(f"CACHE ERROR on get_or_build for key '{key}': {e}")
+    if rebuild_on_miss is not None:
+        return _rebuild(key, build, ex, token, on_miss=rebuild_on_miss, raw=raw)
+    value = build()
+    return _json_bytes(value) if raw else value
 
 
 def set_to_cache(key: str, value: Any, ex: int = 300):
-    """Serializes and stores data in the cache. Silently skips if Redis is down."""
+    """
+    Serializes (CACHE_CODEC), compresses if large (CACHE_COMPRESSION) and stores
+    data in the cache. Silently skips if Redis is down.
+    """
     try:
-        serialized_data = json.dumps(value, default=str)
-        redis_client.set(key, serialized_data, ex=ex)
+        redis_raw_client.set(key, _pack(value), ex=ex)
+        local_cache.publish_invalidation(key)
         logger.debug(f"CACHE SET for key: {key}")
     except Exception as e:
         logger.warning(f"CACHE ERROR on set for key '{key}': {e}")
 
 
 def delete_from_cache(key: str):
-    """Deletes a key from the cache. Silently skips if Redis is down."""
+    """
+    Invalidates a key: its value moves to {key}:stale for at most
+    CACHE_REBUILD_LOCK_SECONDS (see get_or_build). Silently skips if Redis is down.
+    """
     try:
-        redis_client.delete(key)
+        _retire(keys=[key, f"{key}:stale"], args=[settings.CACHE_REBUILD_LOCK_SECONDS])
+        local_cache.publish_invalidation(key)
         logger.debug(f"CACHE INVALIDATED for key: {key}")
     except Exception as e:
         logger.warning(f"CACHE ERROR on delete for key '{key}': {e}")
 
 
+def get_version(version_key: str) -> Optional[int]:
+    """
+    Current value of a version counter, creating it at 0 if it was never
+    bumped (so changes_since() can answer for it). None if Redis is down.
+    """
+    try:
+        with redis_client.pipeline() as pipe:
+            pipe.set(version_key, 0, nx=True)
+            pipe.get(version_key)
+            _, version = pipe.execute()
+        return int(version)
+    except Exception as e:
+        logger.warning(f"CACHE ERROR on version read for key '{version_key}': {e}")
+        return None
+
+
+def peek_version(version_key: str) -> Optional[int]:
+    """A version counter's value via one GET, without creating it. None if missing or Redis is down."""
+    try:
+        version = redis_client.get(version_key)
+    except Exception as e:
+        logger.warning(f"CACHE ERROR on version read for key '{version_key}': {e}")
+        return None
+    return None if version is None else int(version)
+
+
+def bump_version(version_key: str, *, log_key: Optional[str] = None, entry: str = "") -> Optional[int]:
+    """
+    Increments a version counter and returns the new value. None if Redis is down.
+    With log_key, `entry` is appended to that changelog under the new version,
+    atomically; the log keeps the last AVAILABILITY_CHANGELOG_SIZE entries.
+    """
+    try:
+        if log_key is None:
+            return int(redis_client.incr(version_key))
+        return int(_bump_and_log(
+            keys=[version_key, log_key],
+            args=[entry, settings.AVAILABILITY_CHANGELOG_SIZE, settings.AVAILABILITY_CHANGELOG_TTL_SECONDS],
+        ))
+    except Exception as e:
+        logger.warning(f"CACHE ERROR on version bump for key '{version_key}': {e}")
+        return None
+
+
+def changes_since(version_key: str, log_key: str, since: int) -> Optional[Tuple[int, list]]:
+    """
+    (current version, entries logged after version `since`, oldest first).
+    None when the log can't cover `since` — counter missing or behind it,
+    entries trimmed or expired, Redis down — and the caller needs a full read.
+    """
+    try:
+        result = _read_log(keys=[version_key, log_key], args=[since])
+    except Exception as e:
+        logger.warning(f"CACHE ERROR on changelog read for key '{log_key}': {e}")
+        return None
+    if result is None:
+        return None
+    version, members = int(result[0]), result[1]
+    if since > version or len(members) != version - since:
+        return None
+    return version, [m.split(":", 1)[1] for m in members]
+
+
+def set_if_version(key: str, value: Any, *, version_key: str, version: int, ex: int = 300) -> bool:
+    """
+    Stores value only if version_key still holds `version` — a rebuild that
+    raced a write doesn't overwrite fresher data with its older snapshot.
+    """
+    try:
+        with redis_raw_client.pipeline() as pipe:
+            pipe.watch(version_key)
+            if int(pipe.get(version_key) or 0) != version:
+                pipe.unwatch()
+                logger.debug(f"CACHE SET skipped for key: {key} (version moved on)")
+                return False
+            pipe.multi()
+            pipe.set(key, _pack(value), ex=ex)
+            pipe.execute()
+        local_cache.publish_invalidation(key)
+        logger.debug(f"CACHE SET for key: {key} (version {version})")
+        return True
+    except redis.WatchError:
+        logger.debug(f"CACHE SET skipped for key: {key} (version moved on)")
+        return False
+    except Exception as e:
+        logger.warning(f"CACHE ERROR on versioned set for key '{key}': {e}")
+        return False
+
+
+def update_cached(key: str, patch: Callable[[Any], Optional[Any]]) -> bool:
+    """
+    Atomic read-modify-write of a cached value (WATCH/MULTI, retried on contention).
+    patch gets the decoded value and returns the new one, or None to drop the key.
+    The key's TTL is kept. Returns True if a patched value was written; a miss
+    or a dropped key returns False (the next reader rebuilds).
+    """
+    try:
+        with redis_raw_client.pipeline() as pipe:
+            for _ in range(_CAS_RETRIES):
+                try:
+                    pipe.watch(key)
+                    data = pipe.get(key)
+                    if data is None:
+                        pipe.unwatch()
+                        return False
+                    updated = patch(_decode(_unwrap(data)))
+                    pipe.multi()
+                    if updated is None:
+                        pipe.rename(key, f"{key}:stale")
+                        pipe.expire(f"{key}:stale", settings.CACHE_REBUILD_LOCK_SECONDS)
+                    else:
+                        pipe.set(key, _pack(updated), keepttl=True)
+                    pipe.execute()
+                    local_cache.publish_invalidation(key)
+                    logger.debug(f"CACHE {'PATCHED' if updated is not None else 'INVALIDATED'} for key: {key}")
+                    return updated is not None
+                except redis.WatchError:
+                    continue
+        logger.debug(f"CACHE contention on key: {key}, dropping it")
+    except Exception as e:
+        logger.warning(f"CACHE ERROR on update for key '{key}': {e}")
+    delete_from_cache(key)
+    return False
+
+
 def get_metrics() -> dict:
     """Return current cache performance metrics as a dict."""
     try:
@@ -67,6 +442,12 @@ def get_metrics() -> dict:
         misses     = int(redis_client.get(_MISSES_KEY) or 0)
         hit_lat    = float(redis_client.get(_HIT_LAT_KEY)  or 0.0)
         miss_lat   = float(redis_client.get(_MISS_LAT_KEY) or 0.0)
+        waits      = int(redis_client.get(_WAITS_KEY)  or 0)
+        stale      = int(redis_client.get(_STALE_KEY)  or 0)
+        early      = int(redis_client.get(_EARLY_KEY)  or 0)
+        writes     = int(redis_client.get(_WRITES_KEY) or 0)
+        raw_bytes  = int(redis_client.get(_RAW_BYTES_KEY) or 0)
+        stored     = int(redis_client.get(_STORED_KEY)    or 0)
         total      = hits + misses
         hit_rate   = round(hits / total * 100, 1) if total else 0.0
         avg_hit_ms = round(hit_lat / hits, 2)   if hits   else 0.0
@@ -78,6 +459,14 @@ def get_metrics() -> dict:
             "hit_rate_pct":   hit_rate,
             "avg_cache_ms":   avg_hit_ms,
             "avg_db_ms":      avg_mis_ms,
+            "stampede_waits": waits,
+            "stale_served":   stale,
+            "early_refreshes": early,
+            "writes":         writes,
+            "avg_stored_bytes": round(stored / writes) if writes else 0,
+            "compression_ratio": round(raw_bytes / stored, 2) if stored else 1.0,
+            # Per process — only this worker's in-process tier
+            "local_cache":    local_cache.stats(),
         }
     except Exception as e:
         logger.warning(f"METRICS ERROR: {e}")
@@ -1,14 +1,27 @@
 # app/services/event_service.py
+import base64
+import hashlib
+import hmac
+import json
+import re
+from typing import Optional
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
-from datetime import datetime, timezone, time
+from datetime import datetime, timedelta, timezone, time
 from loguru import logger
 
+from app.core.config import settings
 from app.models.event import Venue, Event, Seat
 from app.models.booking import Ticket
-from app.schemas.event import VenueCreate, EventCreate
-from app.services.cache_service import get_from_cache, set_to_cache, delete_from_cache, record_db_latency
+from app.crud import crud_event
+from app import schemas
+from app.schemas.event import VenueCreate, EventCreate, EventAvailability
+from app.services.cache_service import (
+    delete_from_cache, get_or_build, set_to_cache,
+    get_version, peek_version, bump_version, changes_since, set_if_version, update_cached,
+)
+from app.services import inventory_service, seat_bitmap, seat_layout
 
 
 # ─────────────────────────────────────────
@@ -40,8 +53,12 @@ def create_venue(db: Session, venue_in: VenueCreate) -> Venue:
                 ))
 
         db.add_all(seats)
+        db.flush()  # seat ids for the layout cache
+        layout_seats = [(s.id, s.row, s.number) for s in seats]
         db.commit()
         db.refresh(venue)
+        seat_layout.store(venue.id, venue.rows, venue.cols, layout_seats)
+        bump_version(_VENUES_VERSION_KEY)  # invalidates every cached venues page
         logger.info(f"Venue '{venue.name}' created with {len(seats)} seats")
         return venue
 
@@ -67,9 +84,10 @@ def get_venue(db: Session, venue_id: int) -> Venue:
 def create_event(db: Session, event_in: EventCreate, organizer_id: int) -> Event:
     """
     Creates an event, verifies venue exists, primes availability cache.
-    Single commit, single eager-load query after commit.
+    Single commit (event + its event_inventory row), single eager-load query after commit.
     """
     get_venue(db, event_in.venue_id)  # raises 404 if venue doesn't exist
+    total_seats = len(seat_layout.get_layout(db, event_in.venue_id).seats)
 
     event = Event(
         name=event_in.name,
@@ -80,7 +98,10 @@ def create_event(db: Session, event_in: EventCreate, organizer_id: int) -> Event
         organizer_id=organizer_id,
     )
     db.add(event)
+    db.flush()  # event.id for the inventory row
+    inventory_service.create(db, event.id, total_seats)
     db.commit()
+    inventory_service.publish(event.id, total_seats, 0, overwrite=True)
 
     # Single query with joinedload — loads venue relationship for Pydantic serialization
     event = (
@@ -90,14 +111,41 @@ def create_event(db: Session, event_in: EventCreate, organizer_id: int) -> Event
         .first()
     )
 
-    # Invalidate stale events list cache + prime fresh availability cache
-    delete_from_cache("events_list")
+    # Invalidate every cached events page + prime fresh availability cache
+    bump_version(_EVENTS_VERSION_KEY)
+    get_version(_event_version_key(event.id))
+    # Rebuilds merge into an existing bitmap; a new event's starts empty
+    seat_bitmap.clear(event.id)
     _build_and_cache_availability(db, event.id)
 
     logger.info(f"Event '{event.name}' (id={event.id}) created by organizer {organizer_id}")
     return event
 
 
+# Version counters behind the public ETags — see endpoints/public.py
+_EVENTS_VERSION_KEY = "events:version"
+
+
+def _event_version_key(event_id: int) -> str:
+    return f"event:{event_id}:version"
+
+
+def get_events_version() -> Optional[int]:
+    """Version of the upcoming-events list, bumped by create_event. None if Redis is down."""
+    return get_version(_EVENTS_VERSION_KEY)
+
+
+def get_event_version(event_id: int, *, create: bool = False) -> Optional[int]:
+    """
+    Version of one event's details. Events can't be edited yet, so it stays 0.
+    Missing counters are only created with create=True — i.e. once the caller
+    knows the event exists — never for arbitrary ids.
+    """
+    if create:
+        return get_version(_event_version_key(event_id))
+    return peek_version(_event_version_key(event_id))
+
+
 def get_event(db: Session, event_id: int) -> Event:
     """Fetches a single event with its venue eagerly loaded."""
     event = (
@@ -111,42 +159,195 @@ def get_event(db: Session, event_id: int) -> Event:
     return event
 
 
-def get_all_events(db: Session) -> list:
+def get_organized_event(db: Session, event_id: int, organizer_id: int) -> Event:
+    """get_event, but 403 unless the event belongs to this organizer."""
+    event = get_event(db, event_id)
+    if event.organizer_id != organizer_id:
+        raise HTTPException(status_code=403, detail="You are not the organizer of this event.")
+    return event
+
+
+# ─────────────────────────────────────────
+# LISTINGS (keyset pages)
+# ─────────────────────────────────────────
+# GET /events/ and /venues/ page by keyset — (event_time, id) and id — so a
+# deep page seeks on an index instead of skipping OFFSET rows.  Cursors are
+# the last row's key as base64url JSON plus an HMAC of it (SECRET_KEY): opaque
+# to clients, and only cursors this server handed out are accepted.
+#
+# Each page is cached as {"next_cursor", "items"} under a key that carries the
+# list's version counter, so create_event / create_venue invalidate every page
+# with one INCR and a rebuild can never store under a newer version:
+#   events_list:{YYYY-MM-DD}:{version}:{limit}:{cursor}
+#   venues_list:{version}:{limit}:{cursor}
+# "Upcoming" starts at the day's UTC midnight, so event pages also carry the
+# day and never outlive it — yesterday's list is never served.
+#
+# Only PAGE_SIZE_DEFAULT pages are cached, and the key holds the re-encoded
+# cursor, so clients can't mint keys: there is one per page of the current
+# list.  Other sizes are built from PostgreSQL on every request.
+
+_VENUES_VERSION_KEY = "venues:version"
+_VENUES_LIST_TTL_SECONDS = 3600
+# Caps the event pages' TTL too: pages left behind by a version bump go
+# within minutes, not at midnight
+_EVENTS_LIST_TTL_SECONDS = 300
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _cursor_signature(payload: str) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode(), payload.encode(), hashlib.sha256).digest()
+    return _b64(digest[:12])
+
+
+def _encode_cursor(*key) -> str:
+    payload = _b64(json.dumps(key, separators=(",", ":")).encode())
+    return f"{payload}.{_cursor_signature(payload)}"
+
+
+def _decode_cursor(cursor: str) -> list:
+    payload, _, signature = cursor.partition(".")
+    key = None
+    if hmac.compare_digest(signature.encode(), _cursor_signature(payload).encode()):
+        try:
+            key = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        except ValueError:
+            pass
+    if not isinstance(key, list):
+        raise HTTPException(status_code=422, detail="Invalid cursor.")
+    return key
+
+
+def _page(rows: list, limit: int, serialize, key_of) -> dict:
+    """rows holds up to limit + 1 rows; the extra one only says there is a next page."""
+    items = rows[:limit]
+    next_cursor = _encode_cursor(*key_of(items[-1])) if len(rows) > limit else None
+    return {"next_cursor": next_cursor, "items": [serialize(row) for row in items]}
+
+
+def _cached_page(key: Optional[str], build, *, ex: int, raw: bool):
+    """A page via get_or_build; built uncached without a key (Redis down, or an odd page size)."""
+    if key is None:
+        page = build()
+        return json.dumps(page, default=str).encode() if raw else page
+
+    def build_and_cache():
+        page = build()
+        set_to_cache(key, page, ex=ex)
+        return page
+
+    return get_or_build(key, build_and_cache, ex=ex, raw=raw)
+
+
+def get_events_page(db: Session, *, cursor: Optional[str] = None, limit: int = 100, raw: bool = False):
     """
-    Returns all upcoming events as ORM objects.
-    Always queries DB — ORM objects cannot be safely round-tripped
-    through Redis, so caching here would require full deserialization.
-    Availability caching (the expensive query) is handled separately.
+    One page of upcoming events, ordered by (event_time, id), as
+    {"next_cursor", "items": [schemas.Event dicts]}; next_cursor is None on
+    the last page. raw=True returns the cached JSON bytes as-is, so a hit
+    never touches the session (no pool connection is checked out).
     """
-    today_utc = datetime.now(timezone.utc).date()
-    start_of_today_utc = datetime.combine(today_utc, time.min, tzinfo=timezone.utc)
+    after = None
+    if cursor is not None:
+        key = _decode_cursor(cursor)
+        try:
+            after = (datetime.fromisoformat(key[0]), int(key[1]))
+        except (IndexError, TypeError, ValueError):
+            raise HTTPException(status_code=422, detail="Invalid cursor.")
+        cursor = _encode_cursor(*key)
 
-    return (
-        db.query(Event)
-        .options(joinedload(Event.venue))
-        .filter(Event.event_time >= start_of_today_utc)
-        .order_by(Event.event_time)
-        .all()
+    now = datetime.now(timezone.utc)
+    today_utc = now.date()
+    next_midnight = datetime.combine(today_utc + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    ttl = max(1, min(_EVENTS_LIST_TTL_SECONDS, int((next_midnight - now).total_seconds())))
+    version = get_events_version() if limit == settings.PAGE_SIZE_DEFAULT else None
+    key = None
+    if version is not None:
+        key = f"events_list:{today_utc.isoformat()}:{version}:{limit}:{cursor or ''}"
+
+    return _cached_page(
+        key,
+        lambda: _page(
+            crud_event.get_events(db, after=after, limit=limit + 1),
+            limit,
+            lambda e: schemas.Event.model_validate(e).model_dump(mode="json"),
+            lambda e: (e.event_time.isoformat(), e.id),
+        ),
+        ex=ttl,
+        raw=raw,
+    )
+
+
+def get_venues_version() -> Optional[int]:
+    """Version of the venue list, bumped by create_venue. None if Redis is down."""
+    return get_version(_VENUES_VERSION_KEY)
+
+
+def get_venues_page(db: Session, *, cursor: Optional[str] = None, limit: int = 100, raw: bool = False):
+    """One page of venues ordered by id, shaped like get_events_page's."""
+    after_id = None
+    if cursor is not None:
+        key = _decode_cursor(cursor)
+        if len(key) != 1 or not isinstance(key[0], int):
+            raise HTTPException(status_code=422, detail="Invalid cursor.")
+        after_id = key[0]
+        cursor = _encode_cursor(*key)
+
+    version = get_venues_version() if limit == settings.PAGE_SIZE_DEFAULT else None
+    key = None if version is None else f"venues_list:{version}:{limit}:{cursor or ''}"
+    return _cached_page(
+        key,
+        lambda: _page(
+            crud_event.get_venues(db, after_id=after_id, limit=limit + 1),
+            limit,
+            lambda v: schemas.Venue.model_validate(v).model_dump(mode="json"),
+            lambda v: (v.id,),
+        ),
+        ex=_VENUES_LIST_TTL_SECONDS,
+        raw=raw,
     )
 
 
 # ─────────────────────────────────────────
 # AVAILABILITY
 # ─────────────────────────────────────────
+# availability:{id}          cached EventAvailability dict + "version"
+# availability:{id}:version  bumped once per committed booking
+#
+# Bookings patch the cached dict in place (apply_booked_seats). A rebuild
+# from PostgreSQL only happens on a cache miss or when the cached dict's
+# version isn't the one right before the booking's — i.e. it missed a write.
+
+_AVAILABILITY_TTL_SECONDS = 300
+
+
+def _availability_key(event_id: int) -> str:
+    return f"availability:{event_id}"
+
+
+def _availability_version_key(event_id: int) -> str:
+    return f"availability:{event_id}:version"
+
+
+def _availability_changelog_key(event_id: int) -> str:
+    return f"availability:{event_id}:changelog"
 
-def get_event_availability(db: Session, event_id: int) -> dict:
+
+def get_event_availability(db: Session, event_id: int, *, raw: bool = False):
     """
     Returns seat availability. Redis cache first, PostgreSQL fallback.
     Returned dict matches schemas.EventAvailability exactly.
+    Concurrent misses rebuild once (get_or_build's single-flight lock).
+    raw=True returns the cached JSON text, already validated when it was written.
     """
-    cached = get_from_cache(f"availability:{event_id}")
-    if cached:
-        return cached
-    import time as _time
-    t0 = _time.monotonic()
-    result = _build_and_cache_availability(db, event_id)
-    record_db_latency((_time.monotonic() - t0) * 1000)
-    return result
+    return get_or_build(
+        _availability_key(event_id),
+        lambda: _build_and_cache_availability(db, event_id),
+        ex=_AVAILABILITY_TTL_SECONDS,
+        raw=raw,
+    )
 
 
 def _build_and_cache_availability(db: Session, event_id: int) -> dict:
@@ -154,15 +355,15 @@ def _build_and_cache_availability(db: Session, event_id: int) -> dict:
     Queries DB for availability, stores in Redis (5-min TTL), returns dict.
     Dict shape must match schemas.EventAvailability:
       { total_seats, available_seats, booked_seats, available: [Seat], booked: [Seat] }
+    The version is read BEFORE the queries; if a booking bumps it meanwhile,
+    this snapshot may predate that booking and is returned but not cached.
     """
+    version = get_version(_availability_version_key(event_id))
     event = get_event(db, event_id)  # raises 404 if not found
 
-    all_seats = (
-        db.query(Seat)
-        .filter(Seat.venue_id == event.venue_id)
-        .order_by(Seat.row, Seat.number)
-        .all()
-    )
+    # Venue seats never change — shared, cached layout instead of a seat query
+    layout = seat_layout.get_layout(db, event.venue_id)
+    all_seats = layout.seats
 
     # Set comprehension for O(1) lookup — single optimised query
     booked_seat_ids = {
@@ -173,7 +374,8 @@ def _build_and_cache_availability(db: Session, event_id: int) -> dict:
     available_seats_list = [s for s in all_seats if s.id not in booked_seat_ids]
     booked_seats_list    = [s for s in all_seats if s.id in booked_seat_ids]
 
-    availability_data = {
+    # Validated once, here, on the way into the cache — hits are served as stored
+    availability_data = EventAvailability.model_validate({
         "total_seats":     len(all_seats),
         "available_seats": len(available_seats_list),
         "booked_seats":    len(booked_seats_list),
@@ -185,7 +387,223 @@ def _build_and_cache_availability(db: Session, event_id: int) -> dict:
             {"id": s.id, "row": s.row, "number": s.number}
             for s in booked_seats_list
         ],
+        "version": version,
+    }).model_dump()
+
+    if version is not None:
+        set_if_version(
+            _availability_key(event_id), availability_data,
+            version_key=_availability_version_key(event_id), version=version,
+            ex=_AVAILABILITY_TTL_SECONDS,
+        )
+    # Same rows feed the booking path's conflict pre-check — no extra queries
+    seat_bitmap.store(event_id, layout, all_seats, booked_seat_ids)
+    return availability_data
+
+
+def apply_booked_seats(event_id: int, seat_ids: list) -> Optional[int]:
+    """
+    Write-through after a booking commit: moves seat_ids from "available" to
+    "booked" in the cached availability and adjusts the counters, instead of
+    dropping the key and making the next reader rebuild from PostgreSQL.
+    Call once per commit, after it. Falls back to invalidation whenever the
+    cached dict can't be trusted to be exactly one booking behind.
+    The seat ids are logged under the new version for get_availability_delta.
+    Returns the availability version this booking produced (None if Redis is down).
+    """
+    version = bump_version(
+        _availability_version_key(event_id),
+        log_key=_availability_changelog_key(event_id),
+        entry=",".join(str(seat_id) for seat_id in seat_ids),
+    )
+    if version is None:
+        delete_from_cache(_availability_key(event_id))
+        return None
+    newly_booked = set(seat_ids)
+
+    def patch(data: dict):
+        if data.get("version") != version - 1:
+            return None
+        moved = [s for s in data["available"] if s["id"] in newly_booked]
+        if len(moved) != len(newly_booked):
+            return None
+        data["available"] = [s for s in data["available"] if s["id"] not in newly_booked]
+        data["booked"] = sorted(data["booked"] + moved, key=lambda s: (s["row"], s["number"]))
+        data["available_seats"] = len(data["available"])
+        data["booked_seats"] = len(data["booked"])
+        data["version"] = version
+        return data
+
+    update_cached(_availability_key(event_id), patch)
+    return version
+
+
+_SUMMARY_BATCH_LIMIT = 100
+
+
+def get_availability_summaries(db: Session, event_ids: list) -> list:
+    """
+    schemas.EventAvailabilitySummary for each existing event in event_ids, in
+    the order asked. Seat counts come from the events' inventory counters in
+    one Redis round trip; events whose counters aren't cached are read from
+    event_inventory together, in one query, and written back to Redis.
+    Unknown ids are left out.
+    """
+    event_ids = list(dict.fromkeys(event_ids))
+    if len(event_ids) > _SUMMARY_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=422, detail=f"At most {_SUMMARY_BATCH_LIMIT} event ids per request."
+        )
+    counts = inventory_service.get_counters_many(
+        event_ids, [_availability_version_key(i) for i in event_ids]
+    ) or {}
+
+    missing = [i for i in event_ids if i not in counts]
+    if missing:
+        for event_id, (total, booked) in inventory_service.load_counters(db, missing).items():
+            counts[event_id] = (total, booked, None)
+        logger.debug(f"Availability summaries: {len(missing)} of {len(event_ids)} read from event_inventory")
+
+    return [
+        {
+            "event_id":        event_id,
+            "total_seats":     counts[event_id][0],
+            "available_seats": counts[event_id][0] - counts[event_id][1],
+            "booked_seats":    counts[event_id][1],
+            "version":         counts[event_id][2],
+        }
+        for event_id in event_ids if event_id in counts
+    ]
+
+
+def get_availability_version(event_id: int) -> Optional[int]:
+    """The availability version counter via one GET. None if missing or Redis is down."""
+    return peek_version(_availability_version_key(event_id))
+
+
+def get_availability_delta(event_id: int, since: int) -> Optional[dict]:
+    """
+    schemas.EventAvailabilityDelta — seats booked after version `since`, read
+    from the event's changelog alone (no DB, no availability document).
+    None when the changelog no longer reaches back to `since`; the caller
+    then serves the full snapshot instead.
+    """
+    changes = changes_since(
+        _availability_version_key(event_id), _availability_changelog_key(event_id), since
+    )
+    if changes is None:
+        return None
+    version, entries = changes
+    return {
+        "since": since,
+        "version": version,
+        "booked_seat_ids": [int(seat_id) for entry in entries for seat_id in entry.split(",") if seat_id],
+    }
+
+
+def _encoded_snapshot(venue, seats, booked_seat_ids) -> tuple:
+    """(meta, bitmap) as seat_bitmap.snapshot would return them, encoded in process — Redis down."""
+    positions, bitmap = seat_bitmap.encode(venue, seats, booked_seat_ids)
+    meta = {
+        "rows": venue.rows,
+        "cols": venue.cols,
+        "total": len(positions),
+        "seat_id_runs": json.dumps(seat_bitmap.seat_id_runs(positions, venue.rows * venue.cols)),
     }
+    return meta, bitmap
+
+
+def get_event_availability_compact(db: Session, event_id: int, fmt: str) -> dict:
+    """
+    Availability as schemas.EventAvailabilityCompact (fmt "bitmap" or "rle").
+    Served from the event's booked-seat bitmap in Redis — kept current by
+    every booking commit — plus the venue's seat_id_runs stored beside it.
+    A missing bitmap is rebuilt first; with Redis down it is encoded from the DB.
+    The route tags the result with a digest of these bits rather than the
+    availability version, which a bitmap that missed a mark could lag.
+    """
+    snapshot = seat_bitmap.snapshot(event_id)
+    if snapshot is None:
+        loaded = seat_bitmap.load(db, event_id)
+        if loaded is None:
+            raise HTTPException(status_code=404, detail="Event not found")
+        seat_bitmap.store(event_id, *loaded)
+        snapshot = seat_bitmap.snapshot(event_id) or _encoded_snapshot(*loaded)
+    meta, bitmap = snapshot
 
-    set_to_cache(f"availability:{event_id}", availability_data, ex=300)
-    return availability_data
\ No newline at end of file
+    rows, cols, total = int(meta["rows"]), int(meta["cols"]), int(meta["total"])
+    # One char per position, so booked runs fall out of a C-level regex scan
+    bits = format(int.from_bytes(bitmap, "big"), f"0{len(bitmap) * 8}b")[: rows * cols]
+    booked = bits.count("1")
+    data = {
+        "event_id":        event_id,
+        "format":          fmt,
+        "rows":            rows,
+        "cols":            cols,
+        "total_seats":     total,
+        "available_seats": total - booked,
+        "booked_seats":    booked,
+        "seat_id_runs":    json.loads(meta["seat_id_runs"]),
+    }
+    if fmt == "bitmap":
+        data["booked_bitmap"] = base64.b64encode(bitmap).decode()
+    else:
+        data["booked_runs"] = [[m.start(), m.end() - m.start()] for m in re.finditer("1+", bits)]
+    return data
+
+
+def _parse_row_range(rows: str) -> tuple:
+    """ "C" or "A-F" -> (first, last) row indexes; 422 if malformed."""
+    labels = rows.upper().split("-")
+    if len(labels) > 2 or not all(label.isascii() and label.isalpha() for label in labels):
+        raise HTTPException(status_code=422, detail=f"rows must be a row or a range like A-F, got '{rows}'.")
+    return seat_bitmap.row_index(labels[0]), seat_bitmap.row_index(labels[-1])
+
+
+def get_event_availability_rows(db: Session, event_id: int, rows: str) -> dict:
+    """
+    schemas.EventAvailability limited to a row range ("A-F", or one row "C")
+    — counts and seat lists cover those rows only.
+
+    Read with one GETRANGE on the event's row-major booked-seat bitmap plus
+    the seat_id_runs beside it, so a slice costs work proportional to its
+    size rather than the venue's; the version is read atomically with it.
+    A missing bitmap is rebuilt first; with Redis down it is encoded from the DB.
+    """
+    first_row, last_row = _parse_row_range(rows)
+    version_key = _availability_version_key(event_id)
+    sliced = seat_bitmap.rows_snapshot(event_id, first_row, last_row, version_key)
+    if sliced is None:
+        loaded = seat_bitmap.load(db, event_id)
+        if loaded is None:
+            raise HTTPException(status_code=404, detail="Event not found")
+        seat_bitmap.store(event_id, *loaded)
+        sliced = seat_bitmap.rows_snapshot(event_id, first_row, last_row, version_key)
+        if sliced is None:
+            sliced = (*_encoded_snapshot(*loaded), 0, None)
+    meta, chunk, first_byte, version = sliced
+    cols = int(meta["cols"])
+    if not first_row <= last_row < int(meta["rows"]):
+        raise HTTPException(status_code=422, detail=f"Rows {rows} are not within this venue.")
+
+    seat_id_runs = json.loads(meta["seat_id_runs"])
+    base = first_byte * 8
+    bits = format(int.from_bytes(chunk, "big"), f"0{len(chunk) * 8}b") if chunk else ""
+    available, booked = [], []
+    for row in range(first_row, last_row + 1):
+        label = seat_bitmap.row_label(row)
+        start = row * cols
+        row_bits = bits[start - base:start - base + cols]
+        for offset, seat_id in enumerate(seat_bitmap.seat_ids_between(seat_id_runs, start, start + cols)):
+            if seat_id:
+                seat = {"id": seat_id, "row": label, "number": offset + 1}
+                (booked if row_bits[offset:offset + 1] == "1" else available).append(seat)
+
+    return {
+        "total_seats":     len(available) + len(booked),
+        "available_seats": len(available),
+        "booked_seats":    len(booked),
+        "available":       available,
+        "booked":          booked,
+        "version":         version,
+    }
@@ -0,0 +1,174 @@
+# app/services/hold_service.py
+"""
+Seat holds — short-lived, per-user claims on seats stored in Redis.
+
+A hold is taken atomically (Lua script) for ALL requested seats or none, so
+concurrent buyers of the same seat are resolved in Redis before any of them
+opens a PostgreSQL transaction.  PostgreSQL's _event_seat_uc stays the
+final guard; holds only keep losing requests away from it.
+
+Redis layout per event:
+  holds:{event_id}:owner   HASH  seat_id -> user_id
+  holds:{event_id}:expiry  ZSET  seat_id scored by expiry (ms, Redis clock)
+  holds:events             SET   event_ids with live holds (for the sweeper)
+
+An expired hold is treated as free by every script even before the sweeper
+removes it, so a slow sweeper never blocks a booking.
+"""
+from typing import List, Optional
+from loguru import logger
+
+from app.core.config import settings
+from app.db.cache import redis_client
+
+_EVENTS_KEY = "holds:events"
+
+
+def _owner_key(event_id: int) -> str:
+    return f"holds:{event_id}:owner"
+
+
+def _expiry_key(event_id: int) -> str:
+    return f"holds:{event_id}:expiry"
+
+
+# KEYS: owner, expiry, events   ARGV: event_id, user_id, ttl_ms, seat_id...
+# Returns {} on success, otherwise the seat ids held by someone else.
+_CLAIM_LUA = """
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local user = ARGV[2]
+local ttl = tonumber(ARGV[3])
+local conflicts = {}
+for i = 4, #ARGV do
+    local owner = redis.call('HGET', KEYS[1], ARGV[i])
+    if owner and owner ~= user then
+        local exp = tonumber(redis.call('ZSCORE', KEYS[2], ARGV[i]) or 0)
+        if exp > now then
+            table.insert(conflicts, ARGV[i])
+        end
+    end
+end
+if #conflicts > 0 then
+    return conflicts
+end
+for i = 4, #ARGV do
+    redis.call('HSET', KEYS[1], ARGV[i], user)
+    redis.call('ZADD', KEYS[2], now + ttl, ARGV[i])
+end
+if redis.call('PTTL', KEYS[1]) < ttl then
+    redis.call('PEXPIRE', KEYS[1], ttl)
+    redis.call('PEXPIRE', KEYS[2], ttl)
+end
+redis.call('SADD', KEYS[3], ARGV[1])
+return {}
+"""
+
+# KEYS: owner, expiry   ARGV: user_id, seat_id...  (no seat ids = all of the user's)
+# Returns the number of holds released.
+_RELEASE_LUA = """
+local user = ARGV[1]
+local seats = {}
+if #ARGV > 1 then
+    for i = 2, #ARGV do table.insert(seats, ARGV[i]) end
+else
+    local all = redis.call('HGETALL', KEYS[1])
+    for i = 1, #all, 2 do
+        if all[i + 1] == user then table.insert(seats, all[i]) end
+    end
+end
+local released = 0
+for _, seat in ipairs(seats) do
+    if redis.call('HGET', KEYS[1], seat) == user then
+        redis.call('HDEL', KEYS[1], seat)
+        redis.call('ZREM', KEYS[2], seat)
+        released = released + 1
+    end
+end
+return released
+"""
+
+# KEYS: owner, expiry, events   ARGV: event_id
+# Returns the number of expired holds removed.
+_SWEEP_LUA = """
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)
+for _, seat in ipairs(expired) do
+    redis.call('HDEL', KEYS[1], seat)
+end
+if #expired > 0 then
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+end
+if redis.call('ZCARD', KEYS[2]) == 0 then
+    redis.call('DEL', KEYS[1], KEYS[2])
+    redis.call('SREM', KEYS[3], ARGV[1])
+end
+return #expired
+"""
+
+_claim = redis_client.register_script(_CLAIM_LUA)
+_release = redis_client.register_script(_RELEASE_LUA)
+_sweep = redis_client.register_script(_SWEEP_LUA)
+
+
+def claim_seats(
+    event_id: int, seat_ids: List[int], user_id: int, ttl: Optional[int] = None
+) -> Optional[List[int]]:
+    """
+    Atomically holds every seat in seat_ids for user_id, or none of them.
+    Re-claiming seats the user already holds refreshes their TTL.
+    Returns [] on success, the conflicting seat ids on failure,
+    or None if Redis is unavailable (caller falls back to the DB constraint).
+    """
+    ttl_ms = (ttl or settings.SEAT_HOLD_TTL_SECONDS) * 1000
+    try:
+        conflicts = _claim(
+            keys=[_owner_key(event_id), _expiry_key(event_id), _EVENTS_KEY],
+            args=[event_id, user_id, ttl_ms, *seat_ids],
+        )
+        return [int(s) for s in conflicts]
+    except Exception as e:
+        logger.warning(f"HOLD ERROR on claim for event {event_id}: {e}")
+        return None
+
+
+def release_seats(event_id: int, user_id: int, seat_ids: Optional[List[int]] = None) -> int:
+    """Releases the user's holds on seat_ids (all of the user's holds if omitted)."""
+    try:
+        return int(_release(
+            keys=[_owner_key(event_id), _expiry_key(event_id)],
+            args=[user_id, *(seat_ids or [])],
+        ))
+    except Exception as e:
+        logger.warning(f"HOLD ERROR on release for event {event_id}: {e}")
+        return 0
+
+
+def get_held_seat_ids(event_id: int) -> set:
+    """Seat ids currently held (unexpired) by anyone for this event."""
+    try:
+        now_s, now_us = redis_client.time()
+        now_ms = now_s * 1000 + now_us // 1000
+        return {
+            int(s) for s in redis_client.zrangebyscore(_expiry_key(event_id), now_ms, "+inf")
+        }
+    except Exception as e:
+        logger.warning(f"HOLD ERROR on read for event {event_id}: {e}")
+        return set()
+
+
+def release_expired() -> int:
+    """Sweeper: drops expired holds for every event that has any. Returns count removed."""
+    removed = 0
+    try:
+        for event_id in redis_client.smembers(_EVENTS_KEY):
+            removed += int(_sweep(
+                keys=[_owner_key(event_id), _expiry_key(event_id), _EVENTS_KEY],
+                args=[event_id],
+            ))
+    except Exception as e:
+        logger.warning(f"HOLD ERROR during sweep: {e}")
+    if removed:
+        logger.info(f"Released {removed} expired seat holds")
+    return removed
@@ -0,0 +1,125 @@
+# app/services/idempotency_service.py
+"""
+Idempotency-Key support for POST /bookings/.
+
+The first request with a given key runs normally and its response — success
+or a client error such as 409 — is stored in Redis for IDEMPOTENCY_TTL_SECONDS.
+Retries with the same key get the stored response without touching Postgres.
+A retry that arrives while the first request is still running waits for it
+(up to IDEMPOTENCY_WAIT_SECONDS) instead of racing it.
+
+Redis layout:
+  idempotency:{user_id}:{key}   STRING  JSON {state, fingerprint[, status_code, body]}
+
+Keys are scoped per user, and the request fingerprint must match: reusing a key
+for a different payload is a 422, not a silent replay.
+"""
+import hashlib
+import json
+import time
+from typing import Any, Callable, Tuple
+from fastapi import HTTPException, status
+from loguru import logger
+
+from app.core.config import settings
+from app.db.cache import redis_client
+
+# How long an in-flight marker survives a crashed first request
+_IN_FLIGHT_TTL_SECONDS = 60
+_POLL_INTERVAL_SECONDS = 0.05
+
+# Outcomes a retry should re-run rather than replay
+_NOT_STORED = {status.HTTP_429_TOO_MANY_REQUESTS}
+
+
+def _key(user_id: int, idempotency_key: str) -> str:
+    return f"idempotency:{user_id}:{idempotency_key}"
+
+
+def fingerprint(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _wait_for_first(key: str, request_fingerprint: str) -> dict:
+    """Polls an in-flight key until it completes. Returns the stored record, or {} if it vanished."""
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        raw = redis_client.get(key)
+        if raw is None:
+            return {}
+        record = json.loads(raw)
+        if record["fingerprint"] != request_fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request body.",
+            )
+        if record["state"] == "done":
+            return record
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress.",
+                headers={"Retry-After": "1"},
+            )
+        time.sleep(_POLL_INTERVAL_SECONDS)
+
+
+def run(
+    user_id: int,
+    idempotency_key: str,
+    request_fingerprint: str,
+    attempt: Callable[[], Tuple[int, Any]],
+) -> Tuple[int, Any, bool]:
+    """
+    Runs attempt() at most once per (user, key).
+    attempt returns (status_code, json_body) or raises HTTPException.
+    Returns (status_code, json_body, replayed); a stored client error is
+    returned as data on replay, but raised as usual the first time.
+    If Redis is unavailable, attempt() simply runs.
+    """
+    key = _key(user_id, idempotency_key)
+    in_flight = json.dumps({"state": "pending", "fingerprint": request_fingerprint})
+    try:
+        while not redis_client.set(key, in_flight, nx=True, ex=_IN_FLIGHT_TTL_SECONDS):
+            record = _wait_for_first(key, request_fingerprint)
+            if record:
+                logger.info(f"Idempotent replay for user {user_id} key {idempotency_key}")
+                return record["status_code"], record["body"], True
+            # First request gave up without storing (5xx) — take over
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.warning(f"IDEMPOTENCY ERROR for key '{idempotency_key}': {e}")
+        status_code, body = attempt()
+        return status_code, body, False
+
+    def _store(status_code: int, body: Any) -> None:
+        try:
+            redis_client.set(key, json.dumps({
+                "state": "done",
+                "fingerprint": request_fingerprint,
+                "status_code": status_code,
+                "body": body,
+            }, default=str), ex=settings.IDEMPOTENCY_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"IDEMPOTENCY ERROR storing key '{idempotency_key}': {e}")
+
+    def _forget() -> None:
+        try:
+            redis_client.delete(key)
+        except Exception:
+            pass
+
+    try:
+        status_code, body = attempt()
+    except HTTPException as exc:
+        if exc.status_code < 500 and exc.status_code not in _NOT_STORED:
+            _store(exc.status_code, {"detail": exc.detail})
+        else:
+            _forget()
+        raise
+    except Exception:
+        _forget()
+        raise
+    _store(status_code, body)
+    return status_code, body, False
@@ -0,0 +1,251 @@
+# app/services/inventory_service.py
+"""
+Per-event seat counters — total, booked, available — without seat lists.
+
+Durable copy: the event_inventory table, one row per event.  create_event
+inserts it in the event's transaction and every booking adds its seats to
+booked_seats in the SAME transaction as its ticket INSERTs, so a committed
+ticket is always counted.  The UPDATE runs after the INSERTs, so the row
+lock — every booking for the event takes it — is held only until COMMIT.
+
+Fast copy: inventory:{event_id} in Redis (HASH total, booked), written after
+each commit from the row's post-UPDATE values.  Bookings only ever add seats,
+so writes keep the larger booked value: commits landing out of order, or a
+reader refilling the key from the table, can't lose or double-count a seat.
+
+Sold-out flag: soldout:{event_id}, set by the same script whenever the
+counters show no seat left and dropped whenever they show one free — e.g.
+after a recount (reconcile, event creation) or a future cancellation, both of
+which publish with overwrite=True.  POST /bookings/ checks it before opening
+a DB session, so the tail of requests after an on-sale costs one EXISTS.
+
+reconcile_all (Celery beat) recounts events whose booked_seats disagree with
+COUNT(*) on ticket, and creates rows that are missing.
+"""
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from loguru import logger
+from sqlalchemy import func, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.cache import redis_client
+from app.models.booking import Ticket
+from app.models.event import Event, EventInventory, Seat
+
+# Refreshed on every write; a cold event is refilled from event_inventory
+_TTL_SECONDS = 24 * 3600
+# No booking refreshes a sold-out event's flag, so it outlives the counters
+_SOLD_OUT_TTL_SECONDS = 30 * 24 * 3600
+
+# KEYS: counters, sold_out   ARGV: total, booked, ttl, overwrite (0/1), sold_out_ttl
+# Keeps the larger booked value unless overwrite — a recount wins — then sets
+# or drops the sold-out flag to match what is stored.
+_PUBLISH_LUA = """
+local booked = tonumber(redis.call('HGET', KEYS[1], 'booked') or '-1')
+if ARGV[4] == '1' or tonumber(ARGV[2]) > booked then
+    redis.call('HSET', KEYS[1], 'total', ARGV[1], 'booked', ARGV[2])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+local total = tonumber(redis.call('HGET', KEYS[1], 'total'))
+booked = tonumber(redis.call('HGET', KEYS[1], 'booked'))
+if total > 0 and booked >= total then
+    redis.call('SET', KEYS[2], 1, 'EX', ARGV[5])
+else
+    redis.call('DEL', KEYS[2])
+end
+return 1
+"""
+_publish_counters = redis_client.register_script(_PUBLISH_LUA)
+
+_DRIFTED_SQL = text("""
+    SELECT e.id
+    FROM event e
+    LEFT JOIN event_inventory i ON i.event_id = e.id
+    WHERE i.event_id IS NULL
+       OR i.booked_seats <> (SELECT count(*) FROM ticket t WHERE t.event_id = e.id)
+""")
+
+
+def _counters_key(event_id: int) -> str:
+    return f"inventory:{event_id}"
+
+
+def _sold_out_key(event_id: int) -> str:
+    return f"soldout:{event_id}"
+
+
+def publish(event_id: int, total: int, booked: int, *, overwrite: bool = False) -> None:
+    """Writes the counters to Redis. Call after the commit that produced them."""
+    try:
+        _publish_counters(
+            keys=[_counters_key(event_id), _sold_out_key(event_id)],
+            args=[total, booked, _TTL_SECONDS, int(overwrite), _SOLD_OUT_TTL_SECONDS],
+        )
+    except Exception as e:
+        logger.warning(f"INVENTORY ERROR on publish for event {event_id}: {e}")
+
+
+def get_counters(event_id: int) -> Optional[Tuple[int, int]]:
+    """(total, booked) from Redis, or None if not cached or Redis is down."""
+    try:
+        total, booked = redis_client.hmget(_counters_key(event_id), "total", "booked")
+    except Exception as e:
+        logger.warning(f"INVENTORY ERROR on read for event {event_id}: {e}")
+        return None
+    if total is None or booked is None:
+        return None
+    return int(total), int(booked)
+
+
+def get_counters_many(event_ids: List[int], version_keys: List[str]) -> Optional[dict]:
+    """
+    event_id -> (total, booked, version) for every event whose counters are
+    cached, with version_keys[i] read for event_ids[i] — one MULTI round trip.
+    Versions are read first and counters are published before the version is
+    bumped, so the counts cover at least that version. None if Redis is down.
+    """
+    try:
+        pipe = redis_client.pipeline(transaction=True)
+        for version_key in version_keys:
+            pipe.get(version_key)
+        for event_id in event_ids:
+            pipe.hmget(_counters_key(event_id), "total", "booked")
+        results = pipe.execute()
+    except Exception as e:
+        logger.warning(f"INVENTORY ERROR on read for {len(event_ids)} events: {e}")
+        return None
+    versions, counters = results[:len(version_keys)], results[len(version_keys):]
+    found = {}
+    for event_id, version, (total, booked) in zip(event_ids, versions, counters):
+        if total is not None and booked is not None:
+            found[event_id] = (int(total), int(booked), None if version is None else int(version))
+    return found
+
+
+def load_counters(db: Session, event_ids: List[int]) -> Dict[int, Tuple[int, int]]:
+    """
+    event_id -> (total, booked) from event_inventory in one query, written
+    back to Redis so the next read is a hit. Events without a row are
+    reconciled (which creates it); unknown ids are left out.
+    """
+    found = {
+        event_id: (total, booked)
+        for event_id, total, booked in db.query(
+            EventInventory.event_id, EventInventory.total_seats, EventInventory.booked_seats
+        ).filter(EventInventory.event_id.in_(event_ids))
+    }
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for event_id, (total, booked) in found.items():
+            _publish_counters(
+                keys=[_counters_key(event_id), _sold_out_key(event_id)],
+                args=[total, booked, _TTL_SECONDS, 0, _SOLD_OUT_TTL_SECONDS],
+                client=pipe,
+            )
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"INVENTORY ERROR on publish for {len(found)} events: {e}")
+
+    rowless = [i for i in event_ids if i not in found]
+    if rowless:
+        for event_id, in db.query(Event.id).filter(Event.id.in_(rowless)):
+            found[event_id] = reconcile_event(db, event_id)
+    return found
+
+
+def is_sold_out(event_id: int) -> bool:
+    """One EXISTS on the sold-out flag. False if Redis is down — the DB still decides."""
+    try:
+        return bool(redis_client.exists(_sold_out_key(event_id)))
+    except Exception as e:
+        logger.warning(f"INVENTORY ERROR on sold-out check for event {event_id}: {e}")
+        return False
+
+
+def create(db: Session, event_id: int, total_seats: int) -> None:
+    """Adds a new event's row to the current transaction (no commit)."""
+    db.add(EventInventory(event_id=event_id, total_seats=total_seats, booked_seats=0))
+
+
+def record_booked(db: Session, event_id: int, count: int) -> Optional[Tuple[int, int]]:
+    """
+    Adds count booked seats in the current transaction (no commit); run it
+    after the ticket INSERTs. Returns (total, booked) as of this transaction,
+    for publish() after the commit — None if the event has no row yet.
+    """
+    row = db.execute(
+        update(EventInventory)
+        .where(EventInventory.event_id == event_id)
+        .values(booked_seats=EventInventory.booked_seats + count, updated_at=func.now())
+        .returning(EventInventory.total_seats, EventInventory.booked_seats)
+    ).first()
+    return None if row is None else (row.total_seats, row.booked_seats)
+
+
+def reconcile_event(db: Session, event_id: int) -> Optional[Tuple[int, int]]:
+    """
+    Recounts one event from the seat and ticket tables, creating its row if
+    missing, commits, and overwrites the Redis counters. Returns (total,
+    booked), or None if there is no such event.
+    """
+    venue_id = db.query(Event.venue_id).filter(Event.id == event_id).scalar()
+    if venue_id is None:
+        return None
+    db.execute(
+        insert(EventInventory)
+        .values(event_id=event_id, total_seats=0, booked_seats=0)
+        .on_conflict_do_nothing(index_elements=["event_id"])
+    )
+    inventory = (
+        db.query(EventInventory)
+        .filter(EventInventory.event_id == event_id)
+        .with_for_update()
+        .one()
+    )
+    # Counted only once the row is locked: a booking in flight has either
+    # committed (and is counted) or will add its seats after this commit
+    total = db.query(func.count(Seat.id)).filter(Seat.venue_id == venue_id).scalar()
+    booked = db.query(func.count(Ticket.id)).filter(Ticket.event_id == event_id).scalar()
+    drift = booked - inventory.booked_seats
+    inventory.total_seats, inventory.booked_seats = total, booked
+    db.commit()
+
+    if drift:
+        logger.warning(f"Inventory drift for event {event_id}: booked_seats off by {drift}, corrected")
+    publish(event_id, total, booked, overwrite=True)
+    return total, booked
+
+
+def reconcile_all(db: Session) -> int:
+    """Reconciles every event whose counters disagree with the ticket table. Returns how many."""
+    drifted = db.execute(_DRIFTED_SQL).scalars().all()
+    for event_id in drifted:
+        reconcile_event(db, event_id)
+    if drifted:
+        logger.info(f"Reconciled inventory for {len(drifted)} events")
+    return len(drifted)
+
+
+def get_summary(db: Session, event_id: int) -> dict:
+    """
+    schemas.EventAvailabilitySummary from the counters: one Redis HMGET, or
+    one primary-key read of event_inventory when the key is cold.
+    """
+    counters = get_counters(event_id)
+    if counters is None:
+        inventory = db.get(EventInventory, event_id)
+        if inventory is not None:
+            counters = inventory.total_seats, inventory.booked_seats
+            publish(event_id, *counters)
+        else:
+            counters = reconcile_event(db, event_id)
+            if counters is None:
+                raise HTTPException(status_code=404, detail="Event not found")
+    total, booked = counters
+    return {
+        "event_id":        event_id,
+        "total_seats":     total,
+        "available_seats": total - booked,
+        "booked_seats":    booked,
+    }
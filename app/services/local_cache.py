@@ -0,0 +1,177 @@
+# app/services/local_cache.py
+"""
+Optional in-process tier in front of Redis (LOCAL_CACHE_ENABLED).
+
+Hot keys — availability for the top events — are read thousands of times a
+second; a local hit skips the Redis round trip.  Entries hold the value
+bytes as stored in Redis (already decompressed), so raw passthrough readers
+skip decoding too.  Entries
+are bounded by LOCAL_CACHE_MAX_ENTRIES (least recently used evicted first)
+and live at most LOCAL_CACHE_TTL_SECONDS.
+
+Coherence across uvicorn workers and dynos: every cache_service write
+publishes the key on the cache:invalidate channel and each process's listener
+thread drops its copy.  The tier is bypassed until the listener is subscribed,
+and flushed whenever its connection drops, so a missed message can't leave a
+stale entry behind longer than the TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+from loguru import logger
+
+from app.core.config import settings
+from app.db.cache import redis_client
+
+_CHANNEL = "cache:invalidate"
+_RECONNECT_SECONDS = 1.0
+
+_MISSING = object()
+
+
+class LRU:
+    """Thread-safe LRU with a per-entry TTL; also bounds seat_layout's memo."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation; a put whose read started before one is dropped
+        self.generation = 0
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drops one key, or everything when key is None."""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries":       len(self._entries),
+                "max_entries":   self.max_entries,
+                "hits":          self.hits,
+                "misses":        self.misses,
+                "hit_rate_pct":  round(self.hits / lookups * 100, 1) if lookups else 0.0,
+                "evictions":     self.evictions,
+                "expirations":   self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+_cache = LRU(settings.LOCAL_CACHE_MAX_ENTRIES, settings.LOCAL_CACHE_TTL_SECONDS)
+_subscribed = threading.Event()
+_listener_lock = threading.Lock()
+_listener: Optional[threading.Thread] = None
+
+
+def _listen() -> None:
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            pubsub.subscribe(_CHANNEL)
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message is None:
+                    continue
+                if message["type"] == "subscribe":
+                    # Only now is every later publish guaranteed to reach us
+                    _subscribed.set()
+                    logger.info(f"LOCAL CACHE listening on {_CHANNEL}")
+                elif message["type"] == "message":
+                    _cache.invalidate(message["data"])
+        except Exception as e:
+            logger.warning(f"LOCAL CACHE listener lost its connection: {e}")
+        finally:
+            _subscribed.clear()
+            _cache.invalidate()
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+        time.sleep(_RECONNECT_SECONDS)
+
+
+def _active() -> bool:
+    """True once this process is subscribed; starts the listener on first use."""
+    global _listener
+    if not settings.LOCAL_CACHE_ENABLED:
+        return False
+    if _listener is None:
+        with _listener_lock:
+            if _listener is None:
+                _listener = threading.Thread(target=_listen, name="local-cache-invalidation", daemon=True)
+                _listener.start()
+    return _subscribed.is_set()
+
+
+def get(key: str) -> Tuple[bool, Any]:
+    """Returns (found, value). found is False when disabled, not subscribed, or absent."""
+    if not _active():
+        return False, None
+    value = _cache.get(key)
+    if value is _MISSING:
+        return False, None
+    return True, value
+
+
+def generation() -> int:
+    """Take before reading Redis; pass to put() so a racing invalidation wins."""
+    return _cache.generation
+
+
+def put(key: str, value: Any, generation: int) -> None:
+    if _active():
+        _cache.put(key, value, generation)
+
+
+def publish_invalidation(key: str) -> None:
+    """Drops key here and tells every other process to drop it. No-op when disabled."""
+    if not settings.LOCAL_CACHE_ENABLED:
+        return
+    _cache.invalidate(key)
+    try:
+        redis_client.publish(_CHANNEL, key)
+    except Exception as e:
+        logger.warning(f"LOCAL CACHE ERROR publishing invalidation for '{key}': {e}")
+
+
+def stats() -> Optional[dict]:
+    """This process's tier statistics, or None when disabled."""
+    if not settings.LOCAL_CACHE_ENABLED:
+        return None
+    return {**_cache.stats(), "subscribed": _subscribed.is_set()}
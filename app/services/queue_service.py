@@ -0,0 +1,198 @@
+# app/services/queue_service.py
+"""
+Virtual waiting room — opt-in, per-event admission queue in Redis.
+
+When an organizer enables it for an event, customers must join the queue
+and wait to be admitted before POST /bookings/ accepts them.  Tokens are
+admitted at a fixed rate (admit_per_second), so an on-sale turns into a
+steady stream of bookers instead of a burst that drains the DB pool.
+
+Redis layout per event:
+  queue:{event_id}:config    HASH  rate, window_ms, last (ms), seq
+  queue:{event_id}:waiting   ZSET  token scored by join order
+  queue:{event_id}:admitted  ZSET  token scored by admission expiry (ms)
+  queue:{event_id}:owners    HASH  token -> user_id
+  queue:{event_id}:tokens    HASH  user_id -> token  (one live token per user)
+
+Admission is lazy: every join/status/check call runs the admit step first,
+so no background process is needed to move the queue forward.
+
+The config hash expires WAITING_ROOM_GRACE_SECONDS after the event starts,
+and the keys written by joins and admissions take the config's TTL, so a
+queue nobody disables goes away with its event.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import HTTPException, status
+from loguru import logger
+
+from app.core.config import settings
+from app.db.cache import redis_client
+from app import schemas
+
+
+def _keys(event_id: int) -> list:
+    prefix = f"queue:{event_id}"
+    return [
+        f"{prefix}:config",
+        f"{prefix}:waiting",
+        f"{prefix}:admitted",
+        f"{prefix}:owners",
+        f"{prefix}:tokens",
+    ]
+
+
+# Shared prologue: returns early with {'disabled'} if no queue is configured,
+# otherwise admits floor(elapsed * rate) waiting tokens and prunes expired ones.
+_ADMIT_LUA = """
+local rate = tonumber(redis.call('HGET', KEYS[1], 'rate'))
+if not rate then return {'disabled'} end
+local window = tonumber(redis.call('HGET', KEYS[1], 'window_ms'))
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local last = tonumber(redis.call('HGET', KEYS[1], 'last'))
+if not last then
+    last = now
+    redis.call('HSET', KEYS[1], 'last', now)
+end
+local due = math.floor((now - last) * rate / 1000)
+if due > 0 then
+    local popped = redis.call('ZPOPMIN', KEYS[2], due)
+    for i = 1, #popped, 2 do
+        redis.call('ZADD', KEYS[3], now + window, popped[i])
+    end
+    local ttl = redis.call('PTTL', KEYS[1])
+    if #popped > 0 and ttl > 0 then
+        redis.call('PEXPIRE', KEYS[3], ttl)
+    end
+    if #popped / 2 < due then
+        last = now                       -- queue drained: don't bank idle time
+    else
+        last = last + due * 1000 / rate
+    end
+    redis.call('HSET', KEYS[1], 'last', last)
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+local function state_of(token)
+    if redis.call('ZSCORE', KEYS[3], token) then
+        return {'admitted', token, 0, tostring(rate)}
+    end
+    local rank = redis.call('ZRANK', KEYS[2], token)
+    if rank then
+        return {'waiting', token, rank + 1, tostring(rate)}
+    end
+    return {'expired', token, 0, tostring(rate)}
+end
+"""
+
+# ARGV: user_id, candidate token
+_JOIN_LUA = _ADMIT_LUA + """
+local existing = redis.call('HGET', KEYS[5], ARGV[1])
+if existing then
+    local s = state_of(existing)
+    if s[1] ~= 'expired' then return s end
+    redis.call('HDEL', KEYS[4], existing)
+end
+local seq = redis.call('HINCRBY', KEYS[1], 'seq', 1)
+redis.call('ZADD', KEYS[2], seq, ARGV[2])
+redis.call('HSET', KEYS[4], ARGV[2], ARGV[1])
+redis.call('HSET', KEYS[5], ARGV[1], ARGV[2])
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl > 0 then
+    for i = 2, 5 do redis.call('PEXPIRE', KEYS[i], ttl) end
+end
+return state_of(ARGV[2])
+"""
+
+# ARGV: token, user_id ('' = don't check ownership)
+_STATUS_LUA = _ADMIT_LUA + """
+local owner = redis.call('HGET', KEYS[4], ARGV[1])
+if not owner or (ARGV[2] ~= '' and owner ~= ARGV[2]) then
+    return {'invalid', ARGV[1], 0, tostring(rate)}
+end
+return state_of(ARGV[1])
+"""
+
+_join = redis_client.register_script(_JOIN_LUA)
+_status = redis_client.register_script(_STATUS_LUA)
+
+
+def _ticket(event_id: int, result: list) -> schemas.QueueTicket:
+    state, token, position, rate = result[0], result[1], int(result[2]), float(result[3])
+    return schemas.QueueTicket(
+        event_id=event_id,
+        token=token,
+        state=state,
+        position=position,
+        estimated_wait_seconds=round(position / rate, 1),
+    )
+
+
+def enable_queue(event_id: int, config: schemas.QueueConfig, event_time: datetime) -> schemas.QueueConfig:
+    """Turns the waiting room on (or re-tunes it) for an event starting at event_time."""
+    if event_time.tzinfo is None:
+        event_time = event_time.replace(tzinfo=timezone.utc)
+    expires = event_time + timedelta(seconds=settings.WAITING_ROOM_GRACE_SECONDS)
+    ttl = max(1, int((expires - datetime.now(timezone.utc)).total_seconds()))
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.hset(_keys(event_id)[0], mapping={
+        "rate": config.admit_per_second,
+        "window_ms": config.admission_window_seconds * 1000,
+    })
+    for key in _keys(event_id):
+        pipe.expire(key, ttl)
+    pipe.execute()
+    logger.info(f"Waiting room enabled for event {event_id}: {config.admit_per_second}/s")
+    return config
+
+
+def disable_queue(event_id: int) -> None:
+    """Turns the waiting room off and drops all queue state for the event."""
+    redis_client.delete(*_keys(event_id))
+    logger.info(f"Waiting room disabled for event {event_id}")
+
+
+def join_queue(event_id: int, user_id: int) -> schemas.QueueTicket:
+    """Issues (or returns the user's existing) queue token with its current position."""
+    result = _join(keys=_keys(event_id), args=[user_id, uuid.uuid4().hex])
+    if result[0] == "disabled":
+        raise HTTPException(status_code=404, detail="This event has no waiting room.")
+    return _ticket(event_id, result)
+
+
+def get_status(event_id: int, token: str) -> schemas.QueueTicket:
+    """Cheap poll: one Redis script call that also advances the queue."""
+    result = _status(keys=_keys(event_id), args=[token, ""])
+    if result[0] == "disabled":
+        raise HTTPException(status_code=404, detail="This event has no waiting room.")
+    if result[0] == "invalid":
+        raise HTTPException(status_code=404, detail="Unknown queue token.")
+    return _ticket(event_id, result)
+
+
+def require_admission(event_id: int, token: Optional[str], user_id: int) -> None:
+    """
+    Gate for the booking path.  No-op for events without a waiting room.
+    Raises 403 for a missing/foreign/expired token and 429 while still waiting.
+    If Redis is unreachable the gate opens rather than blocking all bookings.
+    """
+    try:
+        result = _status(keys=_keys(event_id), args=[token or "", user_id])
+    except Exception as e:
+        logger.warning(f"QUEUE ERROR on admission check for event {event_id}: {e}")
+        return
+
+    state = result[0]
+    if state in ("disabled", "admitted"):
+        return
+    if state == "waiting":
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Still in the waiting room (position {result[2]}).",
+            headers={"Retry-After": "1"},
+        )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="This event uses a waiting room. Join the queue and wait to be admitted.",
+    )
@@ -0,0 +1,338 @@
+# app/services/seat_bitmap.py
+"""
+Per-event booked-seat bitmap in Redis — an O(1) pre-check for the booking path.
+
+Bit N of an event's bitmap is 1 when the seat at venue position N is booked,
+where position = row_index * venue.cols + (seat.number - 1) (row-major, so
+row r occupies bits [r * cols, (r + 1) * cols)).
+
+Redis layout:
+  seats:{event_id}:meta        HASH    venue_id, rows, cols, total, seat_id_runs
+  seats:{event_id}:bitmap      STRING  bitmap, MSB-first (SETBIT/GETBIT order)
+  seats:{event_id}:pending     SET     seat ids marked while the bitmap was not built
+  seats:venue:{venue_id}:pos   HASH    seat_id -> position (venues never change)
+
+PostgreSQL stays the source of truth.  Bits are only set AFTER a commit and
+a rebuild reads committed tickets, so the bitmap can lag (a booked seat not
+yet marked) but never claim a free seat is taken — it only sheds requests
+that are already doomed to hit _event_seat_uc.
+
+A rebuild ORs its bits into the live bitmap instead of replacing it: its
+ticket query may predate a commit whose mark_booked lands before the write,
+and overwriting would clear that seat until the next rebuild.  Seats are
+never released, so a merge loses nothing; clear() drops an event's bitmap
+for a recount from scratch.
+
+A mark that finds no bitmap (first build, or one that expired) parks its
+seat ids in the pending set instead of being dropped, and store() folds
+them in within the same MULTI that publishes meta — so a commit that lands
+between a rebuild's ticket query and its write is never lost either way.
+Marks refresh the TTLs, so an event that keeps selling keeps its bitmap.
+"""
+import json
+import uuid
+from typing import Iterable, List, Optional, Tuple, Union
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.db.cache import redis_client, redis_raw_client
+from app.models.event import Event, Venue, Seat
+from app.models.booking import Ticket
+from app.services import seat_layout
+from app.services.seat_layout import LayoutSeat, SeatLayout
+
+# Rebuilt on demand when missing, so stale events simply age out
+_TTL_SECONDS = 7 * 24 * 3600
+
+
+def _meta_key(event_id: int) -> str:
+    return f"seats:{event_id}:meta"
+
+
+def _bitmap_key(event_id: int) -> str:
+    return f"seats:{event_id}:bitmap"
+
+
+def _pending_key(event_id: int) -> str:
+    return f"seats:{event_id}:pending"
+
+
+def _positions_key(venue_id: int) -> str:
+    return f"seats:venue:{venue_id}:pos"
+
+
+def row_index(row_label: str) -> int:
+    """Inverse of event_service.create_venue's labels: A–Z → 0–25, AA, AB, … → 26, 27, …"""
+    return 26 * (len(row_label) - 1) + ord(row_label[-1]) - 65
+
+
+def row_label(index: int) -> str:
+    """create_venue's label for a row index — the inverse of row_index."""
+    return chr(65 + index) if index < 26 else "A" + chr(65 + index - 26)
+
+
+def seat_position(row_label: str, number: int, cols: int) -> int:
+    return row_index(row_label) * cols + number - 1
+
+
+# The positions hash is looked up through the venue_id stored in meta, so the
+# script touches one key it was not handed — fine on the single-node Redis we run.
+# KEYS: meta, bitmap   ARGV: seat_id...
+# Returns -1 if the bitmap is not built, else the list of booked seat ids.
+_CHECK_LUA = """
+local venue = redis.call('HGET', KEYS[1], 'venue_id')
+if not venue then return -1 end
+local pos_key = 'seats:venue:' .. venue .. ':pos'
+local taken = {}
+for i = 1, #ARGV do
+    local pos = redis.call('HGET', pos_key, ARGV[i])
+    if pos and redis.call('GETBIT', KEYS[2], pos) == 1 then
+        table.insert(taken, ARGV[i])
+    end
+end
+return taken
+"""
+
+# KEYS: meta, bitmap, pending   ARGV: ttl, seat_id...
+# If the bitmap is not built the seat ids wait in pending for store() to fold in.
+_MARK_LUA = """
+local ttl = ARGV[1]
+local venue = redis.call('HGET', KEYS[1], 'venue_id')
+if not venue then
+    for i = 2, #ARGV do
+        redis.call('SADD', KEYS[3], ARGV[i])
+    end
+    redis.call('EXPIRE', KEYS[3], ttl)
+    return 0
+end
+local pos_key = 'seats:venue:' .. venue .. ':pos'
+local marked = 0
+for i = 2, #ARGV do
+    local pos = redis.call('HGET', pos_key, ARGV[i])
+    if pos then
+        redis.call('SETBIT', KEYS[2], pos, 1)
+        marked = marked + 1
+    end
+end
+redis.call('EXPIRE', KEYS[1], ttl)
+redis.call('EXPIRE', KEYS[2], ttl)
+redis.call('EXPIRE', pos_key, ttl)
+return marked
+"""
+
+# KEYS: pending, bitmap, positions
+# Sets the bits of the parked seat ids and drops the set; run inside store's MULTI.
+_FOLD_PENDING_LUA = """
+local folded = 0
+for _, seat_id in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    local pos = redis.call('HGET', KEYS[3], seat_id)
+    if pos then
+        redis.call('SETBIT', KEYS[2], pos, 1)
+        folded = folded + 1
+    end
+end
+redis.call('DEL', KEYS[1])
+return folded
+"""
+
+# KEYS: meta, bitmap, version   ARGV: first_row, last_row
+# Returns false if the bitmap is not built (or predates seat_id_runs), else
+# {rows, cols, seat_id_runs, bytes covering the rows, version or false}.
+# One atomic read, so the bytes are never older than the version beside them.
+_ROWS_LUA = """
+local meta = redis.call('HMGET', KEYS[1], 'rows', 'cols', 'seat_id_runs')
+if not meta[3] then return false end
+local cols = tonumber(meta[2])
+local first = tonumber(ARGV[1]) * cols
+local last = (tonumber(ARGV[2]) + 1) * cols - 1
+local chunk = redis.call('GETRANGE', KEYS[2], math.floor(first / 8), math.floor(last / 8))
+return {meta[1], meta[2], meta[3], chunk, redis.call('GET', KEYS[3])}
+"""
+
+_check = redis_client.register_script(_CHECK_LUA)
+_mark = redis_client.register_script(_MARK_LUA)
+_fold_pending = redis_client.register_script(_FOLD_PENDING_LUA)
+_rows = redis_raw_client.register_script(_ROWS_LUA)
+
+
+def find_booked(event_id: int, seat_ids: List[int]) -> Optional[List[int]]:
+    """
+    Returns the subset of seat_ids the bitmap knows to be booked.
+    None means the bitmap is not built yet; [] on Redis errors (fail open).
+    """
+    try:
+        result = _check(keys=[_meta_key(event_id), _bitmap_key(event_id)], args=seat_ids)
+    except Exception as e:
+        logger.warning(f"BITMAP ERROR on check for event {event_id}: {e}")
+        return []
+    if result == -1:
+        return None
+    return [int(s) for s in result]
+
+
+def mark_booked(event_id: int, seat_ids: Iterable[int]) -> None:
+    """Sets the bits for freshly committed seats. Call only after the DB commit."""
+    try:
+        _mark(
+            keys=[_meta_key(event_id), _bitmap_key(event_id), _pending_key(event_id)],
+            args=[_TTL_SECONDS, *seat_ids],
+        )
+    except Exception as e:
+        logger.warning(f"BITMAP ERROR on mark for event {event_id}: {e}")
+
+
+def seat_id_runs(positions: dict, size: int) -> List[List[int]]:
+    """
+    Position -> seat id reference as [first_seat_id, count] runs of consecutive
+    ids over positions 0..size-1; [0, count] covers positions with no seat.
+    create_venue inserts seats row-major, so a generated venue is one run.
+    """
+    by_position = {pos: seat_id for seat_id, pos in positions.items()}
+    runs: List[List[int]] = []
+    for pos in range(size):
+        seat_id = by_position.get(pos, 0)
+        if runs:
+            first, count = runs[-1]
+            if (seat_id == 0 and first == 0) or (seat_id and first and seat_id == first + count):
+                runs[-1][1] += 1
+                continue
+        runs.append([seat_id, 1])
+    return runs
+
+
+def seat_ids_between(seat_id_runs: List[List[int]], start: int, end: int) -> List[int]:
+    """Seat id at each position in [start, end), 0 where the grid has no seat."""
+    ids: List[int] = []
+    pos = 0
+    for first, count in seat_id_runs:
+        lo, hi = max(start, pos), min(end, pos + count)
+        if lo < hi:
+            ids.extend(range(first + lo - pos, first + hi - pos) if first else [0] * (hi - lo))
+        pos += count
+        if pos >= end:
+            break
+    return ids
+
+
+def encode(venue: Union[Venue, SeatLayout], seats: Iterable[Union[Seat, LayoutSeat]],
+           booked_seat_ids: set) -> Tuple[dict, bytes]:
+    """Returns (seat_id -> position, bitmap bytes) for a venue's seats."""
+    positions = {s.id: seat_position(s.row, s.number, venue.cols) for s in seats}
+    bitmap = bytearray((venue.rows * venue.cols + 7) // 8)
+    for seat_id in booked_seat_ids:
+        pos = positions.get(seat_id)
+        if pos is not None:
+            bitmap[pos >> 3] |= 0x80 >> (pos & 7)
+    return positions, bytes(bitmap)
+
+
+def store(event_id: int, venue: Union[Venue, SeatLayout], seats: Iterable[Union[Seat, LayoutSeat]],
+          booked_seat_ids: set) -> None:
+    """
+    Writes the bitmap and the venue's position index from data the caller
+    already loaded — used by the availability rebuild so it costs no extra queries.
+    The bits are ORed into the live bitmap and the pending marks folded in
+    (see the module docstring), so seats marked since booked_seat_ids was
+    read stay marked.
+    """
+    positions, bitmap = encode(venue, seats, booked_seat_ids)
+    bitmap_key = _bitmap_key(event_id)
+    scratch_key = f"{bitmap_key}:build:{uuid.uuid4().hex}"
+
+    try:
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.delete(_positions_key(venue.id), _meta_key(event_id))
+        if positions:
+            pipe.hset(_positions_key(venue.id), mapping=positions)
+        pipe.set(scratch_key, bitmap, ex=_TTL_SECONDS)
+        pipe.bitop("OR", bitmap_key, bitmap_key, scratch_key)
+        pipe.delete(scratch_key)
+        _fold_pending(keys=[_pending_key(event_id), bitmap_key, _positions_key(venue.id)], client=pipe)
+        pipe.expire(bitmap_key, _TTL_SECONDS)
+        pipe.hset(_meta_key(event_id), mapping={
+            "venue_id": venue.id,
+            "rows": venue.rows,
+            "cols": venue.cols,
+            "total": len(positions),
+            "seat_id_runs": json.dumps(seat_id_runs(positions, venue.rows * venue.cols)),
+        })
+        pipe.expire(_positions_key(venue.id), _TTL_SECONDS)
+        pipe.expire(_meta_key(event_id), _TTL_SECONDS)
+        pipe.execute()
+        logger.debug(f"BITMAP built for event {event_id}: {len(booked_seat_ids)} booked")
+    except Exception as e:
+        logger.warning(f"BITMAP ERROR on store for event {event_id}: {e}")
+
+
+def clear(event_id: int) -> None:
+    """Drops an event's bitmap, so the next store() starts from no bits at all."""
+    try:
+        redis_client.delete(_meta_key(event_id), _bitmap_key(event_id))
+    except Exception as e:
+        logger.warning(f"BITMAP ERROR on clear for event {event_id}: {e}")
+
+
+def snapshot(event_id: int) -> Optional[Tuple[dict, bytes]]:
+    """
+    (meta, bitmap bytes) read in one round trip, for the compact availability format.
+    None if the bitmap is not built, was built before meta carried the
+    seat_id_runs reference, or Redis is unavailable.
+    """
+    try:
+        pipe = redis_raw_client.pipeline(transaction=True)
+        pipe.hgetall(_meta_key(event_id))
+        pipe.get(_bitmap_key(event_id))
+        raw_meta, bitmap = pipe.execute()
+    except Exception as e:
+        logger.warning(f"BITMAP ERROR on snapshot for event {event_id}: {e}")
+        return None
+    meta = {k.decode(): v.decode() for k, v in raw_meta.items()}
+    if "seat_id_runs" not in meta or bitmap is None:
+        return None
+    return meta, bitmap
+
+
+def rows_snapshot(
+    event_id: int, first_row: int, last_row: int, version_key: str
+) -> Optional[Tuple[dict, bytes, int, Optional[int]]]:
+    """
+    (meta, bitmap bytes covering rows first_row..last_row, index of the first
+    byte, version_key's value) — one round trip whose cost grows with the rows
+    asked for, not the venue. None if the bitmap is not built or Redis is down.
+    """
+    try:
+        result = _rows(
+            keys=[_meta_key(event_id), _bitmap_key(event_id), version_key],
+            args=[first_row, last_row],
+        )
+    except Exception as e:
+        logger.warning(f"BITMAP ERROR on row read for event {event_id}: {e}")
+        return None
+    if result is None:
+        return None
+    rows, cols, runs, chunk, version = result
+    meta = {"rows": rows.decode(), "cols": cols.decode(), "seat_id_runs": runs.decode()}
+    first_byte = first_row * int(cols) // 8
+    return meta, chunk, first_byte, None if version is None else int(version)
+
+
+def load(db: Session, event_id: int) -> Optional[Tuple[SeatLayout, Tuple[LayoutSeat, ...], set]]:
+    """(venue layout, its seats, booked seat ids). None if the event doesn't exist."""
+    venue_id = db.query(Event.venue_id).filter(Event.id == event_id).scalar()
+    if venue_id is None:
+        return None
+    layout = seat_layout.get_layout(db, venue_id)
+    booked = {
+        seat_id
+        for seat_id, in db.query(Ticket.seat_id).filter(Ticket.event_id == event_id)
+    }
+    return layout, layout.seats, booked
+
+
+def rebuild(db: Session, event_id: int) -> bool:
+    """Rebuilds an event's bitmap from the seat and ticket tables. False if the event doesn't exist."""
+    loaded = load(db, event_id)
+    if loaded is None:
+        return False
+    store(event_id, *loaded)
+    return True
@@ -0,0 +1,190 @@
+# app/services/seat_finder.py
+"""
+Best-available seats — POST /events/{id}/best-available.
+
+Finds the best block of N adjacent free seats in one row straight from the
+event's booked-seat bitmap (seat_bitmap), without touching PostgreSQL:
+
+  occupied = booked bits | unexpired holds | grid positions without a seat
+
+Each row is a `cols`-bit slice of the bitmap as a Python int, and runs of N
+free seats come out of log2(N) shift-and steps — a 50k-seat venue is a few
+hundred big-int operations, cheap enough for every request.  Rows are tried
+front to back, or outward from a preferred row; within a row the block
+closest to the centre wins.
+
+Like the booking pre-check, the bitmap can lag a commit by a moment; a seat
+suggested in that window is rejected by the booking path with the usual 409.
+"""
+import json
+from typing import Iterable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.core.config import settings
+from app.services import hold_service, seat_bitmap
+
+# Searches per request when a found block is held by someone else first
+_HOLD_ATTEMPTS = 3
+
+
+def _free_runs(free: int, size: int) -> int:
+    """Bit j is set where free has `size` consecutive set bits j .. j+size-1."""
+    runs, width = free, 1
+    while width < size:
+        step = min(width, size - width)
+        runs &= runs >> step
+        width += step
+    return runs
+
+
+def _seat_id_at(seat_id_runs: List[List[int]], position: int) -> int:
+    """Seat id at a grid position; 0 where the grid has no seat."""
+    start = 0
+    for first, count in seat_id_runs:
+        if position < start + count:
+            return first + position - start if first else 0
+        start += count
+    return 0
+
+
+def _position_of(seat_id_runs: List[List[int]], seat_id: int) -> Optional[int]:
+    start = 0
+    for first, count in seat_id_runs:
+        if first and first <= seat_id < first + count:
+            return start + seat_id - first
+        start += count
+    return None
+
+
+def _occupancy(meta: dict, bitmap: bytes, held_seat_ids: Iterable[int]) -> Tuple[int, int]:
+    """(occupied positions as one int — position p is bit nbits-1-p, nbits)."""
+    size = int(meta["rows"]) * int(meta["cols"])
+    bitmap = bitmap.ljust((size + 7) // 8, b"\0")
+    nbits = len(bitmap) * 8
+    occupied = int.from_bytes(bitmap, "big")
+
+    seat_id_runs = json.loads(meta["seat_id_runs"])
+    start = 0
+    for first, count in seat_id_runs:
+        if not first:
+            occupied |= ((1 << count) - 1) << (nbits - start - count)
+        start += count
+    for seat_id in held_seat_ids:
+        position = _position_of(seat_id_runs, seat_id)
+        if position is not None:
+            occupied |= 1 << (nbits - 1 - position)
+    return occupied, nbits
+
+
+def find_block(
+    meta: dict,
+    bitmap: bytes,
+    size: int,
+    *,
+    preferred_row: Optional[int] = None,
+    held_seat_ids: Iterable[int] = (),
+) -> Optional[Tuple[int, int]]:
+    """
+    (row index, first seat number) of the best free block of `size` adjacent
+    seats, or None. meta/bitmap as returned by seat_bitmap.snapshot.
+    """
+    rows, cols = int(meta["rows"]), int(meta["cols"])
+    if size > cols:
+        return None
+    occupied, nbits = _occupancy(meta, bitmap, held_seat_ids)
+    row_mask = (1 << cols) - 1
+    if preferred_row is None:
+        order = range(rows)
+    else:
+        order = sorted(range(rows), key=lambda r: (abs(r - preferred_row), r))
+
+    for row in order:
+        # Row bits with seat 1 as the most significant: bit j is seat cols - j
+        free = ~(occupied >> (nbits - (row + 1) * cols)) & row_mask
+        runs = _free_runs(free, size)
+        best = None
+        while runs:  # lowest bit first = highest seat numbers first; ties go to the lower
+            low = runs & -runs
+            first = cols - (low.bit_length() - 1) - size + 1
+            off_centre = abs(2 * first + size - 1 - (cols + 1))
+            if best is None or off_centre <= best[0]:
+                best = (off_centre, first)
+            runs ^= low
+        if best is not None:
+            return row, best[1]
+    return None
+
+
+def best_available(
+    db: Session,
+    event_id: int,
+    *,
+    user_id: int,
+    party_size: int,
+    row: Optional[str] = None,
+    hold: bool = False,
+) -> schemas.BestAvailable:
+    """
+    The best block for party_size, optionally held for the user at once.
+    404 unknown event, 422 unknown row, 409 no block left, 503 Redis down.
+    """
+    snapshot = seat_bitmap.snapshot(event_id)
+    if snapshot is None:
+        if not seat_bitmap.rebuild(db, event_id):
+            raise HTTPException(status_code=404, detail="Event not found")
+        snapshot = seat_bitmap.snapshot(event_id)
+        if snapshot is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Seat search is temporarily unavailable.",
+            )
+    meta, bitmap = snapshot
+    rows, cols = int(meta["rows"]), int(meta["cols"])
+
+    preferred_row = None
+    if row is not None:
+        row = row.upper()
+        preferred_row = seat_bitmap.row_index(row) if row.isalpha() else -1
+        if not 0 <= preferred_row < rows:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Row {row} does not exist at this venue.",
+            )
+
+    seat_id_runs = json.loads(meta["seat_id_runs"])
+    taken = hold_service.get_held_seat_ids(event_id)
+    for _ in range(_HOLD_ATTEMPTS):
+        block = find_block(meta, bitmap, party_size, preferred_row=preferred_row, held_seat_ids=taken)
+        if block is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"No block of {party_size} adjacent seats is available.",
+            )
+        row_index, first = block
+        label = seat_bitmap.row_label(row_index)
+        seats = [
+            schemas.Seat(id=_seat_id_at(seat_id_runs, row_index * cols + number - 1), row=label, number=number)
+            for number in range(first, first + party_size)
+        ]
+        result = schemas.BestAvailable(event_id=event_id, row=label, seats=seats, held=False)
+        if not hold:
+            return result
+
+        conflicts = hold_service.claim_seats(event_id, [s.id for s in seats], user_id)
+        if conflicts is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Seat holds are temporarily unavailable.",
+            )
+        if not conflicts:
+            result.held = True
+            result.expires_in_seconds = settings.SEAT_HOLD_TTL_SECONDS
+            return result
+        taken.update(conflicts)  # lost the race for this block — search again
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Seats are being taken too quickly — please retry.",
+    )
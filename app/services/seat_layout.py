@@ -0,0 +1,106 @@
+# app/services/seat_layout.py
+"""
+Immutable per-venue seat layout, cached in process memory and in Redis.
+
+A venue's seats never change once create_venue generates them, so the layout
+is built once — from the seats create_venue just inserted — and shared by
+every event at that venue.  Availability is composed from the layout plus the
+event's booked seat ids, so a rebuild costs the ticket lookup, not a scan of
+the seat table.
+
+Redis layout:
+  seats:venue:{venue_id}:layout   STRING  JSON {rows, cols, seats: [[id, row, number], ...]}
+                                          no TTL — venues are never edited
+
+Seats are kept in (row, number) order, the order availability lists them in.
+The in-process copies are a bounded LRU (SEAT_LAYOUT_CACHE_MAX_ENTRIES), so a
+long-lived worker holds the venues it serves, not every venue it has seen.
+"""
+import json
+from typing import List, NamedTuple, Optional, Tuple
+from fastapi import HTTPException
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.cache import redis_client
+from app.models.event import Venue, Seat
+from app.services.local_cache import LRU
+
+
+class LayoutSeat(NamedTuple):
+    id: int
+    row: str
+    number: int
+
+
+class SeatLayout(NamedTuple):
+    # Field names match models.Venue so seat_bitmap can take either
+    id: int
+    rows: int
+    cols: int
+    seats: Tuple[LayoutSeat, ...]
+
+
+_layouts = LRU(settings.SEAT_LAYOUT_CACHE_MAX_ENTRIES, settings.SEAT_LAYOUT_CACHE_TTL_SECONDS)
+
+
+def _layout_key(venue_id: int) -> str:
+    return f"seats:venue:{venue_id}:layout"
+
+
+def _make(venue_id: int, rows: int, cols: int, seats) -> SeatLayout:
+    ordered = sorted((LayoutSeat(*s) for s in seats), key=lambda s: (s.row, s.number))
+    return SeatLayout(venue_id, rows, cols, tuple(ordered))
+
+
+def store(venue_id: int, rows: int, cols: int, seats: List[Tuple[int, str, int]]) -> SeatLayout:
+    """Caches a venue's layout in memory and in Redis (overwriting). Returns it."""
+    layout = _make(venue_id, rows, cols, seats)
+    _layouts.invalidate(venue_id)  # a layout read racing this one can't put the old copy back
+    _layouts.put(venue_id, layout, _layouts.generation)
+    try:
+        redis_client.set(_layout_key(venue_id), json.dumps({
+            "rows": rows,
+            "cols": cols,
+            "seats": [list(s) for s in layout.seats],
+        }))
+    except Exception as e:
+        logger.warning(f"LAYOUT ERROR on store for venue {venue_id}: {e}")
+    return layout
+
+
+def _from_redis(venue_id: int) -> Optional[SeatLayout]:
+    try:
+        raw = redis_client.get(_layout_key(venue_id))
+    except Exception as e:
+        logger.warning(f"LAYOUT ERROR on get for venue {venue_id}: {e}")
+        return None
+    if raw is None:
+        return None
+    data = json.loads(raw)
+    return _make(venue_id, data["rows"], data["cols"], data["seats"])
+
+
+def get_layout(db: Session, venue_id: int) -> SeatLayout:
+    """Process memory, then Redis, then one seat-table query (cached both ways). 404 if no venue."""
+    layout = _layouts.get(venue_id)
+    if isinstance(layout, SeatLayout):
+        return layout
+
+    generation = _layouts.generation
+    layout = _from_redis(venue_id)
+    if layout is not None:
+        _layouts.put(venue_id, layout, generation)
+        return layout
+
+    venue = db.query(Venue).filter(Venue.id == venue_id).first()
+    if not venue:
+        raise HTTPException(status_code=404, detail="Venue not found")
+    seats = (
+        db.query(Seat.id, Seat.row, Seat.number)
+        .filter(Seat.venue_id == venue_id)
+        .all()
+    )
+    logger.debug(f"LAYOUT built for venue {venue_id} from {len(seats)} seats")
+    return store(venue_id, venue.rows, venue.cols, [tuple(s) for s in seats])
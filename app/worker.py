@@ -83,3 +83,49 @@ def send_booking_confirmation(booking_id: int, user_email: str) -> None:
     except Exception as exc:
         logger.error(f"Email failed  booking_id={booking_id}  error={exc}")
         raise  # re-raise → Celery marks task FAILED; retries via broker
+
+
+@celery_app.task(ignore_result=True)
+def release_expired_holds() -> None:
+    """
+    Celery beat task (every 30 s): sweeps expired seat holds out of Redis.
+    Expired holds are already ignored by the claim script; this only frees memory
+    and keeps holds:events short.
+    """
+    from app.services import hold_service  # lazy: keeps Redis out of email-only imports
+
+    hold_service.release_expired()
+
+
+@celery_app.task(ignore_result=True)
+def reconcile_event_inventory() -> None:
+    """
+    Celery beat task (every 5 min): corrects event_inventory counters that
+    drifted from COUNT(*) on ticket, creates missing rows, and overwrites the
+    Redis copies of the ones it fixes.
+    """
+    from app.db.session import SessionLocal  # lazy: keeps the DB out of email-only imports
+    from app.services import inventory_service
+
+    db = SessionLocal()
+    try:
+        inventory_service.reconcile_all(db)
+    finally:
+        db.close()
+
+
+@celery_app.task(
+    acks_late=True,
+    ignore_result=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=5,
+)
+def process_booking_requests(event_id: int) -> None:
+    """
+    Celery task: commits queued async booking intents for one event, in order.
+    Enqueued by POST /bookings/?mode=async; see booking_request_service.drain.
+    """
+    from app.services import booking_request_service  # lazy: avoids circular import
+
+    booking_request_service.drain(event_id)
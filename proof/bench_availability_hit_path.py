@@ -0,0 +1,112 @@
+"""
+bench_availability_hit_path.py
+------------------------------
+Cache-HIT cost of GET /events/{id}/availability on a large venue, before and
+after raw passthrough:
+
+  decoded — cached JSON → json.loads → EventAvailability validation →
+            FastAPI serializes it back to JSON (the old endpoint)
+  raw     — cached JSON text returned as-is in a Response (the current endpoint)
+
+Both routes sit in one throwaway FastAPI app and read the same Redis key
+through event_service.get_event_availability, so the only difference is what
+happens to the bytes after Redis.  A synthetic availability document for a
+ROWS x COLS venue is written straight to Redis; no database is touched.
+
+Expects Redis from the docker-compose stack:
+    docker compose exec backend python proof/bench_availability_hit_path.py
+
+The Redis keys it writes are deleted again at the end.
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app import schemas
+from app.db.cache import redis_client
+from app.services import cache_service, event_service
+
+ROWS, COLS = 50, 400            # 20 000 seats
+BOOKED_FRACTION = 0.3
+REQUESTS = 200
+EVENT_ID = 900_000_000 + random.randint(0, 99_999)   # far above any real event id
+
+
+def _seed() -> int:
+    seats = [
+        {"id": r * COLS + c + 1, "row": chr(65 + r) if r < 26 else "A" + chr(65 + r - 26), "number": c + 1}
+        for r in range(ROWS) for c in range(COLS)
+    ]
+    booked = [s for s in seats if random.random() < BOOKED_FRACTION]
+    booked_ids = {s["id"] for s in booked}
+    data = schemas.EventAvailability.model_validate({
+        "total_seats": len(seats),
+        "available_seats": len(seats) - len(booked),
+        "booked_seats": len(booked),
+        "available": [s for s in seats if s["id"] not in booked_ids],
+        "booked": booked,
+        "version": 0,
+    }).model_dump()
+    cache_service.set_to_cache(f"availability:{EVENT_ID}", data, ex=600)
+    return redis_client.strlen(f"availability:{EVENT_ID}")
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/decoded/{event_id}", response_model=schemas.EventAvailability)
+    def decoded(event_id: int):
+        return event_service.get_event_availability(None, event_id)
+
+    @app.get("/raw/{event_id}")
+    def raw(event_id: int):
+        return Response(
+            content=event_service.get_event_availability(None, event_id, raw=True),
+            media_type="application/json",
+        )
+
+    return app
+
+
+def _time(client: TestClient, path: str) -> list:
+    client.get(path)  # warm up
+    samples = []
+    for _ in range(REQUESTS):
+        t0 = time.perf_counter()
+        res = client.get(path)
+        samples.append((time.perf_counter() - t0) * 1000)
+        assert res.status_code == 200
+    return samples
+
+
+def main():
+    size = _seed()
+    try:
+        client = TestClient(_app())
+        print(f"{ROWS * COLS} seats · {size / 1024:.0f} KiB cached · {REQUESTS} hits per path\n")
+        print(f"{'path':>8} | {'mean ms':>8} | {'p50 ms':>7} | {'p99 ms':>7}")
+        print("-" * 40)
+        results = {}
+        for name in ("decoded", "raw"):
+            samples = sorted(_time(client, f"/{name}/{EVENT_ID}"))
+            results[name] = statistics.mean(samples)
+            print(
+                f"{name:>8} | {results[name]:>8.2f} | {samples[len(samples) // 2]:>7.2f}"
+                f" | {samples[int(len(samples) * 0.99) - 1]:>7.2f}"
+            )
+        print(f"\nraw passthrough: {results['decoded'] / results['raw']:.1f}x faster per hit")
+    finally:
+        key = f"availability:{EVENT_ID}"
+        redis_client.delete(key, f"{key}:delta", f"{key}:stale", f"{key}:version")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+bench_best_available.py
+-----------------------
+Per-request cost of the best-available block search (seat_finder.find_block)
+on a 50 000-seat venue, straight from a booked-seat bitmap as stored by
+seat_bitmap — no Redis and no database are needed.
+
+Scenarios:
+  empty       nothing booked — the first row answers
+  scattered   60% of seats booked at random
+  back rows   front rows sold out, only the last row has a block
+  sold out    no block of the party size anywhere — every row is searched
+
+Run from the repository root (or inside the backend container):
+    python proof/bench_best_available.py
+"""
+
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import seat_bitmap, seat_finder
+
+ROWS, COLS = 100, 500           # 50 000 seats
+PARTY = 6
+ITERATIONS = 200
+
+
+def _meta() -> dict:
+    positions = {pos + 1: pos for pos in range(ROWS * COLS)}
+    return {
+        "rows": ROWS,
+        "cols": COLS,
+        "seat_id_runs": json.dumps(seat_bitmap.seat_id_runs(positions, ROWS * COLS)),
+    }
+
+
+def _bitmap(booked) -> bytes:
+    bitmap = bytearray((ROWS * COLS + 7) // 8)
+    for pos in booked:
+        bitmap[pos >> 3] |= 0x80 >> (pos & 7)
+    return bytes(bitmap)
+
+
+def _scenarios() -> dict:
+    every = range(ROWS * COLS)
+    # Free seats only in pairs: no block of PARTY anywhere
+    sold_out = [pos for pos in every if pos % COLS % 3 == 2]
+    return {
+        "empty":     _bitmap([]),
+        "scattered": _bitmap([pos for pos in every if random.random() < 0.6]),
+        "back rows": _bitmap(range((ROWS - 1) * COLS)),
+        "sold out":  _bitmap(sold_out),
+    }
+
+
+def main():
+    meta = _meta()
+    held = random.sample(range(1, ROWS * COLS + 1), 500)
+    print(f"{ROWS * COLS} seats · party of {PARTY} · {len(held)} held seats · {ITERATIONS} searches\n")
+    print(f"{'scenario':>10} | {'mean ms':>8} | {'p99 ms':>7} | result")
+    print("-" * 50)
+    for name, bitmap in _scenarios().items():
+        samples = []
+        for _ in range(ITERATIONS):
+            t0 = time.perf_counter()
+            block = seat_finder.find_block(meta, bitmap, PARTY, held_seat_ids=held)
+            samples.append((time.perf_counter() - t0) * 1000)
+        samples.sort()
+        result = "none" if block is None else f"row #{block[0] + 1}, seats {block[1]}–{block[1] + PARTY - 1}"
+        print(
+            f"{name:>10} | {statistics.mean(samples):>8.3f}"
+            f" | {samples[int(len(samples) * 0.99) - 1]:>7.3f} | {result}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+bench_booking_roundtrips.py
+---------------------------
+Compares the two booking write paths in booking_service.create_new_booking:
+
+  orm   — flush() for booking.id, one Ticket object per seat, commit, re-query
+  bulk  — one INSERT ... RETURNING CTE for booking + tickets, commit
+
+For each group size it books fresh seats on a throwaway venue and records
+  • SQL statements sent to PostgreSQL per booking (one round trip each)
+  • commits per booking
+  • mean / p99 wall time per booking
+
+Runs against the same database the app is configured for (DATABASE_URL) and
+expects the docker-compose stack to be up (Celery .delay() needs RabbitMQ):
+    docker compose exec backend python proof/bench_booking_roundtrips.py
+
+Everything it creates is deleted again at the end.
+"""
+
+import os
+import sys
+import time
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event as sa_event, text
+
+from app import schemas
+from app.core.config import settings
+from app.db.session import engine, SessionLocal
+from app.models.user import UserRole
+from app.crud import crud_user
+from app.services import booking_service, event_service
+
+GROUP_SIZES = [1, 10, 25, 50]
+BOOKINGS_PER_SIZE = 20
+
+_counters = {"statements": 0, "commits": 0}
+
+
+@sa_event.listens_for(engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    _counters["statements"] += 1
+
+
+@sa_event.listens_for(engine, "commit")
+def _count_commit(conn):
+    _counters["commits"] += 1
+
+
+def _setup(db, cols: int) -> tuple:
+    ts = int(time.time() * 1000)
+    organizer = crud_user.create_user(db, user_in=schemas.UserCreate(
+        email=f"bench_org_{ts}@test.com", password="password123",
+        full_name="Bench Organizer", role=UserRole.organizer,
+    ))
+    customer = crud_user.create_user(db, user_in=schemas.UserCreate(
+        email=f"bench_cust_{ts}@test.com", password="password123",
+        full_name="Bench Customer", role=UserRole.customer,
+    ))
+    # Both modes book every group size BOOKINGS_PER_SIZE times from one pool
+    needed = sum(GROUP_SIZES) * BOOKINGS_PER_SIZE * 2
+    venue = event_service.create_venue(db, schemas.VenueCreate(
+        name=f"Roundtrip Bench Arena {ts}", rows=-(-needed // cols), cols=cols,
+    ))
+    event = event_service.create_event(db, schemas.EventCreate(
+        name="Roundtrip Bench", event_time="2099-12-31T20:00:00Z",
+        event_type="concert", venue_id=venue.id,
+    ), organizer_id=organizer.id)
+    seat_ids = [
+        sid for sid, in db.execute(
+            text("SELECT id FROM seat WHERE venue_id = :v ORDER BY id"), {"v": venue.id}
+        )
+    ]
+    return organizer, customer, venue, event, seat_ids
+
+
+def _teardown(db, organizer, customer, venue, event):
+    db.execute(text("DELETE FROM ticket WHERE event_id = :e"), {"e": event.id})
+    db.execute(text("DELETE FROM booking WHERE user_id = :u"), {"u": customer.id})
+    db.execute(text("DELETE FROM event WHERE id = :e"), {"e": event.id})
+    db.execute(text("DELETE FROM seat WHERE venue_id = :v"), {"v": venue.id})
+    db.execute(text("DELETE FROM venue WHERE id = :v"), {"v": venue.id})
+    db.execute(text('DELETE FROM "user" WHERE id IN (:a, :b)'), {"a": organizer.id, "b": customer.id})
+    db.commit()
+
+
+def _run(mode: str, db, event_id: int, user_id: int, seat_pool: list, size: int) -> dict:
+    settings.BOOKING_WRITE_MODE = mode
+    statements, commits, timings = [], [], []
+    for _ in range(BOOKINGS_PER_SIZE):
+        seats = [seat_pool.pop() for _ in range(size)]
+        _counters["statements"] = _counters["commits"] = 0
+        t0 = time.perf_counter()
+        booking_service.create_new_booking(
+            db, booking_in=schemas.BookingCreate(event_id=event_id, seat_ids=seats),
+            user_id=user_id,
+        )
+        timings.append((time.perf_counter() - t0) * 1000)
+        statements.append(_counters["statements"])
+        commits.append(_counters["commits"])
+        db.expire_all()
+    timings.sort()
+    return {
+        "statements": statistics.mean(statements),
+        "commits": statistics.mean(commits),
+        "mean_ms": statistics.mean(timings),
+        "p99_ms": timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+    }
+
+
+def main():
+    db = SessionLocal()
+    organizer, customer, venue, event, seat_pool = _setup(db, cols=max(GROUP_SIZES) * 2)
+    original_mode = settings.BOOKING_WRITE_MODE
+    try:
+        print(f"{'seats':>5} | {'mode':>4} | {'stmts':>5} | {'commits':>7} | {'mean ms':>8} | {'p99 ms':>8}")
+        print("-" * 54)
+        for size in GROUP_SIZES:
+            for mode in ("orm", "bulk"):
+                r = _run(mode, db, event.id, customer.id, seat_pool, size)
+                print(
+                    f"{size:>5} | {mode:>4} | {r['statements']:>5.1f} | {r['commits']:>7.1f} | "
+                    f"{r['mean_ms']:>8.2f} | {r['p99_ms']:>8.2f}"
+                )
+    finally:
+        settings.BOOKING_WRITE_MODE = original_mode
+        _teardown(db, organizer, customer, venue, event)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
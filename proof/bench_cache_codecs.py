@@ -0,0 +1,101 @@
+"""
+bench_cache_codecs.py
+---------------------
+Serialize / deserialize cost and stored size of one large cached value under
+each cache_service codec (CACHE_CODEC) and compression (CACHE_COMPRESSION):
+
+  json     — stdlib json, untagged (the original format)
+  orjson   — tagged \\x01, still JSON on the wire
+  msgpack  — tagged \\x02, binary
+  + zlib / lz4 wrapped around the codec output (tags \\x03 / \\x04)
+
+The value is a synthetic availability document for a ROWS x COLS venue, in
+the exact shape _build_and_cache_availability caches.  Timings go through
+cache_service's _encode / _compress and _unwrap / _decode — the steps every
+cache write and read takes — so they include the tag handling.
+Pure CPU — no Redis or database.
+
+    python proof/bench_cache_codecs.py
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services import cache_service
+
+ROWS, COLS = 50, 400            # 20 000 seats
+BOOKED_FRACTION = 0.3
+ROUNDS = 30
+CODECS = ["json", "orjson", "msgpack"]
+COMPRESSIONS = ["none", "zlib", "lz4"]
+
+
+def _document() -> dict:
+    seats = [
+        {"id": r * COLS + c + 1, "row": chr(65 + r) if r < 26 else "A" + chr(65 + r - 26), "number": c + 1}
+        for r in range(ROWS) for c in range(COLS)
+    ]
+    booked = [s for s in seats if random.random() < BOOKED_FRACTION]
+    booked_ids = {s["id"] for s in booked}
+    return {
+        "total_seats": len(seats),
+        "available_seats": len(seats) - len(booked),
+        "booked_seats": len(booked),
+        "available": [s for s in seats if s["id"] not in booked_ids],
+        "booked": booked,
+        "version": 0,
+    }
+
+
+def _ms(fn) -> float:
+    samples = []
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def _available(name: str) -> bool:
+    return {
+        "orjson": cache_service.orjson,
+        "msgpack": cache_service.msgpack,
+        "lz4": cache_service.lz4_frame,
+    }.get(name, True) is not None
+
+
+def main():
+    doc = _document()
+    original = settings.CACHE_CODEC, settings.CACHE_COMPRESSION
+    print(f"{ROWS * COLS} seats · median of {ROUNDS} rounds\n")
+    print(f"{'codec':>8} | {'compress':>8} | {'write ms':>8} | {'read ms':>8} | {'bytes':>9} | {'vs json':>7}")
+    print("-" * 66)
+    baseline = None
+    try:
+        for codec in CODECS:
+            for compression in COMPRESSIONS:
+                if not (_available(codec) and _available(compression)):
+                    print(f"{codec:>8} | {compression:>8} | not installed")
+                    continue
+                settings.CACHE_CODEC, settings.CACHE_COMPRESSION = codec, compression
+                stored = cache_service._compress(cache_service._encode(doc))
+                assert cache_service._decode(cache_service._unwrap(stored)) == doc
+                write = _ms(lambda: cache_service._compress(cache_service._encode(doc)))
+                read = _ms(lambda: cache_service._decode(cache_service._unwrap(stored)))
+                baseline = baseline or len(stored)
+                print(
+                    f"{codec:>8} | {compression:>8} | {write:>8.2f} | {read:>8.2f}"
+                    f" | {len(stored):>9} | {len(stored) / baseline:>6.0%}"
+                )
+    finally:
+        settings.CACHE_CODEC, settings.CACHE_COMPRESSION = original
+
+
+if __name__ == "__main__":
+    main()
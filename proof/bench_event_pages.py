@@ -0,0 +1,108 @@
+"""
+bench_event_pages.py
+--------------------
+Compares the two ways of paging the upcoming-events list (GET /events/):
+
+  offset  — ORDER BY event_time OFFSET n LIMIT k   (the old crud_event.get_events)
+  keyset  — WHERE (event_time, id) > cursor ORDER BY event_time, id LIMIT k
+            (crud_event.get_events since cursors; uses ix_event_event_time_id)
+
+It inserts EVENTS upcoming events on a throwaway venue, then times one page
+at increasing depths with each method. OFFSET reads and discards every row in
+front of the page, so it grows with the depth; keyset seeks straight to it.
+These are the DB reads behind a cache miss — hits never reach PostgreSQL.
+
+Runs against the same database the app is configured for (DATABASE_URL):
+    docker compose exec backend python proof/bench_event_pages.py
+
+Everything runs in one transaction that is rolled back at the end.
+"""
+
+import os
+import sys
+import time
+import statistics
+from datetime import datetime, time as time_of_day, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.orm import joinedload
+
+from app.crud import crud_event
+from app.db.session import SessionLocal
+from app.models.event import Event
+
+EVENTS = 50_000
+PAGE_SIZE = 100
+DEPTHS = [0, 1_000, 10_000, 25_000, 49_000]
+REPEATS = 20
+
+
+def _setup(db) -> None:
+    ts = int(time.time() * 1000)
+    organizer_id = db.execute(text("""
+        INSERT INTO "user" (email, full_name, hashed_password, is_active, role)
+        VALUES (:email, 'Bench Organizer', 'x', true, 'organizer') RETURNING id
+    """), {"email": f"bench_pages_{ts}@test.com"}).scalar()
+    venue_id = db.execute(text("""
+        INSERT INTO venue (name, rows, cols) VALUES (:name, 1, 1) RETURNING id
+    """), {"name": f"Pages Bench Arena {ts}"}).scalar()
+    # Many events share a start time, as on-sale calendars do: the tie on
+    # event_time is what the id half of the cursor is for
+    db.execute(text("""
+        INSERT INTO event (name, event_time, event_type, venue_id, organizer_id)
+        SELECT 'Bench ' || g,
+               now() + interval '1 day' + (g / 10) * interval '1 hour',
+               'concert', :venue_id, :organizer_id
+        FROM generate_series(1, :n) AS g
+    """), {"venue_id": venue_id, "organizer_id": organizer_id, "n": EVENTS})
+    db.execute(text("ANALYZE event"))
+
+
+def _offset_page(db, depth: int) -> list:
+    start_of_today_utc = datetime.combine(datetime.now(timezone.utc).date(), time_of_day.min, tzinfo=timezone.utc)
+    return (
+        db.query(Event)
+        .options(joinedload(Event.venue))
+        .filter(Event.event_time >= start_of_today_utc)
+        .order_by(Event.event_time, Event.id)
+        .offset(depth)
+        .limit(PAGE_SIZE)
+        .all()
+    )
+
+
+def _time(fn) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    db = SessionLocal()
+    try:
+        _setup(db)
+        print(f"{EVENTS} upcoming events, {PAGE_SIZE} per page, median of {REPEATS}\n")
+        print(f"{'depth':>7} | {'offset ms':>9} | {'keyset ms':>9}")
+        print("-" * 32)
+        for depth in DEPTHS:
+            # The row in front of the page is what a client's cursor points at
+            before = _offset_page(db, depth - 1)[0] if depth else None
+            after = None if before is None else (before.event_time, before.id)
+            offset_ms = _time(lambda: _offset_page(db, depth))
+            keyset_ms = _time(lambda: crud_event.get_events(db, after=after, limit=PAGE_SIZE))
+            assert [e.id for e in _offset_page(db, depth)] == [
+                e.id for e in crud_event.get_events(db, after=after, limit=PAGE_SIZE)
+            ]
+            print(f"{depth:>7} | {offset_ms:>9.2f} | {keyset_ms:>9.2f}")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+bench_group_commit.py
+---------------------
+Bookings/second on ONE hot event: per-request commits vs group commit.
+
+  per-request — every booking runs its own transaction and COMMIT
+  group       — BOOKING_BATCH_ENABLED: same-event bookings arriving within
+                BOOKING_BATCH_WINDOW_MS share one transaction (one COMMIT)
+
+CONCURRENCY threads each book single seats (distinct, so every request
+succeeds and the numbers measure commit throughput, not conflicts) through
+booking_service.create_new_booking with their own DB session — the same call
+the POST /bookings/ endpoint makes.
+
+Expects the docker-compose stack (PostgreSQL, Redis, RabbitMQ for .delay()):
+    docker compose exec backend python proof/bench_group_commit.py
+
+Everything it creates is deleted again at the end.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app import schemas
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.user import UserRole
+from app.crud import crud_user
+from app.services import booking_service, event_service
+
+CONCURRENCY = 24   # stays inside the app pool (pool_size=20 + max_overflow=10)
+BOOKINGS_PER_RUN = 2000
+WINDOWS_MS = [2, 5, 10]
+
+
+def _setup(db) -> tuple:
+    ts = int(time.time() * 1000)
+    organizer = crud_user.create_user(db, user_in=schemas.UserCreate(
+        email=f"gc_org_{ts}@test.com", password="password123",
+        full_name="Group Commit Organizer", role=UserRole.organizer,
+    ))
+    customer = crud_user.create_user(db, user_in=schemas.UserCreate(
+        email=f"gc_cust_{ts}@test.com", password="password123",
+        full_name="Group Commit Customer", role=UserRole.customer,
+    ))
+    runs = 1 + len(WINDOWS_MS)
+    cols = 100
+    venue = event_service.create_venue(db, schemas.VenueCreate(
+        name=f"Group Commit Arena {ts}", rows=-(-BOOKINGS_PER_RUN * runs // cols), cols=cols,
+    ))
+    event = event_service.create_event(db, schemas.EventCreate(
+        name="Group Commit Bench", event_time="2099-12-31T20:00:00Z",
+        event_type="concert", venue_id=venue.id,
+    ), organizer_id=organizer.id)
+    seat_ids = [
+        sid for sid, in db.execute(
+            text("SELECT id FROM seat WHERE venue_id = :v ORDER BY id"), {"v": venue.id}
+        )
+    ]
+    return organizer, customer, venue, event, seat_ids
+
+
+def _teardown(db, organizer, customer, venue, event):
+    db.execute(text("DELETE FROM ticket WHERE event_id = :e"), {"e": event.id})
+    db.execute(text("DELETE FROM booking WHERE user_id = :u"), {"u": customer.id})
+    db.execute(text("DELETE FROM event WHERE id = :e"), {"e": event.id})
+    db.execute(text("DELETE FROM seat WHERE venue_id = :v"), {"v": venue.id})
+    db.execute(text("DELETE FROM venue WHERE id = :v"), {"v": venue.id})
+    db.execute(text('DELETE FROM "user" WHERE id IN (:a, :b)'), {"a": organizer.id, "b": customer.id})
+    db.commit()
+
+
+def _book(event_id: int, user_id: int, seat_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        booking_service.create_new_booking(
+            db, booking_in=schemas.BookingCreate(event_id=event_id, seat_ids=[seat_id]),
+            user_id=user_id,
+        )
+        return True
+    except Exception:
+        return False
+    finally:
+        db.close()
+
+
+def _run(event_id: int, user_id: int, seats: list) -> tuple:
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        ok = sum(pool.map(lambda s: _book(event_id, user_id, s), seats))
+    elapsed = time.perf_counter() - t0
+    return ok, ok / elapsed
+
+
+def main():
+    db = SessionLocal()
+    organizer, customer, venue, event, seat_pool = _setup(db)
+    original = settings.BOOKING_BATCH_ENABLED
+    try:
+        print(f"{CONCURRENCY} threads · {BOOKINGS_PER_RUN} single-seat bookings per run · 1 event\n")
+        print(f"{'mode':>18} | {'ok':>5} | {'bookings/s':>10}")
+        print("-" * 40)
+
+        settings.BOOKING_BATCH_ENABLED = False
+        seats, seat_pool = seat_pool[:BOOKINGS_PER_RUN], seat_pool[BOOKINGS_PER_RUN:]
+        ok, rate = _run(event.id, customer.id, seats)
+        print(f"{'per-request':>18} | {ok:>5} | {rate:>10.1f}")
+
+        settings.BOOKING_BATCH_ENABLED = True
+        for window in WINDOWS_MS:
+            booking_service._coalescer.window_ms = window
+            seats, seat_pool = seat_pool[:BOOKINGS_PER_RUN], seat_pool[BOOKINGS_PER_RUN:]
+            ok, rate = _run(event.id, customer.id, seats)
+            print(f"{f'group {window} ms':>18} | {ok:>5} | {rate:>10.1f}")
+    finally:
+        settings.BOOKING_BATCH_ENABLED = original
+        booking_service._coalescer.window_ms = settings.BOOKING_BATCH_WINDOW_MS
+        _teardown(db, organizer, customer, venue, event)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import json
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.cache import redis_client, redis_raw_client
+from app.services import cache_service, local_cache
+
+
+def test_booking_patches_cached_availability_in_place(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="patch-arena", rows=1, cols=4)
+    headers = customer_headers("patch@customer.com")
+    # create_event primed the cache
+    before = json.loads(redis_client.get(f"availability:{event_id}"))
+    seat_id = before["available"][1]["id"]
+
+    res = client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": [seat_id]}, headers=headers
+    )
+    assert res.status_code == 200
+
+    after = json.loads(redis_client.get(f"availability:{event_id}"))
+    assert after["version"] == before["version"] + 1
+    assert after["available_seats"] == 3 and after["booked_seats"] == 1
+    assert [s["id"] for s in after["booked"]] == [seat_id]
+
+    served = client.get(f"/api/v1/events/{event_id}/availability").json()
+    assert served["booked"] == after["booked"]
+
+
+def test_availability_rebuild_composes_cached_venue_layout(
+    client: TestClient, db: Session, organizer_event,
+):
+    event_id = organizer_event(venue_name="layout-arena", rows=3, cols=2)
+    venue_id = client.get(f"/api/v1/events/{event_id}").json()["venue"]["id"]
+    layout = json.loads(redis_client.get(f"seats:venue:{venue_id}:layout"))
+    assert redis_client.ttl(f"seats:venue:{venue_id}:layout") == -1
+    assert [(row, number) for _, row, number in layout["seats"]] == [
+        ("A", 1), ("A", 2), ("B", 1), ("B", 2), ("C", 1), ("C", 2),
+    ]
+
+    # Force a miss: the rebuild reads the layout plus this event's tickets
+    redis_client.delete(f"availability:{event_id}")
+    available = client.get(f"/api/v1/events/{event_id}/availability").json()["available"]
+    assert [s["id"] for s in available] == [seat_id for seat_id, _, _ in layout["seats"]]
+
+
+def test_availability_miss_during_rebuild_serves_stale_copy(
+    client: TestClient, db: Session, organizer_event,
+):
+    event_id = organizer_event(venue_name="stampede-arena", rows=1, cols=3)
+    key = f"availability:{event_id}"
+    fresh = client.get(f"/api/v1/events/{event_id}/availability").json()
+    assert redis_client.get(f"{key}:stale") is None  # no second copy while the key is live
+
+    # Invalidated while another reader holds the rebuild lock
+    cache_service.delete_from_cache(key)
+    assert 0 < redis_client.ttl(f"{key}:stale") <= settings.CACHE_REBUILD_LOCK_SECONDS
+    redis_client.set(f"{key}:lock", "someone-else", ex=5)
+    stale_before = client.get("/api/v1/metrics").json()["cache"]["stale_served"]
+    try:
+        assert client.get(f"/api/v1/events/{event_id}/availability").json() == fresh
+    finally:
+        redis_client.delete(f"{key}:lock")
+    assert client.get("/api/v1/metrics").json()["cache"]["stale_served"] == stale_before + 1
+
+    client.get(f"/api/v1/events/{event_id}/availability")  # the rebuild lands…
+    assert redis_client.get(f"{key}:stale") is None       # …and drops the copy
+
+
+def test_local_cache_tier_is_invalidated_by_bookings(
+    client: TestClient, db: Session, monkeypatch,
+    organizer_event, customer_headers,
+):
+    monkeypatch.setattr(settings, "LOCAL_CACHE_ENABLED", True)
+    event_id = organizer_event(venue_name="local-arena", rows=1, cols=3)
+    headers = customer_headers("local@customer.com")
+
+    client.get(f"/api/v1/events/{event_id}/availability")  # starts the listener
+    deadline = time.monotonic() + 5
+    while not local_cache.stats()["subscribed"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    seat_id = client.get(f"/api/v1/events/{event_id}/availability").json()["available"][0]["id"]
+    hits = local_cache.stats()["hits"]
+    client.get(f"/api/v1/events/{event_id}/availability")
+    assert local_cache.stats()["hits"] == hits + 1
+
+    assert client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": [seat_id]}, headers=headers
+    ).status_code == 200
+    served = client.get(f"/api/v1/events/{event_id}/availability").json()
+    assert [s["id"] for s in served["booked"]] == [seat_id]
+
+
+def test_cached_availability_is_served_as_stored_bytes(
+    client: TestClient, db: Session, organizer_event,
+):
+    event_id = organizer_event(venue_name="raw-arena", rows=2, cols=3)
+    res = client.get(f"/api/v1/events/{event_id}/availability")
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/json"
+    assert res.text == redis_client.get(f"availability:{event_id}")
+    assert res.json()["available_seats"] == 6
+
+
+def test_msgpack_codec_cache_still_serves_json(
+    client: TestClient, db: Session, monkeypatch, organizer_event, customer_headers,
+):
+    monkeypatch.setattr(settings, "CACHE_CODEC", "msgpack")
+    event_id = organizer_event(venue_name="msgpack-arena", rows=2, cols=2)
+    headers = customer_headers("msgpack@customer.com")
+
+    assert redis_raw_client.get(f"availability:{event_id}")[:1] == b"\x02"
+    seat_id = client.get(f"/api/v1/events/{event_id}/availability").json()["available"][0]["id"]
+    assert client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": [seat_id]}, headers=headers
+    ).status_code == 200
+
+    res = client.get(f"/api/v1/events/{event_id}/availability")
+    assert res.headers["content-type"] == "application/json"
+    assert [s["id"] for s in res.json()["booked"]] == [seat_id]
+
+
+def test_large_cached_values_are_compressed_transparently(
+    client: TestClient, db: Session, monkeypatch,
+    organizer_event,
+):
+    monkeypatch.setattr(settings, "CACHE_COMPRESSION", "zlib")
+    monkeypatch.setattr(settings, "CACHE_COMPRESS_MIN_BYTES", 256)
+    event_id = organizer_event(venue_name="zlib-arena", rows=4, cols=10)
+
+    stored = redis_raw_client.get(f"availability:{event_id}")
+    assert stored[:1] == b"\x03"
+    res = client.get(f"/api/v1/events/{event_id}/availability")
+    assert res.json()["total_seats"] == 40
+    assert len(res.content) > len(stored)
+
+    cache = client.get("/api/v1/metrics").json()["cache"]
+    assert cache["compression_ratio"] >= 1.0 and cache["avg_stored_bytes"] > 0
+
+
+def test_availability_since_version_returns_only_changes(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="delta-arena", rows=1, cols=4)
+    headers = customer_headers("delta@customer.com")
+    snapshot = client.get(f"/api/v1/events/{event_id}/availability").json()
+    seats = [s["id"] for s in snapshot["available"]]
+    for seat_ids in ([seats[0], seats[2]], [seats[3]]):
+        assert client.post(
+            "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": seat_ids}, headers=headers
+        ).status_code == 200
+
+    delta = client.get(f"/api/v1/events/{event_id}/availability?since={snapshot['version']}").json()
+    assert delta == {
+        "since": snapshot["version"],
+        "version": snapshot["version"] + 2,
+        "booked_seat_ids": [seats[0], seats[2], seats[3]],
+    }
+    current = client.get(f"/api/v1/events/{event_id}/availability?since={delta['version']}").json()
+    assert current["booked_seat_ids"] == []
+
+    # Changelog rolled past the client's version: full snapshot instead
+    redis_client.delete(f"availability:{event_id}:changelog")
+    full = client.get(f"/api/v1/events/{event_id}/availability?since={snapshot['version']}").json()
+    assert full["version"] == delta["version"] and full["booked_seats"] == 3
+
+
+def test_missing_event_404_runs_its_builder_once(client: TestClient, db: Session, monkeypatch):
+    from app.services import event_service
+
+    calls = []
+    build = event_service._build_and_cache_availability
+
+    def counting_build(db, event_id):
+        calls.append(event_id)
+        return build(db, event_id)
+
+    monkeypatch.setattr(event_service, "_build_and_cache_availability", counting_build)
+    event_id = 900_000_000 + uuid.uuid4().int % 100_000
+    res = client.get(f"/api/v1/events/{event_id}/availability")
+    assert res.status_code == 404
+    assert calls == [event_id]
+    assert redis_client.get(f"availability:{event_id}:lock") is None  # released
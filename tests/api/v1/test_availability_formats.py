@@ -0,0 +1,101 @@
+import base64
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db.cache import redis_client
+from app.services import seat_bitmap
+
+
+def test_compact_availability_formats(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="compact-arena", rows=2, cols=4)
+    headers = customer_headers("compact@customer.com")
+    seats = client.get(f"/api/v1/events/{event_id}/availability").json()["available"]
+    # Positions are row-major: A1..A4 -> 0..3, B1..B4 -> 4..7
+    booked = [s["id"] for s in seats if (s["row"], s["number"]) in {("A", 2), ("A", 3), ("B", 4)}]
+    assert client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": booked}, headers=headers
+    ).status_code == 200
+
+    rle = client.get(f"/api/v1/events/{event_id}/availability?format=rle").json()
+    assert rle["booked_seats"] == 3 and rle["available_seats"] == 5
+    assert rle["booked_runs"] == [[1, 2], [7, 1]]
+    assert rle["seat_id_runs"] == [[min(s["id"] for s in seats), 8]]
+    assert "available" not in rle
+
+    bitmap = client.get(f"/api/v1/events/{event_id}/availability?format=bitmap").json()
+    assert base64.b64decode(bitmap["booked_bitmap"]) == bytes([0b01100001])
+
+
+def test_availability_rows_returns_only_that_slice(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="rows-arena", rows=4, cols=5)
+    headers = customer_headers("rows@customer.com")
+    seats = client.get(f"/api/v1/events/{event_id}/availability").json()["available"]
+    b2 = next(s["id"] for s in seats if (s["row"], s["number"]) == ("B", 2))
+    assert client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": [b2]}, headers=headers
+    ).status_code == 200
+
+    res = client.get(f"/api/v1/events/{event_id}/availability?rows=B-C")
+    sliced = res.json()
+    assert sliced["total_seats"] == 10 and sliced["available_seats"] == 9
+    assert [s["id"] for s in sliced["booked"]] == [b2]
+    assert {s["row"] for s in sliced["available"]} == {"B", "C"}
+    assert res.headers["ETag"] == f'"availability-{event_id}-rows.B-C-{sliced["version"]}"'
+
+    assert client.get(f"/api/v1/events/{event_id}/availability?rows=E").status_code == 422
+
+
+def test_batch_availability_summaries(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    first = organizer_event(venue_name="batch-arena-1", rows=1, cols=4)
+    second = organizer_event(venue_name="batch-arena-2", rows=2, cols=3)
+    headers = customer_headers("batch@customer.com")
+    seat_id = client.get(f"/api/v1/events/{second}/availability").json()["available"][0]["id"]
+    assert client.post(
+        "/api/v1/bookings/", json={"event_id": second, "seat_ids": [seat_id]}, headers=headers
+    ).status_code == 200
+    # Counters not cached for the second event: read from event_inventory…
+    redis_client.delete(f"inventory:{second}")
+
+    res = client.get(f"/api/v1/events/availability?ids={second},{first},999999")
+    assert res.status_code == 200
+    assert [(s["event_id"], s["total_seats"], s["booked_seats"]) for s in res.json()] == [
+        (second, 6, 1), (first, 4, 0),
+    ]
+    # …and written back, so the next listing view is a Redis hit
+    assert redis_client.hgetall(f"inventory:{second}") == {"total": "6", "booked": "1"}
+    assert client.get("/api/v1/events/availability?ids=1,x").status_code == 422
+
+
+def test_bitmap_views_keep_a_booking_a_racing_rebuild_missed(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="race-view-arena", rows=2, cols=2)
+    headers = customer_headers("race-view@customer.com")
+    seats = client.get(f"/api/v1/events/{event_id}/availability").json()["available"]
+
+    loaded = seat_bitmap.load(db, event_id)  # rebuild reads before the commit
+    booking = {"event_id": event_id, "seat_ids": [seats[3]["id"]]}
+    assert client.post("/api/v1/bookings/", json=booking, headers=headers).status_code == 200
+    seat_bitmap.store(event_id, *loaded)      # and writes after its mark
+
+    url = f"/api/v1/events/{event_id}/availability"
+    compact = client.get(url, params={"format": "bitmap"})
+    assert base64.b64decode(compact.json()["booked_bitmap"]) == bytes([0b00010000])
+    # Tagged by the bits served: a 304 only ever means the same seat map
+    etag = compact.headers["ETag"]
+    again = client.get(url, params={"format": "bitmap"}, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    seat_bitmap.mark_booked(event_id, [seats[0]["id"]])
+    changed = client.get(url, params={"format": "bitmap"}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+    assert client.get(url, params={"rows": "B"}).json()["booked_seats"] == 1
+    summary = client.get(f"/api/v1/events/availability?ids={event_id}").json()
+    assert summary[0]["booked_seats"] == 1
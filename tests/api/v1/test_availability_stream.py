@@ -0,0 +1,25 @@
+import json
+import uuid
+
+from app.services import availability_stream
+
+
+async def test_availability_stream_sends_snapshot_then_deltas():
+    event_id = 900_000_000 + uuid.uuid4().int % 100_000  # no DB rows needed
+    subscriber = await availability_stream.subscribe(event_id)
+    snapshot = json.dumps({"version": 3, "available": [], "booked": []}).encode()
+
+    async def reload():
+        return snapshot
+
+    stream = availability_stream.events(event_id, subscriber, snapshot, reload)
+    try:
+        assert (await stream.__anext__()).startswith(b"event: snapshot\nid: 3\n")
+
+        availability_stream.publish_booked(event_id, [11], 3)      # covered by the snapshot
+        availability_stream.publish_booked(event_id, [12, 13], 4)
+        chunk = await stream.__anext__()
+        assert chunk.startswith(b"event: booked\nid: 4\n")
+        assert json.loads(chunk.split(b"data: ", 1)[1])["seat_ids"] == [12, 13]
+    finally:
+        await stream.aclose()
@@ -0,0 +1,316 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.core.config import settings
+from app.crud import crud_user
+from app.db.session import SessionLocal
+from app.models.booking import Ticket
+from app.models.user import User, UserRole
+from app.services import booking_request_service, booking_service, event_service
+from app.services.booking_batcher import BookingCoalescer
+
+
+def test_bulk_write_mode_books_group_in_one_statement(
+    client: TestClient, db: Session, monkeypatch,
+    organizer_event, customer_headers,
+):
+    monkeypatch.setattr(settings, "BOOKING_WRITE_MODE", "bulk")
+
+    event_id = organizer_event(venue_name="bulk-arena", rows=2, cols=20)
+    headers = customer_headers("bulk@customer.com")
+
+    available = client.get(f"/api/v1/events/{event_id}/availability").json()["available"]
+    group = [s["id"] for s in available[:15]]
+
+    res = client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": group}, headers=headers
+    )
+    assert res.status_code == 200
+    booking = res.json()
+    assert [t["seat"]["id"] for t in booking["tickets"]] == group
+    assert all(t["event"]["id"] == event_id for t in booking["tickets"])
+    assert booking["tickets"][0]["event"]["venue"]["name"] == "bulk-arena"
+
+    after = client.get(f"/api/v1/events/{event_id}/availability").json()
+    assert after["booked_seats"] == 15
+
+    # Any overlap with the committed group is rejected by _event_seat_uc
+    conflict = client.post(
+        "/api/v1/bookings/",
+        json={"event_id": event_id, "seat_ids": [available[20]["id"], group[0]]},
+        headers=headers,
+    )
+    assert conflict.status_code == 409
+
+
+def test_async_mode_returns_202_and_pollable_request(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="async-arena", rows=1, cols=5)
+    headers = customer_headers("async@customer.com")
+    seat_id = client.get(f"/api/v1/events/{event_id}/availability").json()["available"][0]["id"]
+
+    res = client.post(
+        "/api/v1/bookings/?mode=async",
+        json={"event_id": event_id, "seat_ids": [seat_id]},
+        headers=headers,
+    )
+    assert res.status_code == 202
+    request = res.json()
+    assert request["status"] == "pending"
+    assert res.headers["Location"].endswith(request["request_id"])
+
+    # No worker runs in the test process — the intent stays pending
+    poll = client.get(f"/api/v1/bookings/requests/{request['request_id']}", headers=headers)
+    assert poll.status_code == 200
+    assert poll.json()["status"] == "pending"
+
+    # Someone else's request id is not visible
+    other = customer_headers("nosy@customer.com")
+    assert client.get(
+        f"/api/v1/bookings/requests/{request['request_id']}", headers=other
+    ).status_code == 404
+
+
+def test_async_retry_after_commit_confirms_instead_of_rebooking(
+    client: TestClient, db: Session, monkeypatch, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="async-retry-arena", rows=1, cols=3)
+    headers = customer_headers("async-retry@customer.com")
+    seat_id = client.get(f"/api/v1/events/{event_id}/availability").json()["available"][0]["id"]
+    request_id = client.post(
+        "/api/v1/bookings/?mode=async", json={"event_id": event_id, "seat_ids": [seat_id]}, headers=headers
+    ).json()["request_id"]
+
+    finish = booking_request_service._finish
+
+    def crash_after_commit(request_id, **fields):
+        if fields.get("status") == "confirmed":
+            raise ConnectionError("worker lost Redis after the commit")
+        finish(request_id, **fields)
+
+    monkeypatch.setattr(booking_request_service, "_finish", crash_after_commit)
+    with pytest.raises(ConnectionError):
+        booking_request_service._process_one(db, request_id)
+    monkeypatch.setattr(booking_request_service, "_finish", finish)
+    booking_request_service._process_one(db, request_id)  # the task's retry
+
+    outcome = client.get(f"/api/v1/bookings/requests/{request_id}", headers=headers).json()
+    assert outcome["status"] == "confirmed" and outcome["booking_id"] is not None
+    assert db.query(Ticket).filter(Ticket.event_id == event_id).count() == 1
+
+    assert client.post(
+        "/api/v1/bookings/?mode=async", json={"event_id": 999_999, "seat_ids": [seat_id]}, headers=headers
+    ).status_code == 404
+
+
+def test_group_commit_mode_keeps_per_request_outcomes(
+    client: TestClient, db: Session, monkeypatch,
+    organizer_event, customer_headers,
+):
+    monkeypatch.setattr(settings, "BOOKING_BATCH_ENABLED", True)
+
+    event_id = organizer_event(venue_name="batch-arena", rows=1, cols=5)
+    headers = customer_headers("batch@customer.com")
+    seats = [s["id"] for s in client.get(f"/api/v1/events/{event_id}/availability").json()["available"]]
+    # Through the route and the app's coalescer: a batch of one
+    assert client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": [seats[3]]}, headers=headers
+    ).status_code == 200
+    user_id = db.query(User.id).filter(User.email == "batch@customer.com").scalar()
+
+    # Four overlapping requests from threads, held in ONE batch (closed at
+    # max_size, long before the window). Only the leader touches the session.
+    sizes = []
+
+    def commit(db, items):
+        sizes.append(len(items))
+        return booking_service.commit_booking_batch(db, items)
+
+    coalescer = BookingCoalescer(commit, window_ms=5000, max_size=4, wait_seconds=30)
+    requests = {
+        "a": [seats[0]],
+        "b": [seats[0]],             # same seat as a: rejected in memory
+        "c": [seats[1], seats[3]],   # seats[3] is committed: its SAVEPOINT rolls back
+        "d": [seats[1]],             # books fine whether it runs before or after c
+    }
+
+    def submit(seat_ids):
+        try:
+            booking_in = schemas.BookingCreate(event_id=event_id, seat_ids=seat_ids)
+            booking = coalescer.submit(db, booking_in=booking_in, user_id=user_id)
+            return 200, [t.seat.id for t in booking.tickets]
+        except HTTPException as e:
+            return e.status_code, None
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        outcomes = dict(zip(requests, pool.map(submit, requests.values())))
+
+    assert sizes == [4]
+    assert sorted([outcomes["a"][0], outcomes["b"][0]]) == [200, 409]
+    assert outcomes["c"] == (409, None)
+    assert outcomes["d"] == (200, [seats[1]])
+    booked = sorted(seat_id for seat_id, in db.query(Ticket.seat_id).filter(Ticket.event_id == event_id))
+    assert booked == sorted([seats[0], seats[1], seats[3]])
+
+
+def test_group_commit_followers_time_out_instead_of_hanging():
+    release = threading.Event()
+
+    def stuck_commit(db, items):
+        release.wait(5)
+        return [None] * len(items)
+
+    coalescer = BookingCoalescer(stuck_commit, window_ms=5000, max_size=2, wait_seconds=0.2)
+    booking_in = schemas.BookingCreate(event_id=1, seat_ids=[1])
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(coalescer.submit, None, booking_in=booking_in, user_id=1)
+        time.sleep(0.05)
+        follower = pool.submit(coalescer.submit, None, booking_in=booking_in, user_id=2)
+        with pytest.raises(TimeoutError):
+            follower.result(timeout=5)
+        release.set()
+        assert leader.result(timeout=5) is None
+
+
+def test_group_commit_followers_release_their_session_and_get_their_own_exception():
+    released = []
+    failure = HTTPException(status_code=409, detail="taken")
+    coalescer = BookingCoalescer(
+        lambda db, items: [failure] * len(items),
+        window_ms=5000, max_size=3, wait_seconds=5, release=released.append,
+    )
+    booking_in = schemas.BookingCreate(event_id=1, seat_ids=[1])
+
+    def submit(session):
+        try:
+            coalescer.submit(session, booking_in=booking_in, user_id=1)
+        except HTTPException as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        raised = list(pool.map(submit, ["s0", "s1", "s2"]))
+
+    assert len(released) == 2  # every session but the leader's
+    assert len({id(e) for e in raised}) == 3 and failure not in raised
+    assert all(e.status_code == 409 and e.__cause__ is failure for e in raised)
+
+
+def test_idempotency_key_replays_first_response(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="idem-arena", rows=1, cols=5)
+    headers = customer_headers("idem@customer.com")
+    seats = [s["id"] for s in client.get(f"/api/v1/events/{event_id}/availability").json()["available"]]
+    # User ids repeat across rolled-back test runs; the key must not
+    keyed = {**headers, "Idempotency-Key": uuid.uuid4().hex}
+    body = {"event_id": event_id, "seat_ids": seats[:2]}
+
+    first = client.post("/api/v1/bookings/", json=body, headers=keyed)
+    assert first.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+
+    retry = client.post("/api/v1/bookings/", json=body, headers=keyed)
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert len(client.get("/api/v1/bookings/my", headers=headers).json()) == 1
+
+    # Same key, different body
+    reused = client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": seats[2:3]}, headers=keyed
+    )
+    assert reused.status_code == 422
+
+
+def test_overlapping_concurrent_batches_do_not_deadlock(monkeypatch):
+    # Two batches must run in two real transactions, so (like test_concurrency)
+    # this commits through the app's engine and deletes what it made afterwards
+    setup = SessionLocal()
+    ts = uuid.uuid4().hex[:12]
+    user = crud_user.create_user(setup, user_in=schemas.UserCreate(
+        email=f"overlap_{ts}@test.com", password="password123",
+        full_name="Overlap", role=UserRole.organizer,
+    ))
+    venue = event_service.create_venue(
+        setup, schemas.VenueCreate(name=f"Overlap Arena {ts}", rows=1, cols=3)
+    )
+    event = event_service.create_event(setup, schemas.EventCreate(
+        name="Overlap", event_time="2099-12-31T20:00:00Z", event_type="concert", venue_id=venue.id,
+    ), organizer_id=user.id)
+    event_id, user_id, venue_id = event.id, user.id, venue.id
+    s1, s2, s3 = [seat.id for seat in sorted(venue.seats, key=lambda seat: seat.number)]
+
+    # X books s1, then tries s2 only once Y's first item (which books s2) is in flight
+    execute = booking_service._execute_bulk_insert
+    x_first_done, y_started = threading.Event(), threading.Event()
+
+    def interleaved(db, **kwargs):
+        name = threading.current_thread().name
+        if name == "batch-y" and not y_started.is_set():
+            x_first_done.wait(5)
+            y_started.set()
+        elif name == "batch-x" and x_first_done.is_set():
+            y_started.wait(5)
+            time.sleep(0.3)
+        rows = execute(db, **kwargs)
+        if name == "batch-x":
+            x_first_done.set()
+        return rows
+
+    monkeypatch.setattr(booking_service, "_execute_bulk_insert", interleaved)
+    outcomes = {}
+
+    def run(name, seat_groups):
+        db = SessionLocal()
+        try:
+            items = [
+                (schemas.BookingCreate(event_id=event_id, seat_ids=seats), user_id)
+                for seats in seat_groups
+            ]
+            outcomes[name] = booking_service.commit_booking_batch(db, items)
+        except Exception as e:
+            outcomes[name] = e
+        finally:
+            db.close()
+
+    threads = [
+        threading.Thread(target=run, name="batch-x", args=("x", [[s1], [s2]])),
+        threading.Thread(target=run, name="batch-y", args=("y", [[s2], [s3]])),
+    ]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(30)
+
+        x, y = outcomes["x"], outcomes["y"]
+        assert not isinstance(x, Exception) and not isinstance(y, Exception), outcomes
+        assert isinstance(x[0], schemas.Booking) and x[1].status_code == 409
+        assert all(isinstance(b, schemas.Booking) for b in y)
+        booked = setup.execute(
+            text("SELECT booked_seats FROM event_inventory WHERE event_id = :e"), {"e": event_id}
+        ).scalar()
+        assert booked == 3
+    finally:
+        setup.rollback()
+        for statement in (
+            "DELETE FROM ticket WHERE event_id = :e",
+            "DELETE FROM booking WHERE user_id = :u",
+            "DELETE FROM event WHERE id = :e",
+            "DELETE FROM seat WHERE venue_id = :v",
+            "DELETE FROM venue WHERE id = :v",
+            'DELETE FROM "user" WHERE id = :u',
+        ):
+            setup.execute(text(statement), {"e": event_id, "u": user_id, "v": venue_id})
+        setup.commit()
+        setup.close()
@@ -0,0 +1,53 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db.cache import redis_client
+
+
+def test_event_summary_counters_and_reconciliation(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    from app.models import EventInventory
+    from app.services import inventory_service
+
+    event_id = organizer_event(venue_name="summary-arena", rows=2, cols=5)
+    headers = customer_headers("summary@customer.com")
+    seats = client.get(f"/api/v1/events/{event_id}/availability").json()["available"]
+    assert client.post(
+        "/api/v1/bookings/",
+        json={"event_id": event_id, "seat_ids": [seats[0]["id"], seats[1]["id"]]},
+        headers=headers,
+    ).status_code == 200
+
+    summary = client.get(f"/api/v1/events/{event_id}/summary").json()
+    assert (summary["total_seats"], summary["booked_seats"], summary["available_seats"]) == (10, 2, 8)
+    assert db.get(EventInventory, event_id).booked_seats == 2
+
+    # Drift in both copies is put right from COUNT(*) on ticket
+    db.query(EventInventory).filter(EventInventory.event_id == event_id).update({"booked_seats": 0})
+    redis_client.hset(f"inventory:{event_id}", "booked", 7)
+    assert inventory_service.reconcile_all(db) >= 1
+    db.expire_all()
+    assert db.get(EventInventory, event_id).booked_seats == 2
+    assert client.get(f"/api/v1/events/{event_id}/summary").json()["booked_seats"] == 2
+
+
+def test_sold_out_event_rejects_bookings_up_front(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="soldout-arena", rows=1, cols=2)
+    headers = customer_headers("soldout@customer.com")
+    seat_ids = [s["id"] for s in client.get(f"/api/v1/events/{event_id}/availability").json()["available"]]
+    assert redis_client.exists(f"soldout:{event_id}") == 0
+    assert client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": seat_ids}, headers=headers
+    ).status_code == 200
+    assert redis_client.exists(f"soldout:{event_id}") == 1
+
+    late = client.post("/api/v1/bookings/", json={"event_id": event_id, "seat_ids": seat_ids[:1]})
+    assert late.status_code == 409  # before authentication, let alone the DB
+    assert late.json()["detail"] == "This event is sold out."
+
+    # Not an integer event id: the pre-check stays out of it and validation answers
+    fractional = client.post("/api/v1/bookings/", json={"event_id": event_id + 0.9, "seat_ids": seat_ids[:1]})
+    assert fractional.status_code in (401, 422) and fractional.json()["detail"] != "This event is sold out."
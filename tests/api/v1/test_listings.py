@@ -0,0 +1,107 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints.public import _page_response
+from app.core.config import settings
+from app.db.cache import redis_client
+
+
+def test_public_reads_answer_if_none_match_with_304(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="etag-arena", rows=1, cols=3)
+    headers = customer_headers("etag@customer.com")
+    url = f"/api/v1/events/{event_id}/availability"
+    first = client.get(url)
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"].startswith("public")
+    assert etag == f'"availability-{event_id}-full-{first.json()["version"]}"'
+
+    unchanged = client.get(url, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304 and unchanged.content == b""
+    for path in (f"/api/v1/events/{event_id}", "/api/v1/events/"):
+        tag = client.get(path).headers["ETag"]
+        assert client.get(path, headers={"If-None-Match": tag}).status_code == 304
+
+    seat_id = first.json()["available"][0]["id"]
+    assert client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": [seat_id]}, headers=headers
+    ).status_code == 200
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert changed.json()["booked_seats"] == 1
+
+
+def test_upcoming_events_list_is_cached_until_next_event(
+    client: TestClient, db: Session, organizer_event,
+):
+    first_id = organizer_event(venue_name="list-arena", rows=1, cols=2)
+    day = datetime.now(timezone.utc).date().isoformat()
+    res = client.get("/api/v1/events/")
+    assert res.status_code == 200
+    assert first_id in [e["id"] for e in res.json()]
+    version = redis_client.get("events:version")
+    cached = json.loads(redis_client.get(f"events_list:{day}:{version}:{settings.PAGE_SIZE_DEFAULT}:"))
+    assert cached["items"] == res.json()
+
+    second_id = organizer_event(venue_name="list-arena-2", rows=1, cols=2)
+    assert redis_client.get("events:version") != version  # every cached page dropped
+    assert {first_id, second_id} <= {e["id"] for e in client.get("/api/v1/events/").json()}
+
+
+def _all_pages(client: TestClient, path: str, limit: int) -> list:
+    items, params = [], {"limit": limit}
+    while True:
+        res = client.get(path, params=params)
+        assert res.status_code == 200 and len(res.json()) <= limit
+        items += res.json()
+        if "X-Next-Cursor" not in res.headers:
+            return items
+        params = {"limit": limit, "cursor": res.headers["X-Next-Cursor"]}
+
+
+def test_events_and_venues_are_paged_by_cursor(
+    client: TestClient, db: Session, organizer_event,
+):
+    created = {organizer_event(venue_name=f"page-arena-{i}", rows=1, cols=1) for i in range(3)}
+
+    events = _all_pages(client, "/api/v1/events/", 2)
+    assert created <= {e["id"] for e in events}
+    assert len(events) == len({e["id"] for e in events})
+    assert [e["event_time"] for e in events] == sorted(e["event_time"] for e in events)
+
+    venues = _all_pages(client, "/api/v1/venues/", 2)
+    assert {f"page-arena-{i}" for i in range(3)} <= {v["name"] for v in venues}
+    assert [v["id"] for v in venues] == sorted({v["id"] for v in venues})
+
+    assert client.get("/api/v1/events/", params={"cursor": "not-a-cursor"}).status_code == 422
+    assert client.get("/api/v1/venues/", params={"limit": settings.PAGE_SIZE_MAX + 1}).status_code == 422
+    skipped = client.get("/api/v1/venues/", params={"skip": 100})
+    assert skipped.status_code == 422 and "cursor" in skipped.json()["detail"]
+
+
+def test_list_cache_keys_come_only_from_issued_cursors(
+    client: TestClient, db: Session, organizer_event,
+):
+    for i in range(3):
+        organizer_event(venue_name=f"key-arena-{i}", rows=1, cols=1)
+    version = redis_client.get("venues:version")
+    res = client.get("/api/v1/venues/", params={"limit": 2})
+    cursor = res.headers["X-Next-Cursor"]
+    assert redis_client.get(f"venues_list:{version}:2:") is None  # odd sizes aren't cached
+
+    payload, _, signature = cursor.partition(".")
+    forged = base64.urlsafe_b64encode(b"[1]").rstrip(b"=").decode()
+    for bad in (payload, f"{payload}=.{signature}", f"{forged}.{signature}", "abc.é", "é"):
+        assert client.get("/api/v1/venues/", params={"cursor": bad}).status_code == 422
+    assert client.get("/api/v1/venues/", params={"cursor": cursor}).status_code == 200
+
+
+def test_page_response_parses_pages_it_cannot_slice():
+    res = _page_response(b'{"items": [{"id": 1}], "next_cursor": "abc.def"}', None)
+    assert json.loads(res.body) == [{"id": 1}]
+    assert res.headers["X-Next-Cursor"] == "abc.def"
@@ -0,0 +1,72 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.booking import Ticket
+from app.services import seat_bitmap
+
+
+def _seat_ids(client: TestClient, event_id: int) -> list:
+    return [s["id"] for s in client.get(f"/api/v1/events/{event_id}/availability").json()["available"]]
+
+
+def test_bitmap_conflict_is_rejected_before_the_db(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="precheck-arena", rows=1, cols=3)
+    headers = customer_headers("precheck@customer.com")
+    seats = _seat_ids(client, event_id)
+
+    # A bit with no ticket behind it: only the pre-check can reject this
+    seat_bitmap.mark_booked(event_id, [seats[0]])
+    res = client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": seats[:2]}, headers=headers
+    )
+    assert res.status_code == 409
+    assert db.query(Ticket).filter(Ticket.event_id == event_id).count() == 0
+
+
+def test_commit_marks_booked_seats(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="mark-arena", rows=1, cols=3)
+    headers = customer_headers("mark@customer.com")
+    seats = _seat_ids(client, event_id)
+    assert seat_bitmap.find_booked(event_id, seats) == []
+
+    assert client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": [seats[1]]}, headers=headers
+    ).status_code == 200
+    assert seat_bitmap.find_booked(event_id, seats) == [seats[1]]
+
+
+def test_rebuild_does_not_erase_a_mark_made_after_its_read(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="interleave-arena", rows=1, cols=4)
+    headers = customer_headers("interleave@customer.com")
+    seats = _seat_ids(client, event_id)
+
+    loaded = seat_bitmap.load(db, event_id)  # a rebuild reads the tickets…
+    assert client.post(                       # …a booking commits and marks…
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": [seats[2]]}, headers=headers
+    ).status_code == 200
+    seat_bitmap.store(event_id, *loaded)      # …then the rebuild writes
+
+    assert seat_bitmap.find_booked(event_id, seats) == [seats[2]]
+    rle = client.get(f"/api/v1/events/{event_id}/availability?format=rle").json()
+    assert rle["booked_runs"] == [[2, 1]]
+
+
+def test_mark_made_while_the_bitmap_is_missing_survives_the_build(
+    client: TestClient, db: Session, organizer_event,
+):
+    event_id = organizer_event(venue_name="pending-arena", rows=1, cols=4)
+    seats = _seat_ids(client, event_id)
+
+    seat_bitmap.clear(event_id)               # expired, or never built
+    loaded = seat_bitmap.load(db, event_id)   # a rebuild reads the tickets…
+    seat_bitmap.mark_booked(event_id, [seats[3]])  # …a commit marks, finding no bitmap…
+    assert seat_bitmap.find_booked(event_id, seats) is None
+    seat_bitmap.store(event_id, *loaded)      # …then the rebuild writes
+
+    assert seat_bitmap.find_booked(event_id, seats) == [seats[3]]
@@ -0,0 +1,61 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+
+def test_seat_hold_blocks_other_customers_before_db(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="hold-arena", rows=1, cols=5)
+    alice = customer_headers("alice@hold.com")
+    bob = customer_headers("bob@hold.com")
+
+    seats = [s["id"] for s in client.get(f"/api/v1/events/{event_id}/availability").json()["available"]]
+
+    hold = client.post(
+        "/api/v1/bookings/holds", json={"event_id": event_id, "seat_ids": seats[:2]}, headers=alice
+    )
+    assert hold.status_code == 200
+    assert hold.json()["seat_ids"] == seats[:2]
+
+    # Bob loses in Redis — no ticket rows are attempted
+    blocked = client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": [seats[1]]}, headers=bob
+    )
+    assert blocked.status_code == 409
+    assert "held" in blocked.json()["detail"]
+
+    # Alice converts her hold into a booking
+    booked = client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": seats[:2]}, headers=alice
+    )
+    assert booked.status_code == 200
+
+    # Bob can still book seats nobody holds
+    assert client.delete(f"/api/v1/bookings/holds/{event_id}", headers=alice).status_code == 200
+    other = client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": [seats[2]]}, headers=bob
+    )
+    assert other.status_code == 200
+
+
+def test_best_available_finds_and_holds_adjacent_block(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="best-arena", rows=2, cols=6)
+    headers = customer_headers("best@customer.com")
+    seats = client.get(f"/api/v1/events/{event_id}/availability").json()["available"]
+    centre = [s["id"] for s in seats if s["row"] == "A" and s["number"] in (3, 4)]
+    assert client.post(
+        "/api/v1/bookings/", json={"event_id": event_id, "seat_ids": centre}, headers=headers
+    ).status_code == 200
+
+    url = f"/api/v1/events/{event_id}/best-available"
+    pair = client.post(url, json={"party_size": 2}, headers=headers).json()
+    assert (pair["row"], [s["number"] for s in pair["seats"]], pair["held"]) == ("A", [1, 2], False)
+
+    trio = client.post(url, json={"party_size": 3, "row": "b", "hold": True}, headers=headers).json()
+    assert (trio["row"], [s["number"] for s in trio["seats"]], trio["held"]) == ("B", [2, 3, 4], True)
+
+    # The held block is off the map for everyone else: no 3 adjacent seats left
+    rival = customer_headers("best-rival@customer.com")
+    assert client.post(url, json={"party_size": 3}, headers=rival).status_code == 409
@@ -0,0 +1,55 @@
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db.cache import redis_client
+
+
+def test_waiting_room_gates_bookings_until_admitted(
+    client: TestClient, db: Session, organizer_event, customer_headers,
+):
+    event_id = organizer_event(venue_name="queue-arena", rows=1, cols=5)
+    organizer_token = client.post(
+        "/api/v1/auth/token",
+        data={"username": "queue-arena@organizer.com", "password": "organizer123"},
+    ).json()["access_token"]
+    organizer = {"Authorization": f"Bearer {organizer_token}"}
+    queue_url = f"/api/v1/organizer/events/{event_id}/queue"
+
+    other_event_id = organizer_event(venue_name="queue-arena-other", rows=1, cols=1)
+    # Another organizer can't tune or tear down this event's queue
+    assert client.put(
+        f"/api/v1/organizer/events/{other_event_id}/queue", json={"admit_per_second": 1}, headers=organizer
+    ).status_code == 403
+    assert client.delete(f"/api/v1/organizer/events/{other_event_id}/queue", headers=organizer).status_code == 403
+    assert client.delete("/api/v1/organizer/events/999999/queue", headers=organizer).status_code == 404
+
+    enabled = client.put(queue_url, json={"admit_per_second": 1000}, headers=organizer)
+    assert enabled.status_code == 200
+    assert redis_client.ttl(f"queue:{event_id}:config") > 0
+    try:
+        _book_through_the_queue(client, event_id, customer_headers("queued@customer.com"))
+    finally:
+        assert client.delete(queue_url, headers=organizer).status_code == 200
+
+
+def _book_through_the_queue(client: TestClient, event_id: int, headers: dict) -> None:
+    seat_id = client.get(f"/api/v1/events/{event_id}/availability").json()["available"][0]["id"]
+    booking = {"event_id": event_id, "seat_ids": [seat_id]}
+
+    # No token → turned away before the booking path
+    assert client.post("/api/v1/bookings/", json=booking, headers=headers).status_code == 403
+
+    ticket = client.post(f"/api/v1/events/{event_id}/queue", headers=headers).json()
+    assert ticket["state"] in ("waiting", "admitted")
+
+    time.sleep(0.05)  # 1000/s admits the head of the queue within a few ms
+    status_res = client.get(f"/api/v1/events/{event_id}/queue/{ticket['token']}")
+    assert status_res.json()["state"] == "admitted"
+
+    res = client.post(
+        "/api/v1/bookings/", json=booking,
+        headers={**headers, "X-Queue-Token": ticket["token"]},
+    )
+    assert res.status_code == 200
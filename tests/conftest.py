@@ -42,3 +42,52 @@ def client(db: Session) -> Generator:
     with TestClient(app) as c:
         yield c
     del app.dependency_overrides[get_db]
+
+
+@pytest.fixture(scope="function")
+def organizer_event(client: TestClient):
+    """organizer_event(venue_name=, rows=, cols=): new organizer, venue and event; returns event_id."""
+    def create(*, venue_name: str, rows: int, cols: int) -> int:
+        client.post("/api/v1/users/signup", json={
+            "email": f"{venue_name}@organizer.com", "password": "organizer123",
+            "full_name": "Organizer", "role": "organizer",
+        })
+        token = client.post(
+            "/api/v1/auth/token",
+            data={"username": f"{venue_name}@organizer.com", "password": "organizer123"},
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        venue_id = client.post(
+            "/api/v1/organizer/venues/",
+            json={"name": venue_name, "rows": rows, "cols": cols},
+            headers=headers,
+        ).json()["id"]
+        return client.post(
+            "/api/v1/organizer/events/",
+            json={
+                "name": f"{venue_name} Show",
+                "event_time": "2099-12-25T20:00:00Z",
+                "event_type": "concert",
+                "venue_id": venue_id,
+            },
+            headers=headers,
+        ).json()["id"]
+
+    return create
+
+
+@pytest.fixture(scope="function")
+def customer_headers(client: TestClient):
+    """customer_headers(email): signs up a customer and returns their Authorization header."""
+    def login(email: str) -> dict:
+        client.post("/api/v1/users/signup", json={
+            "email": email, "password": "customer123",
+            "full_name": "Customer", "role": "customer",
+        })
+        token = client.post(
+            "/api/v1/auth/token", data={"username": email, "password": "customer123"}
+        ).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    return login